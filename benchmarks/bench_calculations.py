@@ -0,0 +1,76 @@
+"""Measure the calls per second of the calculations,
+uncached, cached with repeating inputs and for many people at once.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_calculations
+"""
+import random
+import time
+
+from runningapp import calculations
+
+CALLS = 200000
+# the number of different people calling the calculators
+PEOPLE = 2000
+
+
+def _make_people(calls):
+    rng = random.Random(0)
+    # the calculators mostly get whole centimetres and kilograms
+    people = [
+        (
+            rng.randint(18, 70),
+            rng.randint(150, 200),
+            rng.randint(45, 110),
+            rng.choice(["Male", "Female"]),
+            rng.randint(0, 7),
+        )
+        for _ in range(PEOPLE)
+    ]
+    return [rng.choice(people) for _ in range(calls)]
+
+
+def _calls_per_second(function, people):
+    start = time.perf_counter()
+    for person in people:
+        function(*person)
+    return len(people) / (time.perf_counter() - start)
+
+
+def main():
+    people = _make_people(CALLS)
+    bmi_people = [(height, weight) for _, height, weight, _, _ in people]
+
+    results = {
+        "calculate_bmi": _calls_per_second(
+            calculations.calculate_bmi, bmi_people
+        ),
+        "cached_calculate_bmi": _calls_per_second(
+            calculations.cached_calculate_bmi, bmi_people
+        ),
+        "calculate_daily_caloric_needs": _calls_per_second(
+            calculations.calculate_daily_caloric_needs, people
+        ),
+        "cached_calculate_daily_caloric_needs": _calls_per_second(
+            calculations.cached_calculate_daily_caloric_needs, people
+        ),
+    }
+    columns = list(zip(*people))
+    start = time.perf_counter()
+    calculations.calculate_many_daily_caloric_needs(*columns)
+    results["calculate_many_daily_caloric_needs"] = CALLS / (
+        time.perf_counter() - start
+    )
+
+    for name, calls_per_second in results.items():
+        print(f"{name}: {calls_per_second:,.0f} calls/s")
+    info = calculations.cached_calculate_daily_caloric_needs.cache_info()
+    print(
+        f"daily caloric needs cache: {info.hits / CALLS:.0%} hits, "
+        f"{info.currsize} entries"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare calculating the daily caloric needs of a roster of people
+with a request per person and with a single /daily-calories/batch request,
+and how long the batch spends validating and calculating.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_calculator_batch
+"""
+import json
+import os
+import random
+import tempfile
+import time
+from unittest.mock import patch
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp import calculations
+from runningapp.resources.calculator import caloric_needs_schema
+
+ROWS = 1000
+LARGE_ROWS = 50000
+FIELDS = ("age", "height", "weight", "gender", "trainings_per_week")
+
+
+def _make_people(rows):
+    rng = random.Random(0)
+    return [
+        {
+            "age": rng.randint(10, 90),
+            "height": round(rng.uniform(140, 210), 1),
+            "weight": round(rng.uniform(40, 150), 1),
+            "gender": rng.choice(["Male", "Female"]),
+            "trainings_per_week": rng.randint(0, 7),
+        }
+        for _ in range(rows)
+    ]
+
+
+def _time(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        RATELIMIT_ENABLED = False
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    headers = {"Content-Type": "application/json"}
+
+    people = _make_people(ROWS)
+    single = _time(
+        lambda: [
+            client.post(
+                "/daily-calories", data=json.dumps(person), headers=headers
+            )
+            for person in people
+        ]
+    )
+    batch = _time(
+        lambda: client.post(
+            "/daily-calories/batch", data=json.dumps(people), headers=headers
+        )
+    )
+    print(
+        f"{ROWS} people: a request each {single * 1000:.0f} ms, "
+        f"one batch {batch * 1000:.1f} ms"
+    )
+
+    people = _make_people(LARGE_ROWS)
+    columns = {field: [p[field] for p in people] for field in FIELDS}
+    request = _time(
+        lambda: client.post(
+            "/daily-calories/batch", data=json.dumps(columns), headers=headers
+        )
+    )
+    validation = _time(lambda: caloric_needs_schema.load(people, many=True))
+    args = [columns[field] for field in FIELDS]
+    vectorized = _time(
+        lambda: calculations.calculate_many_daily_caloric_needs(*args)
+    )
+    with patch.object(calculations, "numpy", None):
+        loop = _time(
+            lambda: calculations.calculate_many_daily_caloric_needs(*args)
+        )
+    print(
+        f"{LARGE_ROWS} people as columns: request {request * 1000:.0f} ms, "
+        f"validation {validation * 1000:.0f} ms, "
+        f"calculation {vectorized * 1000:.1f} ms "
+        f"({'NumPy' if calculations.numpy else 'no NumPy'}), "
+        f"{loop * 1000:.1f} ms in a loop"
+    )
+
+
+if __name__ == "__main__":
+    main()
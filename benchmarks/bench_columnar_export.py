@@ -0,0 +1,77 @@
+"""Measure the throughput of the columnar export of trainings
+and compare it with loading and dumping them like the REST API does.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_columnar_export
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from runningapp import create_app
+from runningapp.columnar import export_table, WRITERS
+from runningapp.config import Config
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.resources.training import training_dumper
+
+ROWS = 100000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.session.bulk_insert_mappings(
+            TrainingModel,
+            [
+                {
+                    "name": f"run {i}",
+                    "distance": 10.5,
+                    "avg_tempo": 10,
+                    "time_in_seconds": 3600,
+                    "calories": 700,
+                    "user_id": i % 100,
+                }
+                for i in range(ROWS)
+            ],
+        )
+        db.session.commit()
+        print(f"{ROWS} trainings")
+
+        start = time.perf_counter()
+        training_dumper.dump(TrainingModel.query.all(), many=True)
+        seconds = time.perf_counter() - start
+        print(f"  ORM + dump:   {ROWS / seconds:10,.0f} rows/s")
+        db.session.remove()
+
+        for export_format in WRITERS:
+            output = os.path.join(directory, export_format)
+            os.makedirs(output)
+            start = time.perf_counter()
+            with db.engine.connect() as connection:
+                result = export_table(
+                    connection,
+                    TrainingModel.__table__,
+                    output,
+                    export_format=export_format,
+                )
+            seconds = time.perf_counter() - start
+            size = os.path.getsize(result.path) / 1024 / 1024
+            print(
+                f"  {export_format:12} {ROWS / seconds:10,.0f} rows/s, "
+                f"{size:.1f} MiB"
+            )
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare the size of the /trainings and /users responses
+and the time of compressing them with every supported encoding.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compression
+"""
+import json
+import timeit
+
+from benchmarks.bench_representations import (
+    ROWS,
+    trainings_payload,
+    users_payload,
+)
+from runningapp.compression import compress_body, STREAMS
+
+LEVEL = 6
+
+
+def main():
+    for name, payload in (
+        ("/trainings", trainings_payload()),
+        ("/users", users_payload()),
+    ):
+        body = json.dumps(payload).encode()
+        print(f"{name} with {ROWS} rows, {len(body) / 1024:.1f} KiB")
+        for encoding in STREAMS:
+            size = len(compress_body(body, encoding, LEVEL))
+            seconds = min(
+                timeit.repeat(
+                    lambda: compress_body(body, encoding, LEVEL), number=10
+                )
+            )
+            print(
+                f"  {encoding:>8}: {size / 1024:6.1f} KiB, "
+                f"{seconds / 10 * 1000:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Measure the throughput of concurrent POST /trainings requests
+with the old database settings (rollback journal, no connection pool)
+and with the current ones (WAL, synchronous=NORMAL, pooled connections).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_concurrent_writes
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import partial
+
+from werkzeug.security import generate_password_hash
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp.db import db
+from runningapp.models.user import UserModel, UserProfileModel
+
+THREADS = 8
+REQUESTS_PER_THREAD = 100
+
+
+class BenchmarkConfig(Config):
+    RATELIMIT_ENABLED = False
+
+
+class LegacyConfig(BenchmarkConfig):
+    DB_POOL_SIZE = 0
+    SQLITE_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def post_trainings(app, username, errors):
+    client = app.test_client()
+    response = client.post(
+        "/login", json={"username": username, "password": "pass"}
+    )
+    headers = {
+        "Authorization": f"Bearer {response.json['access_token']}",
+        "Content-Type": "application/json",
+    }
+    for i in range(REQUESTS_PER_THREAD):
+        data = {"name": f"run {i}", "distance": 10, "time_in_seconds": 3600}
+        response = client.post(
+            "/trainings", data=json.dumps(data), headers=headers
+        )
+        if response.status_code != 201:
+            errors.append(response.status_code)
+
+
+def run(name, config_class, directory):
+    path = os.path.join(directory, f"{config_class.__name__}.db")
+    config = type(
+        "Config",
+        (config_class,),
+        {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"},
+    )
+    app = create_app(config)
+    with app.app_context():
+        for thread in range(THREADS):
+            user = UserModel(
+                username=f"user{thread}",
+                password=generate_password_hash("pass"),
+            )
+            user.save_to_db()
+            UserProfileModel(user_id=user.id).save_to_db()
+        db.session.remove()
+
+    errors = []
+    threads = [
+        threading.Thread(
+            target=partial(post_trainings, app, f"user{thread}", errors)
+        )
+        for thread in range(THREADS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = THREADS * REQUESTS_PER_THREAD
+    print(
+        f"{name:>8}: {total / elapsed:7.1f} requests/s, "
+        f"{len(errors)} failed"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        run("before", LegacyConfig, directory)
+        run("after", BenchmarkConfig, directory)
+
+
+if __name__ == "__main__":
+    main()
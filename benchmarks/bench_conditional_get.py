@@ -0,0 +1,80 @@
+"""Compare a full GET /trainings with a conditional one
+answered with 304 Not Modified.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_conditional_get
+"""
+import os
+import tempfile
+import timeit
+
+from flask_jwt_extended import create_access_token
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserModel, UserProfileModel
+
+ROWS = 1000
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        RATELIMIT_ENABLED = False
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        user = UserModel(username="runner", password="-")
+        user.save_to_db()
+        UserProfileModel(user_id=user.id).save_to_db()
+        db.session.add_all(
+            TrainingModel(
+                name=f"run {i}",
+                distance=10.5,
+                avg_tempo=10,
+                time_in_seconds=3600,
+                calories=700,
+                user_id=user.id,
+            )
+            for i in range(ROWS)
+        )
+        db.session.commit()
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=user.id)}"
+        }
+
+    client = app.test_client()
+    etag = client.get("/trainings", headers=headers).headers["ETag"]
+    conditional_headers = {**headers, "If-None-Match": etag}
+    assert (
+        client.get("/trainings", headers=conditional_headers).status_code
+        == 304
+    )
+
+    full = min(
+        timeit.repeat(
+            lambda: client.get("/trainings", headers=headers), number=20
+        )
+    )
+    conditional = min(
+        timeit.repeat(
+            lambda: client.get("/trainings", headers=conditional_headers),
+            number=20,
+        )
+    )
+    print(
+        f"GET /trainings with {ROWS} rows: "
+        f"200 {full / 20 * 1000:.2f} ms, "
+        f"304 {conditional / 20 * 1000:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measure the per-request overhead of calling db.create_all()
+in a before_request hook, as the app used to do.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_create_all
+"""
+import time
+
+from sqlalchemy import event
+
+from runningapp import create_app
+from runningapp.db import db
+
+N = 2000
+PATH = "/total-users-number"
+
+
+def time_requests(app) -> float:
+    """Return the average time of a request in microseconds"""
+    client = app.test_client()
+    client.get(PATH)
+    start = time.perf_counter()
+    for _ in range(N):
+        client.get(PATH)
+    return (time.perf_counter() - start) / N * 1e6
+
+
+def count_statements(app) -> int:
+    """Count the SQL statements executed by a single create_all()"""
+    statements = []
+    with app.app_context():
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+        db.create_all()
+    return len(statements)
+
+
+def main():
+    app = create_app()
+    app.before_request_funcs[None] = []  # measure the hook alone
+
+    without_hook = time_requests(app)
+
+    @app.before_request
+    def create_tables():
+        db.create_all()
+
+    with_hook = time_requests(app)
+
+    print(f"statements per create_all(): {count_statements(app)}")
+    print(f"request with create_all hook: {with_hook:.0f} us")
+    print(f"request without the hook:     {without_hook:.0f} us")
+    print(f"overhead removed:             {with_hook - without_hook:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare dumping trainings and users with marshmallow
+and with the precompiled dumper.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_dumper
+"""
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+from runningapp import create_app
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.training import TrainingSchema
+from runningapp.schemas.user import UserProfileSchema, UserSchema
+
+ROWS = 5000
+
+
+def compare(name, schema, objects):
+    dumper = PrecompiledDumper(schema)
+    marshmallow = min(
+        timeit.repeat(lambda: schema.dump(objects, many=True), number=1)
+    )
+    precompiled = min(
+        timeit.repeat(lambda: dumper.dump(objects, many=True), number=1)
+    )
+    print(
+        f"{name}: marshmallow {marshmallow * 1000:.1f} ms, "
+        f"precompiled {precompiled * 1000:.1f} ms, "
+        f"{marshmallow / precompiled:.1f}x faster"
+    )
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        trainings = [
+            TrainingModel(
+                id=i,
+                name=f"run {i}",
+                distance=10.5,
+                avg_tempo=10.5,
+                date=datetime.utcnow(),
+                time_in_seconds=3600,
+                calories=700,
+                user_id=1,
+            )
+            for i in range(ROWS)
+        ]
+        compare(f"{ROWS} trainings", TrainingSchema(), trainings)
+
+        profiles = [
+            UserProfileModel(
+                id=i,
+                user_id=i,
+                gender="Male",
+                age=30,
+                weight=70,
+                height=180,
+                bmi=21.6,
+                daily_cal=2500,
+                trainings_number=3,
+                kilometers_run=30,
+            )
+            for i in range(ROWS)
+        ]
+        compare(f"{ROWS} user profiles", UserProfileSchema(), profiles)
+
+        # plain objects, as the profiles of users are a dynamic relationship
+        users = [
+            SimpleNamespace(
+                id=i,
+                username=f"user{i}",
+                is_admin=False,
+                is_staff=False,
+                user_profile=[profiles[i]],
+            )
+            for i in range(ROWS)
+        ]
+        compare(f"{ROWS} users with profiles", UserSchema(), users)
+
+
+if __name__ == "__main__":
+    main()
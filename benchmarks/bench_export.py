@@ -0,0 +1,89 @@
+"""Compare the peak memory of GET /trainings and of the streamed
+GET /trainings/export for a growing number of trainings.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export
+"""
+import os
+import tempfile
+import tracemalloc
+
+from flask_jwt_extended import create_access_token
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserModel, UserProfileModel
+
+SIZES = (2000, 10000, 50000)
+
+
+def peak_memory(client, path, headers):
+    """Get the peak memory in MiB of reading the whole response"""
+    tracemalloc.start()
+    response = client.get(path, headers=headers, buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, peak / 1024 / 1024
+
+
+def main():
+    directory = tempfile.mkdtemp()
+
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = (
+            f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        )
+        RATELIMIT_ENABLED = False
+        COMPRESS_ENABLED = False
+
+    app = create_app(BenchmarkConfig)
+    client = app.test_client()
+    with app.app_context():
+        user = UserModel(username="runner", password="-")
+        user.save_to_db()
+        UserProfileModel(user_id=user.id).save_to_db()
+        user_id = user.id
+        headers = {
+            "Authorization": f"Bearer {create_access_token(identity=user_id)}"
+        }
+
+    rows = 0
+    for size in SIZES:
+        with app.app_context():
+            db.session.bulk_insert_mappings(
+                TrainingModel,
+                [
+                    {
+                        "name": f"run {i}",
+                        "distance": 10.5,
+                        "avg_tempo": 10,
+                        "time_in_seconds": 3600,
+                        "calories": 700,
+                        "user_id": user_id,
+                    }
+                    for i in range(rows, size)
+                ],
+            )
+            db.session.commit()
+        rows = size
+        print(f"{size} trainings")
+        for path in (
+            "/trainings",
+            "/trainings/export",
+            "/trainings/export?format=ndjson",
+            "/trainings/export?format=csv",
+        ):
+            body, peak = peak_memory(client, path, headers)
+            print(
+                f"  {path:32} {body / 1024 / 1024:6.1f} MiB body, "
+                f"{peak:6.1f} MiB peak"
+            )
+
+
+if __name__ == "__main__":
+    main()
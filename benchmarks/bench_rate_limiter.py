@@ -0,0 +1,33 @@
+"""Measure the time the rate limiter adds to every request.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_rate_limiter
+"""
+import timeit
+
+from runningapp import create_app
+
+N = 20000
+
+
+def main():
+    app = create_app()
+    check_rate_limit = app.before_request_funcs[None][0]
+    state = app.extensions["rate_limiter"]
+    state.default = (1e12, 1e12)  # never run out of tokens
+    state.routes = {}
+
+    headers = {"Authorization": "Bearer not-a-valid-token"}
+    for name, kwargs in (
+        ("anonymous", {}),
+        ("with access token", {"headers": headers}),
+    ):
+        with app.test_request_context("/trainings", **kwargs):
+            check_rate_limit()
+            seconds = timeit.timeit(check_rate_limit, number=N)
+        print(f"{name:>20}: {seconds / N * 1e6:.2f} us per request")
+
+
+if __name__ == "__main__":
+    main()
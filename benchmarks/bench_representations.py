@@ -0,0 +1,85 @@
+"""Compare the payload size and the encoding time of the /trainings
+and /users responses in stdlib JSON, orjson and MessagePack.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_representations
+"""
+import json
+import timeit
+from datetime import datetime
+
+from runningapp.representations import msgpack, orjson
+
+ROWS = 1000
+
+
+def trainings_payload():
+    return {
+        "trainings": [
+            {
+                "id": i,
+                "user_id": 1,
+                "distance": 10.5,
+                "date": datetime.utcnow().strftime("%d-%m-%Y %H:%M:%S"),
+                "time_in_seconds": 3600,
+                "avg_tempo": 10,
+                "calories": 735,
+                "name": f"morning run {i}",
+            }
+            for i in range(ROWS)
+        ]
+    }
+
+
+def users_payload():
+    return {
+        "users": [
+            {
+                "id": i,
+                "is_staff": False,
+                "is_admin": False,
+                "username": f"user{i}",
+                "user_profile": [
+                    {
+                        "id": i,
+                        "bmi": 22.9,
+                        "user_id": i,
+                        "gender": "Female",
+                        "height": 170.0,
+                        "kilometers_run": 120,
+                        "trainings_number": 12,
+                        "age": 31,
+                        "daily_cal": 2300,
+                        "weight": 66.0,
+                    }
+                ],
+            }
+            for i in range(ROWS)
+        ]
+    }
+
+
+def main():
+    encoders = {"json": lambda data: json.dumps(data).encode()}
+    if orjson is not None:
+        encoders["orjson"] = orjson.dumps
+    if msgpack is not None:
+        encoders["msgpack"] = msgpack.packb
+
+    for name, payload in (
+        ("/trainings", trainings_payload()),
+        ("/users", users_payload()),
+    ):
+        print(f"{name} with {ROWS} rows")
+        for encoder_name, encode in encoders.items():
+            size = len(encode(payload))
+            seconds = min(timeit.repeat(lambda: encode(payload), number=10))
+            print(
+                f"  {encoder_name:>8}: {size / 1024:6.1f} KiB, "
+                f"{seconds / 10 * 1000:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
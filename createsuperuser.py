@@ -5,8 +5,8 @@ from runningapp.models.user import UserModel, UserProfileModel
 
 class Superuser:
     """The class can be used
-    after the first request has been made
-    as this action triggers database creation"""
+    after the database has been created
+    by starting the app or running the upgrade-db command"""
 
     def __init__(self, username, password):
         self.username = username
@@ -6,13 +6,20 @@ from marshmallow import ValidationError
 from flask_cors import CORS
 from runningapp.db import db
 from runningapp.ma import ma
+from runningapp.limiter import limiter
+from runningapp.compression import compress
+from runningapp.jobs import job_queue
+from runningapp.outbox import outbox_dispatcher
 from runningapp.blacklist import BLACKLIST
 from runningapp.routes import initialize_routes
+from runningapp.representations import init_representations
 from runningapp.config import Config
+from runningapp.commands import register_commands
+from runningapp.migrations import upgrade
 from runningapp.models.user import UserModel
 
 
-def create_app():
+def create_app(config_object=Config):
     """Create the app"""
 
     basedir = os.path.abspath(os.path.dirname(__file__))
@@ -21,16 +28,20 @@ def create_app():
     CORS(app)
     cors = CORS(app, resources={f"/*": {"origins": "localhost"}})
 
-    app.config.from_object(Config)
+    app.config.from_object(config_object)
     app.url_map.strict_slashes = False
     db.init_app(app)
     ma.init_app(app)
+    limiter.init_app(app)
+    compress.init_app(app)
+    job_queue.init_app(app)
+    outbox_dispatcher.init_app(app)
     api = Api(app)
+    init_representations(app, api)
 
-    @app.before_request
-    def create_tables():
-        """Create tables in the database"""
-        db.create_all()
+    if app.config["AUTO_MIGRATE"]:
+        with app.app_context():
+            upgrade()
 
     @app.errorhandler(ValidationError)
     def handle_marshmallow_validaton(err):  # except ValidationError as err
@@ -64,5 +75,6 @@ def create_app():
         )
 
     initialize_routes(api)
+    register_commands(app)
 
     return app
@@ -0,0 +1,211 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+
+# progress of every primary key range of a backfill,
+# the rows up to last_id have been recalculated
+backfill_checkpoints = db.Table(
+    "backfill_checkpoints",
+    db.Column("name", db.String(80), primary_key=True),
+    db.Column("range_start", db.Integer, primary_key=True),
+    db.Column("range_end", db.Integer, nullable=False),
+    db.Column("last_id", db.Integer, nullable=False),
+    db.Column("rows", db.Integer, nullable=False, default=0),
+    db.Column("updated_at", db.DateTime),
+)
+
+
+class Backfill(NamedTuple):
+    name: str
+    model: type
+    # recalculates a chunk of rows in place with the model methods
+    apply: Callable
+
+
+class BackfillResult(NamedTuple):
+    name: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+BACKFILLS: Dict[str, Backfill] = {}
+
+
+def backfill(name: str, model) -> Callable:
+    """Register a function recalculating a chunk of rows of the model
+    as the backfill with the given name"""
+
+    def decorator(function: Callable) -> Callable:
+        BACKFILLS[name] = Backfill(name, model, function)
+        return function
+
+    return decorator
+
+
+def plan_ranges(connection, job: Backfill, workers: int) -> List:
+    """Split the primary keys of the table into a range for every worker,
+    or get the ranges of the interrupted run of the backfill"""
+    checkpoints = backfill_checkpoints
+    query = (
+        checkpoints.select()
+        .where(checkpoints.c.name == job.name)
+        .order_by(checkpoints.c.range_start)
+    )
+    ranges = connection.execute(query).fetchall()
+    if ranges:
+        return ranges
+    primary_key = job.model.__table__.primary_key.columns.values()[0]
+    low, high = connection.execute(
+        db.select([db.func.min(primary_key), db.func.max(primary_key)])
+    ).first()
+    if low is None:
+        return []
+    step = math.ceil((high - low + 1) / workers)
+    connection.execute(
+        checkpoints.insert(),
+        [
+            {
+                "name": job.name,
+                "range_start": start,
+                "range_end": min(start + step - 1, high),
+                "last_id": start - 1,
+                "rows": 0,
+            }
+            for start in range(low, high + 1, step)
+        ],
+    )
+    return connection.execute(query).fetchall()
+
+
+def reset_checkpoints(connection, name: str) -> None:
+    """Forget the progress of the backfill so that it starts over"""
+    connection.execute(
+        backfill_checkpoints.delete().where(
+            backfill_checkpoints.c.name == name
+        )
+    )
+
+
+def run_range(
+    job: Backfill,
+    checkpoint,
+    chunk_size: int,
+    max_rows_per_second: Optional[float] = None,
+) -> int:
+    """Recalculate the rows of the range after its checkpoint chunk by chunk,
+    committing every chunk together with the new checkpoint,
+    and return the number of rows"""
+    model = job.model
+    primary_key = getattr(
+        model, model.__table__.primary_key.columns.values()[0].key
+    )
+    last_id = checkpoint.last_id
+    rows = 0
+    started = time.monotonic()
+    try:
+        while last_id < checkpoint.range_end:
+            chunk = (
+                model.query.filter(
+                    primary_key > last_id,
+                    primary_key <= checkpoint.range_end,
+                )
+                .order_by(primary_key)
+                .limit(chunk_size)
+                .all()
+            )
+            job.apply(chunk)
+            if len(chunk) < chunk_size:
+                last_id = checkpoint.range_end
+            else:
+                last_id = getattr(chunk[-1], primary_key.key)
+            db.session.execute(
+                backfill_checkpoints.update()
+                .where(backfill_checkpoints.c.name == job.name)
+                .where(
+                    backfill_checkpoints.c.range_start
+                    == checkpoint.range_start
+                )
+                .values(
+                    last_id=last_id,
+                    rows=backfill_checkpoints.c.rows + len(chunk),
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            db.session.commit()
+            rows += len(chunk)
+            if max_rows_per_second:
+                # sleep until the range is back under its share of the rate
+                ahead = rows / max_rows_per_second - (
+                    time.monotonic() - started
+                )
+                if ahead > 0:
+                    time.sleep(ahead)
+    finally:
+        db.session.remove()
+    return rows
+
+
+def run_backfill(
+    app,
+    name: str,
+    workers: int = 1,
+    chunk_size: int = 1000,
+    max_rows_per_second: Optional[float] = None,
+) -> BackfillResult:
+    """Run the backfill from its checkpoints
+    with the workers processing disjoint primary key ranges in parallel
+
+    The checkpoints of a finished run are deleted, so the next run
+    plans new ranges covering all the rows, only an interrupted run
+    is resumed.
+    """
+    job = BACKFILLS[name]
+    with db.engine.begin() as connection:
+        ranges = plan_ranges(connection, job, workers)
+    pending = [
+        checkpoint
+        for checkpoint in ranges
+        if checkpoint.last_id < checkpoint.range_end
+    ]
+    rate = None
+    if max_rows_per_second and pending:
+        # the limit is shared by the ranges running at the same time
+        rate = max_rows_per_second / min(workers, len(pending))
+
+    def run_in_app_context(checkpoint) -> int:
+        with app.app_context():
+            return run_range(job, checkpoint, chunk_size, rate)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rows = sum(executor.map(run_in_app_context, pending))
+    with db.engine.begin() as connection:
+        reset_checkpoints(connection, name)
+    return BackfillResult(name, rows, time.monotonic() - started)
+
+
+@backfill("training_calories", TrainingModel)
+def _recalculate_training_calories(trainings: List[TrainingModel]) -> None:
+    weights = UserProfileModel.find_weights_by_user_ids(
+        {training.user_id for training in trainings}
+    )
+    for training in trainings:
+        # the calories can't be calculated without the weight
+        if weights.get(training.user_id) is not None:
+            training.calculate_calories_burnt(weights[training.user_id])
+
+
+@backfill("user_profile_bmi", UserProfileModel)
+def _recalculate_user_profile_bmi(profiles: List[UserProfileModel]) -> None:
+    for user_profile in profiles:
+        user_profile.calculate_bmi()
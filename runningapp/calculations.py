@@ -0,0 +1,171 @@
+from functools import lru_cache
+from typing import List, Sequence
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# gender -> (constant, weight, height, age) coefficients
+# of the Harris-Benedict equation of BMR
+BMR_COEFFICIENTS = {
+    "Female": (655, 9.6, 1.8, 4.7),
+    "Male": (66, 13.8, 5, 6.8),
+}
+# trainings per week -> physical activity factor
+ACTIVITY_FACTORS = {0: 1, 1: 1.2, 2: 1.4, 3: 1.6, 4: 1.6, 5: 1.8, 6: 2, 7: 2}
+# (the lowest average tempo in km/h, MET) of running,
+# over 22 km/h the MET is 23 and under 8 km/h it's 6, source:
+# https://sites.google.com/site/compendiumofphysicalactivities/Activity-Categories/running
+MET_VALUES = (
+    (19, 19),
+    (17, 16),
+    (16, 14.5),
+    (15, 13),
+    (12, 12),
+    (11, 11),
+    (9, 10),
+    (8, 9),
+)
+# the number of different inputs the calculators remember the results of
+CACHE_SIZE = 4096
+
+
+def calculate_bmi(height: float, weight: float) -> float:
+    """Calculate BMI - a measure of body fat based on height and weight"""
+    return round(weight / (height / 100) ** 2, 1)
+
+
+def get_activity_factor(trainings_per_week: int) -> float:
+    """Get the physical activity factor
+    based on the amount of trainings per week"""
+    return ACTIVITY_FACTORS[trainings_per_week]
+
+
+def calculate_bmr(age: int, height: float, weight: float, gender: str) -> float:
+    """Calculate BMR (Basal Metabolic Rate)
+    - the amount of calories required for a person per day at rest"""
+    if gender not in BMR_COEFFICIENTS:
+        return 0
+    constant, weight_factor, height_factor, age_factor = BMR_COEFFICIENTS[
+        gender
+    ]
+    return (
+        constant
+        + weight_factor * weight
+        + height_factor * height
+        - age_factor * age
+    )
+
+
+def calculate_daily_caloric_needs(
+    age: int,
+    height: float,
+    weight: float,
+    gender: str,
+    trainings_per_week: int,
+) -> int:
+    """Calculate the amount of calories required for a person per day"""
+    bmr = calculate_bmr(age, height, weight, gender)
+    return int(bmr * ACTIVITY_FACTORS[trainings_per_week])
+
+
+def calculate_average_tempo(distance: float, time_in_seconds: int) -> float:
+    """Calculate the average tempo (km/h) during a training"""
+    return round(distance / (time_in_seconds / 3600), 1)
+
+
+def calculate_met(avg_tempo: float) -> float:
+    """Calculate the metabolic equivalent of a task
+    to measure the body's expenditure of energy"""
+    if avg_tempo > 22:
+        return 23
+    for lowest_tempo, met in MET_VALUES:
+        if avg_tempo >= lowest_tempo:
+            return met
+    if avg_tempo < 8:
+        return 6
+    return 0
+
+
+def calculate_calories_burnt(
+    avg_tempo: float, weight: float, time_in_seconds: int
+) -> int:
+    """Calculate how many calories a person burnt during a training"""
+    time_in_minutes = time_in_seconds / 60
+    # MET * 3.5 * weight / 200 = calories/minute
+    return int(calculate_met(avg_tempo) * 3.5 * weight / 200 * time_in_minutes)
+
+
+# the public calculators get the same inputs over and over
+cached_calculate_bmi = lru_cache(maxsize=CACHE_SIZE)(calculate_bmi)
+cached_calculate_daily_caloric_needs = lru_cache(maxsize=CACHE_SIZE)(
+    calculate_daily_caloric_needs
+)
+
+
+def calculate_many_bmi(
+    heights: Sequence[float], weights: Sequence[float]
+) -> List[float]:
+    """Calculate BMI of every person, with NumPy if it's installed"""
+    if numpy is None:
+        return [
+            calculate_bmi(height, weight)
+            for height, weight in zip(heights, weights)
+        ]
+    heights = numpy.asarray(heights, dtype=numpy.float64)
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    if not heights.all():
+        raise ZeroDivisionError("float division by zero")
+    bmi = weights / (heights / 100) ** 2
+    rounded = numpy.round(bmi, 1)
+    # NumPy squares by multiplying and rounds the halves to even,
+    # so the values close to a half of a tenth are calculated again
+    # as for a single person to get the same results to the last bit
+    tenths = bmi * 10
+    near_half = numpy.abs(tenths - numpy.floor(tenths) - 0.5) < 1e-6
+    for i in numpy.flatnonzero(near_half):
+        rounded[i] = calculate_bmi(float(heights[i]), float(weights[i]))
+    return rounded.tolist()
+
+
+def calculate_many_daily_caloric_needs(
+    ages: Sequence[int],
+    heights: Sequence[float],
+    weights: Sequence[float],
+    genders: Sequence[str],
+    trainings_per_week: Sequence[int],
+) -> List[int]:
+    """Calculate the daily caloric needs of every person,
+    with NumPy if it's installed"""
+    if numpy is None:
+        return [
+            calculate_daily_caloric_needs(*person)
+            for person in zip(
+                ages, heights, weights, genders, trainings_per_week
+            )
+        ]
+    unknown = set(trainings_per_week) - ACTIVITY_FACTORS.keys()
+    if unknown:
+        raise KeyError(min(unknown))
+    ages = numpy.asarray(ages, dtype=numpy.float64)
+    heights = numpy.asarray(heights, dtype=numpy.float64)
+    weights = numpy.asarray(weights, dtype=numpy.float64)
+    genders = numpy.asarray(genders)
+    bmr = numpy.zeros(len(genders))
+    # the same operations in the same order as for a single person,
+    # so that the results are the same to the last bit
+    for gender, coefficients in BMR_COEFFICIENTS.items():
+        constant, weight_factor, height_factor, age_factor = coefficients
+        bmr = numpy.where(
+            genders == gender,
+            constant
+            + weight_factor * weights
+            + height_factor * heights
+            - age_factor * ages,
+            bmr,
+        )
+    activity_factors = numpy.array(
+        [ACTIVITY_FACTORS[i] for i in range(len(ACTIVITY_FACTORS))]
+    )[numpy.asarray(trainings_per_week, dtype=numpy.intp)]
+    return numpy.trunc(bmr * activity_factors).astype(numpy.int64).tolist()
@@ -0,0 +1,166 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select, types
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+# table -> column which only grows,
+# the rows above the watermark are new or have changed,
+# the tombstones are the trainings deleted since the last export
+WATERMARK_COLUMNS = {
+    "trainings": "change_seq",
+    "training_tombstones": "change_seq",
+    "user_profiles": "change_seq",
+}
+
+
+def _get_arrow_type(column_type):
+    """Get the Arrow type of the column type"""
+    if isinstance(column_type, types.Boolean):
+        return pyarrow.bool_()
+    if isinstance(column_type, types.Integer):
+        return pyarrow.int64()
+    if isinstance(column_type, types.Float):
+        return pyarrow.float64()
+    if isinstance(column_type, types.DateTime):
+        return pyarrow.timestamp("us")
+    return pyarrow.string()
+
+
+class ParquetWriter:
+    """Write the batches as the row groups of a Parquet file"""
+
+    extension = "parquet"
+
+    def __init__(self, path: str, table) -> None:
+        self.schema = pyarrow.schema(
+            [
+                (column.name, _get_arrow_type(column.type))
+                for column in table.columns
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(
+            path, self.schema, compression="zstd"
+        )
+
+    def write_batch(self, columns: Dict[str, List]) -> None:
+        """Write the columns of a batch as a row group"""
+        self._writer.write_table(
+            pyarrow.Table.from_pydict(columns, schema=self.schema)
+        )
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class ColumnarJsonWriter:
+    """Write every batch as a line of gzipped JSON with a list per column,
+    the fallback when pyarrow isn't installed"""
+
+    extension = "columns.jsonl.gz"
+
+    def __init__(self, path: str, table) -> None:
+        self._file = gzip.open(path, "wt", compresslevel=6, encoding="utf-8")
+
+    def write_batch(self, columns: Dict[str, List]) -> None:
+        """Write the columns of a batch as a line"""
+        json.dump(columns, self._file, default=self._serialize)
+        self._file.write("\n")
+
+    @staticmethod
+    def _serialize(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+WRITERS = {"jsonl": ColumnarJsonWriter}
+if pyarrow is not None:
+    WRITERS["parquet"] = ParquetWriter
+DEFAULT_FORMAT = "parquet" if pyarrow is not None else "jsonl"
+
+
+class ExportResult(NamedTuple):
+    table: str
+    path: Optional[str]
+    rows: int
+    watermark: Optional[int]
+
+
+def _get_watermark_path(directory: str, table_name: str) -> str:
+    return os.path.join(directory, f"{table_name}.watermark")
+
+
+def read_watermark(directory: str, table_name: str) -> Optional[int]:
+    """Read the watermark of the last export of the table"""
+    try:
+        with open(_get_watermark_path(directory, table_name)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def write_watermark(directory: str, table_name: str, watermark) -> None:
+    """Remember the watermark of the last export of the table"""
+    path = _get_watermark_path(directory, table_name)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(watermark, file)
+    os.replace(f"{path}.tmp", path)
+
+
+def export_table(
+    connection,
+    table,
+    directory: str,
+    since=None,
+    batch_size: int = 10000,
+    export_format: str = DEFAULT_FORMAT,
+) -> ExportResult:
+    """Export the rows of the table above the watermark,
+    by default the one of the last export, to a new file in the directory
+    straight from the batches of the cursor"""
+    if since is None:
+        since = read_watermark(directory, table.name)
+    watermark_column = table.c[WATERMARK_COLUMNS[table.name]]
+    query = select([table]).order_by(watermark_column)
+    if since is not None:
+        query = query.where(watermark_column > since)
+    result = connection.execution_options(stream_results=True).execute(query)
+    names = list(result.keys())
+
+    writer_class = WRITERS[export_format]
+    path = os.path.join(directory, f"{table.name}-{since or 0}")
+    writer = None
+    rows = 0
+    watermark = since
+    try:
+        for batch in iter(lambda: result.fetchmany(batch_size), []):
+            columns = dict(zip(names, map(list, zip(*batch))))
+            if writer is None:
+                writer = writer_class(f"{path}.tmp", table)
+            writer.write_batch(columns)
+            rows += len(batch)
+            watermark = columns[watermark_column.name][-1]
+    finally:
+        result.close()
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        return ExportResult(table.name, None, 0, since)
+
+    # the file only gets its final name once it's complete
+    final_path = f"{path}-{watermark}.{writer_class.extension}"
+    os.replace(f"{path}.tmp", final_path)
+    write_watermark(directory, table.name, watermark)
+    return ExportResult(table.name, final_path, rows, watermark)
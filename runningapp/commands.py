@@ -0,0 +1,173 @@
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from runningapp.backfill import BACKFILLS, reset_checkpoints, run_backfill
+from runningapp.columnar import DEFAULT_FORMAT, export_table, WRITERS
+from runningapp.db import db, REPLICA_BIND
+from runningapp.migrations import upgrade
+from runningapp.models.training import TrainingModel, TrainingTombstoneModel
+from runningapp.models.user import UserProfileModel
+from runningapp.outbox import dispatch_pending_events
+from runningapp.reconciliation import reconcile_profile_counters
+
+EXPORT_TABLES = {
+    "trainings": TrainingModel.__table__,
+    "training_tombstones": TrainingTombstoneModel.__table__,
+    "user_profiles": UserProfileModel.__table__,
+}
+
+
+@click.command("upgrade-db")
+@with_appcontext
+def upgrade_db_command():
+    """Create the tables and apply the pending migrations"""
+    applied = upgrade()
+    for migration in applied:
+        click.echo(f"Applied {migration.version}: {migration.description}")
+    if not applied:
+        click.echo("The database is up to date.")
+
+
+@click.command("export-columnar")
+@click.option(
+    "--table",
+    "tables",
+    multiple=True,
+    type=click.Choice(sorted(EXPORT_TABLES)),
+    help="Table to export, all of them by default.",
+)
+@click.option("--output-dir", default="exports", show_default=True)
+@click.option(
+    "--since",
+    type=int,
+    help="Export the rows above this watermark "
+    "instead of the one of the last export.",
+)
+@click.option("--batch-size", default=10000, show_default=True)
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(sorted(WRITERS)),
+    default=DEFAULT_FORMAT,
+    show_default=True,
+)
+@with_appcontext
+def export_columnar_command(
+    tables, output_dir, since, batch_size, export_format
+):
+    """Export the new rows of the tables to columnar files
+    for the analytics"""
+    os.makedirs(output_dir, exist_ok=True)
+    # don't load the primary database if there is a replica
+    if current_app.config["DATABASE_REPLICA_URI"]:
+        engine = db.get_engine(bind=REPLICA_BIND)
+    else:
+        engine = db.engine
+    with engine.connect() as connection:
+        for name in tables or sorted(EXPORT_TABLES):
+            result = export_table(
+                connection,
+                EXPORT_TABLES[name],
+                output_dir,
+                since=since,
+                batch_size=batch_size,
+                export_format=export_format,
+            )
+            if result.path is None:
+                click.echo(f"{name}: no new rows.")
+            else:
+                click.echo(
+                    f"{name}: exported {result.rows} rows to {result.path}, "
+                    f"watermark {result.watermark}."
+                )
+
+
+@click.command("backfill")
+@click.argument("name", type=click.Choice(sorted(BACKFILLS)))
+@click.option("--workers", default=1, show_default=True)
+@click.option("--chunk-size", default=1000, show_default=True)
+@click.option(
+    "--max-rows-per-second",
+    type=float,
+    help="Throttle the backfill, unlimited by default.",
+)
+@click.option(
+    "--restart",
+    is_flag=True,
+    help="Start over instead of resuming from the checkpoints.",
+)
+@with_appcontext
+def backfill_command(name, workers, chunk_size, max_rows_per_second, restart):
+    """Recalculate the stored values of all the rows
+    after a change of a formula"""
+    if restart:
+        with db.engine.begin() as connection:
+            reset_checkpoints(connection, name)
+    result = run_backfill(
+        current_app._get_current_object(),
+        name,
+        workers=workers,
+        chunk_size=chunk_size,
+        max_rows_per_second=max_rows_per_second,
+    )
+    click.echo(
+        f"{name}: {result.rows} rows in {result.seconds:.1f}s, "
+        f"{result.rows_per_second:,.0f} rows/s."
+    )
+
+
+@click.command("reconcile-counters")
+@click.option("--batch-size", default=500, show_default=True)
+@click.option(
+    "--interval",
+    type=float,
+    help="Keep reconciling every this many seconds instead of once.",
+)
+@with_appcontext
+def reconcile_counters_command(batch_size, interval):
+    """Fix the trainings numbers and the kilometers run of the profiles
+    which don't match their trainings"""
+    while True:
+        result = reconcile_profile_counters(db.engine, batch_size)
+        click.echo(
+            f"Fixed {result.fixed} of {result.profiles} profiles "
+            f"in {result.seconds:.1f}s."
+        )
+        if interval is None:
+            return
+        time.sleep(interval)
+
+
+@click.command("dispatch-outbox")
+@click.option(
+    "--interval",
+    type=float,
+    help="Keep dispatching every this many seconds instead of once.",
+)
+@with_appcontext
+def dispatch_outbox_command(interval):
+    """Deliver the pending events of the trainings to the sinks,
+    for the deployments without the background dispatcher"""
+    sinks = current_app.extensions["outbox_sinks"]
+    if not sinks:
+        raise click.UsageError(
+            "Set OUTBOX_FILE_PATH or OUTBOX_HTTP_URL to deliver the events."
+        )
+    while True:
+        dispatched = dispatch_pending_events(sinks)
+        click.echo(f"Dispatched {dispatched} events.")
+        if interval is None:
+            return
+        time.sleep(interval)
+
+
+def register_commands(app):
+    """Register all the CLI commands"""
+    app.cli.add_command(upgrade_db_command)
+    app.cli.add_command(export_columnar_command)
+    app.cli.add_command(backfill_command)
+    app.cli.add_command(reconcile_counters_command)
+    app.cli.add_command(dispatch_outbox_command)
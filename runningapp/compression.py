@@ -0,0 +1,131 @@
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+class _ZlibStream:
+    """Streaming gzip or deflate compressor"""
+
+    def __init__(self, level: int, wbits: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    """Streaming brotli compressor"""
+
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+# encoding -> function creating a streaming compressor for the level,
+# in the order of preference
+STREAMS: Dict[str, Callable] = OrderedDict()
+if brotli is not None:
+    STREAMS["br"] = _BrotliStream
+STREAMS["gzip"] = lambda level: _ZlibStream(level, 16 + zlib.MAX_WBITS)
+STREAMS["deflate"] = lambda level: _ZlibStream(level, zlib.MAX_WBITS)
+
+
+def compress_body(data: bytes, encoding: str, level: int) -> bytes:
+    """Compress the whole data with the encoding"""
+    stream = STREAMS[encoding](level)
+    return stream.process(data) + stream.finish()
+
+
+def compress_stream(
+    chunks: Iterable[bytes], encoding: str, level: int
+) -> Iterable[bytes]:
+    """Compress the chunks of a streamed response as they are generated"""
+    stream = STREAMS[encoding](level)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            compressed = stream.process(chunk)
+            if compressed:
+                yield compressed
+        yield stream.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class Compress:
+    """Flask extension compressing the responses with the best encoding
+    the client accepts"""
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Register the compression of the responses in the app"""
+        app.config.setdefault("COMPRESS_ENABLED", True)
+        app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+        app.config.setdefault("COMPRESS_LEVEL", 6)
+        app.config.setdefault(
+            "COMPRESS_MIMETYPES",
+            [
+                "application/json",
+                "application/msgpack",
+                "application/x-ndjson",
+                "text/csv",
+                "text/plain",
+            ],
+        )
+        if not app.config["COMPRESS_ENABLED"]:
+            return
+        config = app.config
+
+        @app.after_request
+        def compress_response(response):
+            """Compress the response if it's worth it"""
+            if (
+                response.status_code < 200
+                or response.status_code in (204, 304)
+                or response.mimetype not in config["COMPRESS_MIMETYPES"]
+                or "Content-Encoding" in response.headers
+            ):
+                return response
+            response.vary.add("Accept-Encoding")
+            encoding = request.accept_encodings.best_match(list(STREAMS))
+            if encoding is None:
+                return response
+            level = config["COMPRESS_LEVEL"]
+
+            if response.is_streamed:
+                response.response = compress_stream(
+                    response.response, encoding, level
+                )
+                response.direct_passthrough = False
+                response.headers.pop("Content-Length", None)
+            else:
+                data = response.get_data()
+                if len(data) < config["COMPRESS_MIN_SIZE"]:
+                    return response
+                response.set_data(compress_body(data, encoding, level))
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+
+compress = Compress()
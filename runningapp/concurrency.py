@@ -0,0 +1,15 @@
+from flask import request
+
+CONFLICT_MESSAGE = (
+    "The resource has been changed in the meantime. "
+    "Get it again and retry."
+)
+
+
+def matches_if_match(instance) -> bool:
+    """Check if the client sending If-Match has the current version
+    of the instance, e.g. If-Match: "3", clients which don't send it
+    always do"""
+    if not request.if_match:
+        return True
+    return request.if_match.contains(str(instance.version))
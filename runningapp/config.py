@@ -16,8 +16,99 @@ class Config:
             file.write(f'SECRET_KEY="{os.urandom(24)}"')
         from runningapp.secret_key import SECRET_KEY
     SECRET_KEY = SECRET_KEY
-    SQLALCHEMY_DATABASE_URI = "sqlite:///data.db"
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "DATABASE_URL", "sqlite:///data.db"
+    )
+    # the GET endpoints read from the replica if it's set
+    DATABASE_REPLICA_URI = os.environ.get("DATABASE_REPLICA_URL")
+    READ_YOUR_WRITES_SECONDS = float(
+        os.environ.get("READ_YOUR_WRITES_SECONDS", 5)
+    )
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+    DB_STATEMENT_TIMEOUT_MS = int(
+        os.environ.get("DB_STATEMENT_TIMEOUT_MS", 5000)
+    )
+    SQLITE_PRAGMAS = {
+        "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": DB_STATEMENT_TIMEOUT_MS,
+        "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 268435456)),
+        "cache_size": int(os.environ.get("SQLITE_CACHE_SIZE", -64000)),
+    }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # keep the committed values so that the responses
+    # can be dumped without reloading the rows
+    SQLALCHEMY_EXPIRE_ON_COMMIT = False
     PROPAGATE_EXCEPTIONS = True
+    # apply pending migrations when the app starts,
+    # disable to run "flask upgrade-db" during deployment instead
+    AUTO_MIGRATE = os.environ.get("AUTO_MIGRATE", "1") == "1"
     JWT_BLACKLIST_ENABLED = True
     JWT_BLACKLIST_TOKEN_CHECKS = ["access", "refresh"]
+    RATELIMIT_ENABLED = True
+    RATELIMIT_DEFAULT = "300/minute"
+    RATELIMIT_ROUTES = {
+        "userlogin": "10/minute",
+        "userregister": "10/minute",
+        "traininglist": "120/minute",
+        "trainingexport": "10/minute",
+    }
+    # SQLite file shared by all the workers, e.g. /tmp/runningapp-limits.db
+    RATELIMIT_STORAGE_PATH = os.environ.get("RATELIMIT_STORAGE_PATH")
+    # the number of trainings fetched and streamed at once by the exports
+    EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", 500))
+    # the number of changes returned by a single /sync request
+    SYNC_PAGE_SIZE = int(os.environ.get("SYNC_PAGE_SIZE", 500))
+    # the number of ids a single ?ids= request can ask for
+    MULTI_GET_MAX_IDS = int(os.environ.get("MULTI_GET_MAX_IDS", 100))
+    # the number of people a single /bmi/batch
+    # or /daily-calories/batch request can calculate for
+    CALCULATOR_BATCH_MAX_ROWS = int(
+        os.environ.get("CALCULATOR_BATCH_MAX_ROWS", 50000)
+    )
+    BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 20))
+    # the number of GET requests of a batch dispatched at once
+    BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", 4))
+    # the number of threads running the background jobs, 0 to run none
+    JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", 2))
+    # how often the workers look for the jobs enqueued by other processes
+    JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", 1))
+    # a job is taken over by another worker if it's still running
+    # after this time, e.g. because its worker has been killed
+    JOBS_LEASE_SECONDS = int(os.environ.get("JOBS_LEASE_SECONDS", 300))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", 3))
+    # the number of trainings recalculated with a single UPDATE
+    JOBS_BATCH_SIZE = int(os.environ.get("JOBS_BATCH_SIZE", 500))
+    # the deleted rows are purged by a background job in batches
+    # with pauses between them, so that the writers aren't blocked for long
+    PURGE_BATCH_SIZE = int(os.environ.get("PURGE_BATCH_SIZE", 500))
+    PURGE_PAUSE_SECONDS = float(os.environ.get("PURGE_PAUSE_SECONDS", 0.05))
+    # how long the responses to the requests
+    # with an Idempotency-Key are returned to their retries
+    IDEMPOTENCY_TTL_SECONDS = int(
+        os.environ.get("IDEMPOTENCY_TTL_SECONDS", 86400)
+    )
+    # how long a request with an Idempotency-Key may be handled
+    # before its retries handle it again
+    IDEMPOTENCY_LEASE_SECONDS = int(
+        os.environ.get("IDEMPOTENCY_LEASE_SECONDS", 60)
+    )
+    # the events of the trainings are delivered by a background thread
+    # to the file and the URL if they're set, disable it to deliver them
+    # with the dispatch-outbox command instead
+    OUTBOX_DISPATCHER_ENABLED = (
+        os.environ.get("OUTBOX_DISPATCHER_ENABLED", "1") == "1"
+    )
+    OUTBOX_FILE_PATH = os.environ.get("OUTBOX_FILE_PATH")
+    OUTBOX_HTTP_URL = os.environ.get("OUTBOX_HTTP_URL")
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+    # a failed delivery is retried after 1, 2, 4... times this
+    OUTBOX_RETRY_SECONDS = float(os.environ.get("OUTBOX_RETRY_SECONDS", 1))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 10))
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "1") == "1"
+    # smaller responses aren't worth the CPU time of compressing them
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 500))
+    COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
@@ -1,3 +1,184 @@
-from flask_sqlalchemy import SQLAlchemy
+import math
+import time
+from functools import wraps
+from typing import Optional
 
-db = SQLAlchemy()
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import event, orm
+from sqlalchemy.pool import NullPool, QueuePool
+
+SQLITE_PRAGMAS_OPTION = "_sqlite_pragmas"
+REPLICA_BIND = "replica"
+READ_ONLY_ENVIRON_KEY = "runningapp.db_read_only"
+LAST_WRITE_ENVIRON_KEY = "runningapp.db_last_write"
+# the time of the last write of the client, which keeps its reads
+# on the primary until the replica has caught up
+LAST_WRITE_COOKIE = "last_write"
+
+
+def _record_write(session, flush_context) -> None:
+    """Remember that the author of the request has just written something"""
+    if has_request_context():
+        request.environ[LAST_WRITE_ENVIRON_KEY] = time.time()
+
+
+def get_last_write() -> Optional[float]:
+    """Get the time of the last write of the author of the request,
+    made by this request or sent back in the cookie by the client"""
+    written_at = request.environ.get(LAST_WRITE_ENVIRON_KEY)
+    if written_at is not None:
+        return written_at
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+def _has_written_recently(app) -> bool:
+    """Check if the author of the request has written something
+    within the read-your-writes window"""
+    written_at = get_last_write()
+    if written_at is None:
+        return False
+    # a time in the future can only come from a forged cookie
+    window = app.config["READ_YOUR_WRITES_SECONDS"]
+    return 0 <= time.time() - written_at < window
+
+
+def _set_last_write_cookie(response):
+    """Send the time of the write back to the client, so its next reads
+    go to the primary whichever worker handles them"""
+    written_at = request.environ.get(LAST_WRITE_ENVIRON_KEY)
+    if written_at is not None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            repr(written_at),
+            max_age=math.ceil(current_app.config["READ_YOUR_WRITES_SECONDS"]),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def read_only(function):
+    """Let the queries of the resource method go to the replica"""
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        request.environ[READ_ONLY_ENVIRON_KEY] = True
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+class RoutingSession(SignallingSession):
+    """Session which sends the queries of read only requests
+    to the replica and everything else to the primary database"""
+
+    def __init__(self, db, **options) -> None:
+        # sessionmaker always passes its own expire_on_commit
+        options["expire_on_commit"] = db.get_app().config[
+            "SQLALCHEMY_EXPIRE_ON_COMMIT"
+        ]
+        super().__init__(db, **options)
+        self.db = db
+        event.listen(self, "after_flush", _record_write)
+
+    def get_bind(self, mapper=None, clause=None):
+        """Choose the replica for reads of read only resource methods
+        unless the author of the request has just written something"""
+        if (
+            not self._flushing
+            and self.app.config["DATABASE_REPLICA_URI"]
+            and has_request_context()
+            and request.environ.get(READ_ONLY_ENVIRON_KEY)
+            and not _has_written_recently(self.app)
+        ):
+            return self.db.get_engine(self.app, bind=REPLICA_BIND)
+        return super().get_bind(mapper, clause)
+
+
+class RunningAppSQLAlchemy(SQLAlchemy):
+    """SQLAlchemy extension which configures the engine
+    from the DB_* and SQLITE_PRAGMAS config values
+    and routes the reads to the replica if there is one"""
+
+    def init_app(self, app) -> None:
+        """Register the replica as a bind if it's configured"""
+        app.config.setdefault("DATABASE_REPLICA_URI", None)
+        app.config.setdefault("READ_YOUR_WRITES_SECONDS", 5)
+        app.config.setdefault("SQLALCHEMY_EXPIRE_ON_COMMIT", True)
+        super().init_app(app)
+        app.after_request(_set_last_write_cookie)
+        if app.config["DATABASE_REPLICA_URI"]:
+            app.config["SQLALCHEMY_BINDS"] = {
+                **(app.config["SQLALCHEMY_BINDS"] or {}),
+                REPLICA_BIND: app.config["DATABASE_REPLICA_URI"],
+            }
+
+    def create_session(self, options):
+        """Create the session factory for the routing session"""
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def apply_driver_hacks(self, app, sa_url, options) -> None:
+        """Set the pool options, the statement timeout
+        and the SQLite pragmas for the engine"""
+        super().apply_driver_hacks(app, sa_url, options)
+        config = app.config
+        pool_options = {
+            "pool_size": config["DB_POOL_SIZE"],
+            "max_overflow": config["DB_MAX_OVERFLOW"],
+            "pool_recycle": config["DB_POOL_RECYCLE"],
+            "pool_timeout": config["DB_POOL_TIMEOUT"],
+        }
+        timeout_ms = config["DB_STATEMENT_TIMEOUT_MS"]
+        connect_args = options.setdefault("connect_args", {})
+
+        if sa_url.drivername.startswith("sqlite"):
+            # Flask-SQLAlchemy opens a new connection to a file database
+            # for every session, keep them in a pool unless the size is 0
+            if options.get("poolclass") is NullPool and config["DB_POOL_SIZE"]:
+                options["poolclass"] = QueuePool
+                options.update(pool_options)
+                connect_args["check_same_thread"] = False
+            connect_args["timeout"] = timeout_ms / 1000
+            options[SQLITE_PRAGMAS_OPTION] = dict(config["SQLITE_PRAGMAS"])
+            return
+
+        options.update(pool_options)
+        options["pool_pre_ping"] = True
+        if sa_url.drivername.startswith("postgresql"):
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+        elif sa_url.drivername.startswith("mysql"):
+            connect_args[
+                "init_command"
+            ] = f"SET SESSION max_execution_time={timeout_ms}"
+
+    def create_engine(self, sa_url, engine_opts):
+        """Create the engine and set the SQLite pragmas on every connection"""
+        pragmas = engine_opts.pop(SQLITE_PRAGMAS_OPTION, None)
+        engine = super().create_engine(sa_url, engine_opts)
+        if pragmas:
+
+            @event.listens_for(engine, "connect")
+            def set_sqlite_pragmas(dbapi_connection, connection_record):
+                """Set the pragmas on a new SQLite connection"""
+                cursor = dbapi_connection.cursor()
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+                cursor.close()
+
+        return engine
+
+
+db = RunningAppSQLAlchemy()
+
+
+def save_all_to_db(*instances, deleted=()) -> None:
+    """Save the instances and delete the deleted ones
+    in a single transaction"""
+    db.session.add_all(instances)
+    for instance in deleted:
+        db.session.delete(instance)
+    db.session.commit()
@@ -0,0 +1,112 @@
+import time
+from typing import NamedTuple
+
+from flask import current_app
+
+from runningapp.db import db
+from runningapp.jobs import enqueue, job_handler
+from runningapp.models.job import JobModel
+from runningapp.models.training import TrainingModel, TrainingTombstoneModel
+from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.versions import bump_versions
+
+PURGE_DELETED_JOB = "purge_deleted"
+
+
+class PurgeResult(NamedTuple):
+    trainings: int
+    users: int
+
+
+def enqueue_purge() -> JobModel:
+    """Add the job purging the deleted rows to the session
+    unless it's already pending"""
+    return enqueue(PURGE_DELETED_JOB, PURGE_DELETED_JOB, {})
+
+
+def delete_user(user: UserModel) -> None:
+    """Mark the user deleted, which hides them with their profile
+    and trainings at once, and let the purge job remove their rows"""
+    user_id = user.id
+    user.mark_deleted()
+    # the trainings of the user aren't touched, so bump their versions
+    # here, the global totals are computed from the trainings
+    bump_versions(
+        db.session.connection(),
+        ["user_profiles", "trainings", f"trainings:user:{user_id}"],
+    )
+    enqueue_purge()
+    db.session.commit()
+
+
+def _delete_in_batches(table, condition, batch_size: int, pause: float) -> int:
+    """Delete the rows matching the condition a batch at a time,
+    every batch in its own short transaction followed by a pause
+    which lets the other writers in, return the number of deleted rows"""
+    deleted = 0
+    while True:
+        ids = [
+            row.id
+            for row in db.session.execute(
+                db.select([table.c.id])
+                .where(condition)
+                .order_by(table.c.id)
+                .limit(batch_size)
+            )
+        ]
+        if not ids:
+            return deleted
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+def _delete_user_rows(user_id: int) -> None:
+    """Delete the user and the rest of the rows which belong to them
+    with a statement per table, in the current transaction"""
+    for table, column in (
+        (TrainingModel.__table__, "user_id"),
+        (TrainingTombstoneModel.__table__, "user_id"),
+        (JobModel.__table__, "user_id"),
+        (UserProfileModel.__table__, "user_id"),
+        (UserModel.__table__, "id"),
+    ):
+        db.session.execute(table.delete().where(table.c[column] == user_id))
+
+
+def purge_deleted(batch_size: int, pause: float) -> PurgeResult:
+    """Remove the deleted trainings and users from the database
+    in small batches, pausing between them to keep the write locks short"""
+    trainings = TrainingModel.__table__
+    users = UserModel.__table__
+    purged = _delete_in_batches(
+        trainings, trainings.c.deleted_at.isnot(None), batch_size, pause
+    )
+    user_ids = [
+        row.id
+        for row in db.session.execute(
+            db.select([users.c.id]).where(users.c.deleted_at.isnot(None))
+        )
+    ]
+    db.session.commit()
+    for user_id in user_ids:
+        purged += _delete_in_batches(
+            trainings, trainings.c.user_id == user_id, batch_size, pause
+        )
+        _delete_user_rows(user_id)
+        db.session.commit()
+        time.sleep(pause)
+    return PurgeResult(purged, len(user_ids))
+
+
+@job_handler(PURGE_DELETED_JOB)
+def _purge_deleted_job(payload: dict) -> int:
+    """Purge the deleted rows, return the number of purged trainings"""
+    config = current_app.config
+    result = purge_deleted(
+        config["PURGE_BATCH_SIZE"], config["PURGE_PAUSE_SECONDS"]
+    )
+    return result.trainings
@@ -0,0 +1,175 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from flask_restful.utils import unpack
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import FlushError
+
+from runningapp.db import db
+from runningapp.models.idempotency import (
+    IDEMPOTENCY_DONE,
+    IDEMPOTENCY_PENDING,
+    IdempotencyKeyModel,
+)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# the fields of the responses which aren't stored with the keys,
+# the retries get the rest of the response without them
+SECRET_FIELDS = ("access_token", "refresh_token")
+
+
+def _get_scope() -> str:
+    """Get the user or, if nobody is logged in, the IP address
+    the keys of the request belong to"""
+    identity = get_jwt_identity()
+    if identity is not None:
+        return f"user:{identity}"
+    return f"ip:{request.remote_addr}"
+
+
+def _hash_request() -> str:
+    """Hash the method, the path and the body of the request"""
+    digest = hashlib.sha256()
+    digest.update(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _get_lease_end(now: datetime) -> datetime:
+    """Get the time until which the claimed key is left to its request"""
+    return now + timedelta(
+        seconds=current_app.config["IDEMPOTENCY_LEASE_SECONDS"]
+    )
+
+
+def _take_over_key(
+    scope: str, key: str, request_hash: str, now: datetime
+) -> bool:
+    """Claim the pending key of the same request whose lease has ended,
+    e.g. because its process has crashed, return if it's been claimed"""
+    table = IdempotencyKeyModel.__table__
+    result = db.session.execute(
+        table.update()
+        .where(table.c.scope == scope)
+        .where(table.c.key == key)
+        .where(table.c.request_hash == request_hash)
+        .where(table.c.status == IDEMPOTENCY_PENDING)
+        .where(table.c.locked_until.is_(None) | (table.c.locked_until < now))
+        .values(locked_until=_get_lease_end(now))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _claim_key(scope: str, key: str, request_hash: str):
+    """Save the key as pending and return it with True,
+    or return the key saved by an earlier request
+    with True if its lease has ended and it's been taken over"""
+    now = datetime.utcnow()
+    IdempotencyKeyModel.delete_expired(scope, now)
+    claimed = IdempotencyKeyModel(
+        scope=scope,
+        key=key,
+        request_hash=request_hash,
+        expires_at=now
+        + timedelta(seconds=current_app.config["IDEMPOTENCY_TTL_SECONDS"]),
+        locked_until=_get_lease_end(now),
+    )
+    db.session.add(claimed)
+    try:
+        db.session.commit()
+    except (IntegrityError, FlushError):
+        # a concurrent request with the same key has saved it first
+        # or the session has already loaded the saved key
+        db.session.rollback()
+        taken_over = _take_over_key(scope, key, request_hash, now)
+        stored = IdempotencyKeyModel.find_by_scope_and_key(scope, key)
+        if stored is not None:
+            # the session may have loaded it before the update
+            db.session.refresh(stored)
+        return stored, taken_over
+    return claimed, True
+
+
+def _strip_secrets(data):
+    """Leave the secrets out of the response before it's stored"""
+    if not isinstance(data, dict):
+        return data
+    return {
+        name: value
+        for name, value in data.items()
+        if name not in SECRET_FIELDS
+    }
+
+
+def idempotent(function):
+    """Run the resource method once for every Idempotency-Key
+    and return the stored response to the retries
+
+    A retry of a request still being handled gets 409
+    until the lease of the request ends,
+    a key reused with another request gets 422.
+    The responses with a 5xx status code aren't stored,
+    so those requests can be retried, and the stored ones
+    are stored without the tokens.
+    """
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if not key:
+            return function(*args, **kwargs)
+        if len(key) > 255:
+            return {"message": f"{IDEMPOTENCY_KEY_HEADER} is too long."}, 400
+
+        scope = _get_scope()
+        request_hash = _hash_request()
+        stored, claimed = _claim_key(scope, key, request_hash)
+        if not claimed:
+            if stored is None:
+                # the key has expired and been deleted in the meantime
+                return (
+                    {"message": "The request is being processed, retry it."},
+                    409,
+                )
+            if stored.request_hash != request_hash:
+                return (
+                    {
+                        "message": f"The {IDEMPOTENCY_KEY_HEADER} has been "
+                        f"used with another request."
+                    },
+                    422,
+                )
+            if stored.status != IDEMPOTENCY_DONE:
+                return (
+                    {"message": "The request is being processed, retry it."},
+                    409,
+                )
+            return (
+                stored.response_body,
+                stored.response_code,
+                {REPLAYED_HEADER: "true"},
+            )
+
+        try:
+            data, code, headers = unpack(function(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            db.session.delete(stored)
+            db.session.commit()
+            raise
+        if code >= 500:
+            db.session.rollback()
+            db.session.delete(stored)
+        else:
+            stored.status = IDEMPOTENCY_DONE
+            stored.response_code = code
+            stored.response_body = _strip_secrets(data)
+        db.session.commit()
+        return data, code, headers
+
+    return wrapper
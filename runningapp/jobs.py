@@ -0,0 +1,268 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import load_only
+
+from runningapp.calculations import (
+    calculate_average_tempo,
+    calculate_calories_burnt,
+)
+from runningapp.db import db, RoutingSession
+from runningapp.models.job import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JobModel,
+)
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+
+# set in the info of a session which has enqueued a job
+JOBS_ENQUEUED_KEY = "runningapp.jobs_enqueued"
+RECALCULATE_CALORIES_JOB = "recalculate_calories"
+
+HANDLERS: Dict[str, Callable] = {}
+
+
+def job_handler(kind: str) -> Callable:
+    """Register a function as the handler of the jobs of the kind,
+    called with the payload of the job"""
+
+    def decorator(function: Callable) -> Callable:
+        HANDLERS[kind] = function
+        return function
+
+    return decorator
+
+
+def enqueue(kind: str, key: str, payload: dict, user_id=None) -> JobModel:
+    """Add the job to the session unless a job with the same key
+    is still pending, the workers pick it up once the session is committed"""
+    job = JobModel.find_pending_by_key(key)
+    if job is None:
+        job = JobModel(kind=kind, key=key, payload=payload, user_id=user_id)
+        db.session.add(job)
+    db.session.info[JOBS_ENQUEUED_KEY] = True
+    return job
+
+
+def _claim_next_job(
+    now: datetime,
+) -> Tuple[Optional[JobModel], Optional[str]]:
+    """Claim the next job together with the pending jobs with the same key,
+    return it with the token of the claim"""
+    job = JobModel.find_next(now)
+    if job is None:
+        db.session.commit()
+        return None, None
+    table = JobModel.__table__
+    token = uuid.uuid4().hex
+    claimed = db.session.execute(
+        table.update()
+        .where(table.c.key == job.key)
+        .where(
+            (table.c.status == JOB_PENDING)
+            | ((table.c.status == JOB_RUNNING) & (table.c.locked_until < now))
+        )
+        .values(
+            status=JOB_RUNNING,
+            locked_by=token,
+            locked_until=now
+            + timedelta(seconds=current_app.config["JOBS_LEASE_SECONDS"]),
+            started_at=now,
+            attempts=table.c.attempts + 1,
+        )
+    ).rowcount
+    db.session.commit()
+    # another worker has been faster
+    if not claimed:
+        return job, None
+    return job, token
+
+
+def _finish_jobs(token: str, result=None, error: Exception = None) -> None:
+    """Record the result of the jobs claimed together
+    or give them another attempt if they have failed"""
+    now = datetime.utcnow()
+    for job in JobModel.find_all_by_locked_by(token):
+        job.locked_by = None
+        job.locked_until = None
+        if error is None:
+            job.status = JOB_DONE
+            job.result = result
+        elif job.attempts < current_app.config["JOBS_MAX_ATTEMPTS"]:
+            job.status = JOB_PENDING
+            continue
+        else:
+            job.status = JOB_FAILED
+            job.error = str(error)[:500]
+        job.finished_at = now
+    db.session.commit()
+
+
+def run_next_job() -> bool:
+    """Run the next job, return False if there are no jobs to run"""
+    job, token = _claim_next_job(datetime.utcnow())
+    if job is None:
+        return False
+    if token is None:
+        return True
+    try:
+        result = HANDLERS[job.kind](job.payload)
+    except Exception as error:
+        db.session.rollback()
+        current_app.logger.exception("Job %s has failed", job.id)
+        _finish_jobs(token, error=error)
+    else:
+        _finish_jobs(token, result)
+    return True
+
+
+def run_pending_jobs() -> int:
+    """Run the jobs until there are none left, return their number"""
+    ran = 0
+    while run_next_job():
+        ran += 1
+    return ran
+
+
+class _JobWorkers:
+    """Worker threads of a single application"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def start(self) -> None:
+        """Start the workers unless they're running"""
+        with self.lock:
+            if self.threads:
+                return
+            for number in range(self.app.config["JOBS_WORKERS"]):
+                thread = threading.Thread(
+                    target=self._work_forever,
+                    name=f"job-worker-{number}",
+                    daemon=True,
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def wake(self) -> None:
+        """Let the workers know there is a new job"""
+        self.start()
+        self.wakeup.set()
+
+    def stop(self) -> None:
+        """Stop the workers once they finish their jobs"""
+        with self.lock:
+            self.stopping.set()
+            self.wakeup.set()
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
+            self.stopping.clear()
+
+    def _work_forever(self) -> None:
+        """Run the jobs, waiting for new ones when there are none left"""
+        with self.app.app_context():
+            while not self.stopping.is_set():
+                try:
+                    ran = run_next_job()
+                except Exception:
+                    self.app.logger.exception("The job worker has failed")
+                    ran = False
+                finally:
+                    db.session.remove()
+                if not ran:
+                    self.wakeup.wait(self.app.config["JOBS_POLL_INTERVAL"])
+                    self.wakeup.clear()
+
+
+class JobQueue:
+    """Run the jobs saved in the jobs table by a pool of worker threads"""
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Register the workers in the app,
+        they are started by the first request or job"""
+        app.config.setdefault("JOBS_WORKERS", 2)
+        app.config.setdefault("JOBS_POLL_INTERVAL", 1.0)
+        app.config.setdefault("JOBS_LEASE_SECONDS", 300)
+        app.config.setdefault("JOBS_MAX_ATTEMPTS", 3)
+        app.config.setdefault("JOBS_BATCH_SIZE", 500)
+        workers = _JobWorkers(app)
+        app.extensions["job_workers"] = workers
+        # the jobs left by the previous run are picked up
+        app.before_first_request(workers.start)
+
+
+job_queue = JobQueue()
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _wake_workers(session) -> None:
+    """Wake the workers up once the enqueued jobs are committed"""
+    if session.info.pop(JOBS_ENQUEUED_KEY, False):
+        session.app.extensions["job_workers"].wake()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_enqueued_jobs(session) -> None:
+    session.info.pop(JOBS_ENQUEUED_KEY, None)
+
+
+@job_handler(RECALCULATE_CALORIES_JOB)
+def recalculate_calories(payload: dict) -> int:
+    """Recalculate the calories burnt during the trainings of the user
+    with the current weight, return the number of updated trainings"""
+    user_id = payload["user_id"]
+    user_profile = UserProfileModel.find_by_user_id(user_id)
+    if user_profile is None:
+        return 0
+    weight = user_profile.weight
+    batch_size = current_app.config["JOBS_BATCH_SIZE"]
+    options = [
+        load_only(
+            TrainingModel.id,
+            TrainingModel.user_id,
+            TrainingModel.distance,
+            TrainingModel.time_in_seconds,
+            TrainingModel.calories,
+            # only the trainings still at this version are updated
+            TrainingModel.version,
+        )
+    ]
+    updated = 0
+    after_id = 0
+    while True:
+        trainings = TrainingModel.find_page_by_user_id(
+            user_id, after_id, batch_size, options
+        )
+        if not trainings:
+            return updated
+        changes = []
+        for training in trainings:
+            avg_tempo = calculate_average_tempo(
+                training.distance, training.time_in_seconds
+            )
+            calories = calculate_calories_burnt(
+                avg_tempo, weight, training.time_in_seconds
+            )
+            if calories != training.calories:
+                changes.append((training, calories))
+        after_id = trainings[-1].id
+        # the changed trainings of the batch are updated by one statement
+        TrainingModel.update_calories(changes)
+        db.session.commit()
+        updated += len(changes)
@@ -0,0 +1,247 @@
+import math
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import jsonify, request
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.config import config as jwt_config
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """Parse a limit such as "10/minute"
+    into the bucket capacity and the refill rate (tokens per second)"""
+    amount, period = limit.split("/")
+    capacity = float(amount)
+    return capacity, capacity / PERIODS[period.strip()]
+
+
+class TokenBucket:
+    """Token bucket which remembers how many tokens have been consumed
+    since it was last synchronized with the shared store"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated", "consumed")
+
+    def __init__(self, capacity: float, rate: float, now: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+        self.consumed = 0.0
+
+    def hit(self, now: float) -> float:
+        """Take a token from the bucket.
+        Return 0 if it was allowed or the number of seconds to wait"""
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        self.updated = now
+        if tokens < 1:
+            self.tokens = tokens
+            return (1 - tokens) / self.rate
+        self.tokens = tokens - 1
+        self.consumed += 1
+        return 0.0
+
+    def is_full(self, now: float) -> bool:
+        """Check if the bucket has been refilled completely"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class SharedStore:
+    """SQLite table shared by all the workers on the host"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        connection = self._connect()
+        try:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits "
+                "(key TEXT PRIMARY KEY, tokens REAL, updated REAL)"
+            )
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection to the shared database"""
+        connection = sqlite3.connect(
+            self.path, timeout=5, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def sync(self, usage: Dict[str, Tuple[float, float, float]]) -> dict:
+        """Apply the tokens consumed locally to the shared buckets
+        and return the number of tokens left in every bucket"""
+        now = time.time()
+        result = {}
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for key, (consumed, capacity, rate) in usage.items():
+                row = connection.execute(
+                    "SELECT tokens, updated FROM rate_limits WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                tokens = capacity
+                if row:
+                    tokens = min(capacity, row[0] + (now - row[1]) * rate)
+                tokens = max(tokens - consumed, 0.0)
+                connection.execute(
+                    "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?)",
+                    (key, tokens, now),
+                )
+                result[key] = tokens
+            connection.execute("COMMIT")
+        finally:
+            connection.close()
+        return result
+
+
+class _LimiterState:
+    """Buckets of a single application"""
+
+    def __init__(self, app) -> None:
+        self.default = parse_limit(app.config["RATELIMIT_DEFAULT"])
+        self.routes = {
+            endpoint: parse_limit(limit)
+            for endpoint, limit in app.config["RATELIMIT_ROUTES"].items()
+        }
+        self.max_buckets = app.config["RATELIMIT_MAX_BUCKETS"]
+        self.sync_interval = app.config["RATELIMIT_SYNC_INTERVAL"]
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.identities: Dict[str, Optional[str]] = {}
+        self.lock = threading.Lock()
+        self.store = None
+        if app.config["RATELIMIT_STORAGE_PATH"]:
+            self.store = SharedStore(app.config["RATELIMIT_STORAGE_PATH"])
+            thread = threading.Thread(target=self._sync_forever, daemon=True)
+            thread.start()
+
+    def _sync_forever(self) -> None:
+        """Synchronize the buckets with the shared store periodically"""
+        while True:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+            except sqlite3.Error:
+                pass  # keep limiting locally until the store is back
+
+    def sync(self) -> None:
+        """Push the local usage to the shared store
+        and pull the tokens consumed by the other workers"""
+        with self.lock:
+            usage = {
+                key: (bucket.consumed, bucket.capacity, bucket.rate)
+                for key, bucket in self.buckets.items()
+                if bucket.consumed
+            }
+            for key in usage:
+                self.buckets[key].consumed = 0.0
+        if not usage:
+            return
+        shared = self.store.sync(usage)
+        now = time.monotonic()
+        with self.lock:
+            for key, tokens in shared.items():
+                bucket = self.buckets.get(key)
+                if bucket:
+                    bucket.tokens = tokens - bucket.consumed
+                    bucket.updated = now
+
+    def hit(self, endpoint: str, client: str) -> float:
+        """Take a token from the client's bucket for the endpoint"""
+        key = f"{endpoint}:{client}"
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_buckets:
+                    self._prune(now)
+                capacity, rate = self.routes.get(endpoint, self.default)
+                bucket = self.buckets[key] = TokenBucket(capacity, rate, now)
+            return bucket.hit(now)
+
+    def _prune(self, now: float) -> None:
+        """Forget the buckets which have been refilled completely
+        and whose usage has already been synchronized"""
+        for key in [
+            key
+            for key, bucket in self.buckets.items()
+            if bucket.is_full(now) and not (self.store and bucket.consumed)
+        ]:
+            del self.buckets[key]
+
+
+class RateLimiter:
+    """Flask extension limiting the requests per user and per IP address
+    with token buckets kept in memory"""
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Register the limiter in the app"""
+        app.config.setdefault("RATELIMIT_ENABLED", True)
+        app.config.setdefault("RATELIMIT_DEFAULT", "300/minute")
+        app.config.setdefault("RATELIMIT_ROUTES", {})
+        app.config.setdefault("RATELIMIT_STORAGE_PATH", None)
+        app.config.setdefault("RATELIMIT_SYNC_INTERVAL", 1.0)
+        app.config.setdefault("RATELIMIT_MAX_BUCKETS", 10000)
+        if not app.config["RATELIMIT_ENABLED"]:
+            return
+        state = _LimiterState(app)
+        app.extensions["rate_limiter"] = state
+
+        @app.before_request
+        def check_rate_limit():
+            """Reject the request if the client has run out of tokens"""
+            if request.endpoint is None:
+                return None
+            retry_after = state.hit(request.endpoint, _get_client(state))
+            if retry_after:
+                response = jsonify(
+                    {
+                        "message": "Too many requests. Try again later.",
+                        "error": "rate_limited",
+                    }
+                )
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(retry_after))
+                return response
+            return None
+
+
+def _get_client(state: _LimiterState) -> str:
+    """Identify the client by the user id from a valid access token
+    or by the IP address otherwise"""
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        identity = state.identities.get(authorization, False)
+        if identity is False:
+            identity = _decode_identity(authorization)
+            if len(state.identities) >= state.max_buckets:
+                state.identities.clear()
+            state.identities[authorization] = identity
+        if identity is not None:
+            return f"user:{identity}"
+    return f"ip:{request.remote_addr}"
+
+
+def _decode_identity(authorization: str) -> Optional[str]:
+    """Return the identity from the bearer token if its signature is valid"""
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0] != "Bearer":
+        return None
+    try:
+        token = decode_token(parts[1], allow_expired=True)
+        return str(token[jwt_config.identity_claim_key])
+    except Exception:
+        return None
+
+
+limiter = RateLimiter()
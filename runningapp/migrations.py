@@ -0,0 +1,327 @@
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import inspect
+from sqlalchemy.sql import column, table
+from runningapp.db import db
+
+# Every migration has to be idempotent:
+# the first one creates the whole current schema on an empty database,
+# so the later ones may find their tables, columns or indexes already there.
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable
+
+
+MIGRATIONS: List[Migration] = []
+
+schema_migrations = db.Table(
+    "schema_migrations",
+    db.Column("version", db.Integer, primary_key=True),
+    db.Column("description", db.String(200), nullable=False),
+    db.Column("applied_at", db.DateTime, nullable=False),
+)
+
+
+def migration(version: int, description: str) -> Callable:
+    """Register a function as the migration with the given version"""
+
+    def decorator(function: Callable) -> Callable:
+        MIGRATIONS.append(Migration(version, description, function))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return function
+
+    return decorator
+
+
+def create_table_if_missing(connection, table) -> None:
+    """Create the table if it doesn't exist yet"""
+    table.create(bind=connection, checkfirst=True)
+
+
+def get_index(model, name: str):
+    """Get the index declared on the model's table by its name"""
+    return next(i for i in model.__table__.indexes if i.name == name)
+
+
+def create_index_if_missing(connection, index) -> None:
+    """Create the index if it doesn't exist yet"""
+    existing = {
+        existing_index["name"]
+        for existing_index in inspect(connection).get_indexes(
+            index.table.name
+        )
+    }
+    if index.name not in existing:
+        index.create(bind=connection)
+
+
+def add_column_if_missing(connection, table, column) -> None:
+    """Add the column to the existing table if it doesn't have it yet"""
+    existing = {c["name"] for c in inspect(connection).get_columns(table.name)}
+    if column.name in existing:
+        return
+    column_type = column.type.compile(dialect=connection.dialect)
+    ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+    default = column.server_default
+    if default is not None:
+        ddl += f" DEFAULT {default.arg}"
+    connection.execute(ddl)
+
+
+def recount_profile_counters(connection, skip_deleted: bool = False) -> None:
+    """Set the counters of all the profiles from their trainings,
+    or only the ones not marked deleted, with the columns declared here,
+    so that the migrations keep doing what they did when they shipped"""
+    from runningapp.versions import bump_versions
+
+    profiles = table(
+        "user_profiles",
+        column("user_id"),
+        column("trainings_number"),
+        column("kilometers_run"),
+    )
+    trainings = table(
+        "trainings",
+        column("id"),
+        column("user_id"),
+        column("distance"),
+        column("deleted_at"),
+    )
+    of_profile = trainings.c.user_id == profiles.c.user_id
+    if skip_deleted:
+        of_profile = db.and_(of_profile, trainings.c.deleted_at.is_(None))
+    connection.execute(
+        profiles.update().values(
+            trainings_number=db.select([db.func.count(trainings.c.id)])
+            .where(of_profile)
+            .as_scalar(),
+            kilometers_run=db.select(
+                [db.func.coalesce(db.func.sum(trainings.c.distance), 0)]
+            )
+            .where(of_profile)
+            .as_scalar(),
+        )
+    )
+    user_ids = connection.execute(db.select([profiles.c.user_id]))
+    keys = [f"user:{row.user_id}" for row in user_ids]
+    bump_versions(connection, ["users", "user_profiles"] + keys)
+
+
+def alter_column_type(connection, table, column) -> None:
+    """Change the type of the existing column to the declared one"""
+    # SQLite can't change the types, but it stores every value as it is
+    if connection.dialect.name == "sqlite":
+        return
+    column_type = column.type.compile(dialect=connection.dialect)
+    if connection.dialect.name == "mysql":
+        ddl = f"ALTER TABLE {table.name} MODIFY {column.name} {column_type}"
+    else:
+        ddl = (
+            f"ALTER TABLE {table.name} "
+            f"ALTER COLUMN {column.name} TYPE {column_type}"
+        )
+    connection.execute(ddl)
+
+
+def get_applied_versions(connection) -> set:
+    """Get the versions of the migrations which have already been applied"""
+    create_table_if_missing(connection, schema_migrations)
+    return {
+        row.version
+        for row in connection.execute(schema_migrations.select()).fetchall()
+    }
+
+
+def upgrade() -> List[Migration]:
+    """Apply all the pending migrations, each one in its own transaction,
+    and return them"""
+    engine = db.get_engine()
+    with engine.connect() as connection:
+        applied_versions = get_applied_versions(connection)
+    pending = [m for m in MIGRATIONS if m.version not in applied_versions]
+    for pending_migration in pending:
+        with engine.begin() as connection:
+            pending_migration.apply(connection)
+            connection.execute(
+                schema_migrations.insert().values(
+                    version=pending_migration.version,
+                    description=pending_migration.description,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+    return pending
+
+
+@migration(1, "Create the initial tables")
+def _create_initial_tables(connection) -> None:
+    # import the models so that all the tables are registered
+    import runningapp.models.training  # noqa: F401
+    import runningapp.models.user  # noqa: F401
+
+    db.metadata.create_all(bind=connection)
+
+
+@migration(2, "Index trainings by user id and name")
+def _index_trainings_by_user(connection) -> None:
+    from runningapp.models.training import TrainingModel
+
+    create_index_if_missing(
+        connection, get_index(TrainingModel, "ix_trainings_user_id_name")
+    )
+
+
+@migration(3, "Create the data versions table")
+def _create_data_versions(connection) -> None:
+    from runningapp.versions import data_versions
+
+    create_table_if_missing(connection, data_versions)
+
+
+@migration(4, "Track the changes of trainings for the delta sync")
+def _track_training_changes(connection) -> None:
+    from runningapp.models.training import (
+        CHANGE_SEQ_KEY,
+        TrainingModel,
+        TrainingTombstoneModel,
+    )
+    from runningapp.versions import data_versions
+
+    table = TrainingModel.__table__
+    add_column_if_missing(connection, table, table.c.updated_at)
+    add_column_if_missing(connection, table, table.c.change_seq)
+    create_index_if_missing(
+        connection, get_index(TrainingModel, "ix_trainings_user_id_change_seq")
+    )
+    create_table_if_missing(connection, TrainingTombstoneModel.__table__)
+    # number the existing trainings and continue the sequence after them
+    connection.execute(
+        table.update()
+        .where(table.c.change_seq.is_(None))
+        .values(change_seq=table.c.id, updated_at=table.c.date)
+    )
+    last = connection.execute(
+        db.select([db.func.max(table.c.change_seq)])
+    ).scalar()
+    connection.execute(
+        data_versions.delete().where(data_versions.c.key == CHANGE_SEQ_KEY)
+    )
+    connection.execute(
+        data_versions.insert(), key=CHANGE_SEQ_KEY, version=last or 0
+    )
+
+
+@migration(5, "Create the jobs table")
+def _create_jobs(connection) -> None:
+    from runningapp.models.job import JobModel
+
+    create_table_if_missing(connection, JobModel.__table__)
+
+
+@migration(6, "Create the backfill checkpoints table")
+def _create_backfill_checkpoints(connection) -> None:
+    from runningapp.backfill import backfill_checkpoints
+
+    create_table_if_missing(connection, backfill_checkpoints)
+
+
+@migration(7, "Store the distances and the kilometers run as doubles")
+def _store_kilometers_as_doubles(connection) -> None:
+    from runningapp.models.training import TrainingModel
+    from runningapp.models.user import UserProfileModel
+
+    trainings = TrainingModel.__table__
+    profiles = UserProfileModel.__table__
+    alter_column_type(connection, trainings, trainings.c.distance)
+    alter_column_type(connection, profiles, profiles.c.kilometers_run)
+    # the kilometers run have been truncated to integers so far
+    recount_profile_counters(connection)
+
+
+@migration(8, "Mark the deleted users and trainings")
+def _mark_deleted_rows(connection) -> None:
+    from runningapp.models.training import TrainingModel
+    from runningapp.models.user import UserModel
+
+    for model, indexes in (
+        (UserModel, ["ix_users_deleted_at"]),
+        (
+            TrainingModel,
+            ["ix_trainings_live_user_id", "ix_trainings_deleted_at"],
+        ),
+    ):
+        table = model.__table__
+        add_column_if_missing(connection, table, table.c.deleted_at)
+        for name in indexes:
+            create_index_if_missing(connection, get_index(model, name))
+
+
+@migration(9, "Fix the kilometers run truncated to integers")
+def _fix_truncated_kilometers(connection) -> None:
+    # migration 7 counted the trainings marked deleted since then too
+    recount_profile_counters(connection, skip_deleted=True)
+
+
+@migration(10, "Create the idempotency keys table")
+def _create_idempotency_keys(connection) -> None:
+    from runningapp.models.idempotency import IdempotencyKeyModel
+
+    create_table_if_missing(connection, IdempotencyKeyModel.__table__)
+
+
+@migration(11, "Version the trainings and the user profiles")
+def _version_trainings_and_profiles(connection) -> None:
+    from runningapp.models.training import TrainingModel
+    from runningapp.models.user import UserProfileModel
+
+    for model in (TrainingModel, UserProfileModel):
+        table = model.__table__
+        add_column_if_missing(connection, table, table.c.version)
+
+
+@migration(12, "Create the outbox events table")
+def _create_outbox_events(connection) -> None:
+    from runningapp.models.outbox import OutboxEventModel
+
+    create_table_if_missing(connection, OutboxEventModel.__table__)
+
+
+@migration(13, "Track the changes of user profiles for the exports")
+def _track_profile_changes(connection) -> None:
+    from runningapp.models.user import PROFILE_CHANGE_SEQ_KEY, UserProfileModel
+    from runningapp.versions import data_versions
+
+    table = UserProfileModel.__table__
+    add_column_if_missing(connection, table, table.c.change_seq)
+    create_index_if_missing(
+        connection, get_index(UserProfileModel, "ix_user_profiles_change_seq")
+    )
+    # the ids have been the watermarks of the profiles so far,
+    # so the exports continue after them
+    connection.execute(
+        table.update()
+        .where(table.c.change_seq.is_(None))
+        .values(change_seq=table.c.id)
+    )
+    last = connection.execute(
+        db.select([db.func.max(table.c.change_seq)])
+    ).scalar()
+    connection.execute(
+        data_versions.delete().where(
+            data_versions.c.key == PROFILE_CHANGE_SEQ_KEY
+        )
+    )
+    connection.execute(
+        data_versions.insert(), key=PROFILE_CHANGE_SEQ_KEY, version=last or 0
+    )
+
+
+@migration(14, "Lease the pending idempotency keys")
+def _lease_idempotency_keys(connection) -> None:
+    from runningapp.models.idempotency import IdempotencyKeyModel
+
+    table = IdempotencyKeyModel.__table__
+    add_column_if_missing(connection, table, table.c.locked_until)
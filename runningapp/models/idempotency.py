@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+
+from runningapp.db import db
+
+IDEMPOTENCY_PENDING = "pending"
+IDEMPOTENCY_DONE = "done"
+
+
+class IdempotencyKeyModel(db.Model):
+    """Idempotency-Key sent with a request and the response to the request,
+    returned again when the request is retried"""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.Index(
+            "ix_idempotency_keys_scope_expires_at", "scope", "expires_at"
+        ),
+    )
+
+    # the user or the IP address which has sent the key
+    scope = db.Column(db.String(80), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    # hash of the method, path and body the key has been used with
+    request_hash = db.Column(db.String(64), nullable=False)
+    status = db.Column(
+        db.String(20), nullable=False, default=IDEMPOTENCY_PENDING
+    )
+    response_code = db.Column(db.Integer)
+    response_body = db.Column(db.JSON)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    # a retry takes over the pending key after this,
+    # when the request has crashed before its response was stored
+    locked_until = db.Column(db.DateTime)
+
+    @classmethod
+    def find_by_scope_and_key(
+        cls, scope: str, key: str
+    ) -> Optional["IdempotencyKeyModel"]:
+        """Find the key sent by the user or the IP address"""
+        return cls.query.filter_by(scope=scope, key=key).first()
+
+    @classmethod
+    def delete_expired(cls, scope: str, now: datetime) -> None:
+        """Delete the expired keys of the user or the IP address"""
+        # the deleted keys loaded by the session are removed from it,
+        # so a new key can take their place
+        cls.query.filter(cls.scope == scope, cls.expires_at < now).delete(
+            synchronize_session="evaluate"
+        )
@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import List, Optional
+
+from runningapp.db import db
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class JobModel(db.Model):
+    """Background job, kept in the database so that it survives restarts"""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index("ix_jobs_status_id", "status", "id"),
+        db.Index("ix_jobs_key_status", "key", "status"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(80), nullable=False)
+    # the pending jobs with the same key are run once
+    key = db.Column(db.String(120), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    status = db.Column(db.String(20), nullable=False, default=JOB_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    result = db.Column(db.Integer)
+    error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # the worker running the job and until when it may do so
+    # before another worker takes the job over
+    locked_by = db.Column(db.String(32))
+    locked_until = db.Column(db.DateTime)
+
+    @classmethod
+    def find_by_id(cls, job_id: int) -> "JobModel":
+        """Find the job by id"""
+        return cls.query.filter_by(id=job_id).first()
+
+    @classmethod
+    def find_pending_by_key(cls, key: str) -> Optional["JobModel"]:
+        """Find the pending job with the key"""
+        return cls.query.filter_by(key=key, status=JOB_PENDING).first()
+
+    @classmethod
+    def find_next(cls, now: datetime) -> Optional["JobModel"]:
+        """Find the oldest pending job or the oldest running one
+        whose worker has stopped renewing its lock"""
+        return (
+            cls.query.filter(
+                (cls.status == JOB_PENDING)
+                | ((cls.status == JOB_RUNNING) & (cls.locked_until < now))
+            )
+            .order_by(cls.id)
+            .first()
+        )
+
+    @classmethod
+    def find_all_by_locked_by(cls, locked_by: str) -> List["JobModel"]:
+        """Find the jobs claimed by the worker"""
+        return cls.query.filter_by(locked_by=locked_by).all()
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List
+
+from runningapp.db import db
+
+OUTBOX_PENDING = "pending"
+OUTBOX_FAILED = "failed"
+
+
+class OutboxEventModel(db.Model):
+    """Event saved in the same transaction as the change it describes
+    and delivered to the sinks afterwards"""
+
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        db.Index("ix_outbox_events_status_id", "status", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(80), nullable=False)
+    training_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    status = db.Column(db.String(20), nullable=False, default=OUTBOX_PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # the failed deliveries are retried with a backoff
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    error = db.Column(db.String(500))
+    # the dispatcher delivering the event and until when it may do so
+    locked_by = db.Column(db.String(32))
+    locked_until = db.Column(db.DateTime)
+
+    def to_message(self) -> dict:
+        """Get the event as it's sent to the sinks"""
+        return {
+            "id": self.id,
+            "type": self.event_type,
+            "training_id": self.training_id,
+            "user_id": self.user_id,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    @classmethod
+    def find_due_ids(cls, now: datetime, limit: int) -> List[int]:
+        """Find the ids of the oldest events which are due to be delivered
+        and aren't being delivered by another dispatcher"""
+        return [
+            event_id
+            for event_id, in cls.query.with_entities(cls.id)
+            .filter(
+                cls.status == OUTBOX_PENDING,
+                cls.next_attempt_at <= now,
+                cls.locked_until.is_(None) | (cls.locked_until < now),
+            )
+            .order_by(cls.id)
+            .limit(limit)
+        ]
+
+    @classmethod
+    def find_all_by_locked_by(cls, locked_by: str) -> List["OutboxEventModel"]:
+        """Find the events claimed by the dispatcher"""
+        return cls.query.filter_by(locked_by=locked_by).order_by(cls.id).all()
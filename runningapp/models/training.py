@@ -1,20 +1,45 @@
-from runningapp.db import db
+from runningapp.calculations import (
+    calculate_average_tempo,
+    calculate_calories_burnt,
+    calculate_met,
+)
+from runningapp.db import db, RoutingSession
 from datetime import datetime
-from typing import List
+from typing import Iterator, List, Tuple
+from sqlalchemy import bindparam, event, inspect
 from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.versions import allocate_sequence, bump_versions, Versioned
 
-# source:
-# https://sites.google.com/site/compendiumofphysicalactivities/Activity-Categories/running
+# data version key of the sequence numbering the changes of trainings
+CHANGE_SEQ_KEY = "trainings:change_seq"
 
 
-class TrainingModel(db.Model):
+class TrainingModel(Versioned, db.Model):
     """Training model"""
 
     __tablename__ = "trainings"
+    __table_args__ = (
+        db.Index("ix_trainings_user_id_name", "user_id", "name"),
+        db.Index("ix_trainings_user_id_change_seq", "user_id", "change_seq"),
+        # the live trainings are listed, the deleted ones are purged
+        db.Index(
+            "ix_trainings_live_user_id",
+            "user_id",
+            "id",
+            sqlite_where=db.text("deleted_at IS NULL"),
+            postgresql_where=db.text("deleted_at IS NULL"),
+        ),
+        db.Index(
+            "ix_trainings_deleted_at",
+            "deleted_at",
+            sqlite_where=db.text("deleted_at IS NOT NULL"),
+            postgresql_where=db.text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
-    distance = db.Column(db.Float(precision=2), nullable=False)
+    distance = db.Column(db.Float, nullable=False)
     avg_tempo = db.Column(db.Integer)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     time_in_seconds = db.Column(db.Integer, nullable=False)
@@ -24,6 +49,21 @@ class TrainingModel(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
     user = db.relationship("UserModel")
 
+    # set on every insert and update, see _track_training_changes
+    updated_at = db.Column(db.DateTime)
+    change_seq = db.Column(db.Integer)
+    # the deleted trainings are hidden at once and purged in the background
+    deleted_at = db.Column(db.DateTime)
+    # incremented by every update, which fails if the training
+    # has been updated since it was loaded
+    version = db.Column(db.Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
+
+    def version_keys(self) -> List[str]:
+        """Get the keys of the data versions the training belongs to"""
+        return ["trainings", f"trainings:user:{self.user_id}"]
+
     def save_to_db(self) -> None:
         """Save the training in the database"""
         db.session.add(self)
@@ -34,10 +74,19 @@ class TrainingModel(db.Model):
         db.session.delete(self)
         db.session.commit()
 
+    def mark_deleted(self) -> None:
+        """Hide the training until it's purged from the database"""
+        self.deleted_at = datetime.utcnow()
+
+    @classmethod
+    def query_live(cls):
+        """Query the trainings which haven't been deleted"""
+        return cls.query.filter(cls.deleted_at.is_(None))
+
     @classmethod
     def find_by_name(cls, name: str) -> "TrainingModel":
         """Find the training by name"""
-        return cls.query.filter_by(
+        return cls.query_live().filter_by(
             name=name
         ).first()  # SELECT * FROM trainings WHERE name=name LIMIT 1;
 
@@ -46,84 +95,279 @@ class TrainingModel(db.Model):
         cls, name: str, user_id: int
     ) -> "TrainingModel":
         """Find the training by name and user id"""
-        return cls.query.filter_by(name=name, user_id=user_id).first()
+        return cls.query_live().filter_by(name=name, user_id=user_id).first()
 
     @classmethod
     def find_by_id(cls, training_id: int) -> "TrainingModel":
         """Find the training by id"""
-        return cls.query.filter_by(id=training_id).first()
+        return cls.query_live().filter_by(id=training_id).first()
 
     @classmethod
     def find_all(cls) -> List["TrainingModel"]:
         """Find all the trainings"""
-        return cls.query.all()
+        return cls.query_live().all()
 
     @classmethod
-    def find_all_by_user_id(cls, user_id: int) -> List["TrainingModel"]:
+    def find_all_by_user_id(
+        cls, user_id: int, options=()
+    ) -> List["TrainingModel"]:
         """Find all the trainings which belong to the logged in user"""
-        return cls.query.filter_by(user_id=user_id).all()
+        return (
+            cls.query_live()
+            .options(*options)
+            .filter_by(user_id=user_id)
+            .order_by(cls.id)
+            .all()
+        )
+
+    @classmethod
+    def find_all_by_ids_and_user_id(
+        cls, ids: List[int], user_id: int, options=()
+    ) -> List["TrainingModel"]:
+        """Find the trainings with the ids which belong to the user"""
+        return (
+            cls.query_live()
+            .options(*options)
+            .filter(cls.id.in_(ids), cls.user_id == user_id)
+            .all()
+        )
+
+    @classmethod
+    def count_by_user_id(cls, user_id: int) -> int:
+        """Count the trainings of the user"""
+        return cls.query_live().filter_by(user_id=user_id).count()
+
+    @classmethod
+    def iterate_by_user_id(
+        cls, user_id: int, options=(), batch_size: int = 500
+    ) -> Iterator["TrainingModel"]:
+        """Iterate over the trainings of the user,
+        fetching them from the database in batches"""
+        return (
+            cls.query_live()
+            .options(*options)
+            .filter_by(user_id=user_id)
+            .order_by(cls.id)
+            .yield_per(batch_size)
+        )
+
+    @classmethod
+    def find_page_by_user_id(
+        cls, user_id: int, after_id: int, limit: int, options=()
+    ) -> List["TrainingModel"]:
+        """Find the next trainings of the user after the one with the id"""
+        return (
+            cls.query_live()
+            .options(*options)
+            .filter(cls.user_id == user_id, cls.id > after_id)
+            .order_by(cls.id)
+            .limit(limit)
+            .all()
+        )
+
+    @classmethod
+    def find_changed_since(
+        cls, user_id: int, change_seq: int, limit: int
+    ) -> List["TrainingModel"]:
+        """Find the first trainings of the user
+        inserted or updated after the change"""
+        return (
+            cls.query_live()
+            .filter(cls.user_id == user_id, cls.change_seq > change_seq)
+            .order_by(cls.change_seq)
+            .limit(limit)
+            .all()
+        )
+
+    @classmethod
+    def find_all_of_live_users(cls) -> List["TrainingModel"]:
+        """Find all the trainings of the users which haven't been deleted"""
+        return (
+            cls.query_live()
+            .outerjoin(UserModel, UserModel.id == cls.user_id)
+            .filter(UserModel.deleted_at.is_(None))
+            .all()
+        )
+
+    @classmethod
+    def update_calories(
+        cls, changes: List[Tuple["TrainingModel", int]]
+    ) -> None:
+        """Set the new calories of the trainings with a single UPDATE
+        executed for all of them in the current transaction,
+        numbering the changes like _track_training_changes
+
+        The ORM would send an UPDATE per training to check its version.
+        A training updated since it was loaded is left as it is,
+        its update has calculated the calories already.
+        """
+        if not changes:
+            return
+        connection = db.session.connection()
+        table = cls.__table__
+        change_seq = allocate_sequence(connection, CHANGE_SEQ_KEY, len(changes))
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("_id"))
+            .where(table.c.version == bindparam("_version"))
+            .values(
+                calories=bindparam("_calories"),
+                version=table.c.version + 1,
+                updated_at=datetime.utcnow(),
+                change_seq=bindparam("_change_seq"),
+            ),
+            [
+                {
+                    "_id": training.id,
+                    "_version": training.version,
+                    "_calories": calories,
+                    "_change_seq": change_seq + i,
+                }
+                for i, (training, calories) in enumerate(changes)
+            ],
+        )
+        bump_versions(
+            connection,
+            {
+                key
+                for training, _ in changes
+                for key in training.version_keys()
+            },
+        )
+        # the session would keep the old values otherwise
+        for training, _ in changes:
+            db.session.expire(training)
 
     @classmethod
     def get_total_kilometers(cls) -> float:
         """Get total kilometers run by all the users"""
-        trainings = cls.query.all()
+        trainings = cls.find_all_of_live_users()
         total_number = 0
         for training in trainings:
             total_number += training.distance
         return total_number
 
-    def calculate_calories_burnt(self) -> None:
-        """Calculate how many calories a person burnt during a training"""
+    def calculate_calories_burnt(self, weight: float = None) -> None:
+        """Calculate how many calories a person burnt during a training,
+        with the weight from the user profile unless it's given"""
         self.calculate_average_tempo()
-        weight = self._get_users_weight()
-        met = self._calculate_met_value()
-        time_in_minutes = self.time_in_seconds / 60
-        # MET * 3.5 * weight / 200 = calories/minute
-        calories_burnt = met * 3.5 * weight / 200 * time_in_minutes
-        self.calories = int(calories_burnt)
+        if weight is None:
+            weight = self._get_users_weight()
+        self.calories = calculate_calories_burnt(
+            self.avg_tempo, weight, self.time_in_seconds
+        )
 
     def _get_users_weight(self) -> int:
         """Access user's weight by user profile"""
-        user_profile = UserProfileModel.find_by_user_id(self.user_id)
+        # the pending changes don't affect the weight, don't flush them
+        with db.session.no_autoflush:
+            user_profile = UserProfileModel.find_by_user_id(self.user_id)
         return user_profile.weight
 
     def _calculate_met_value(self) -> int:
         """Calculate the metabolic equivalent of a task
         to measure the body's expenditure of energy"""
-        met = 0
-        if self.avg_tempo > 22:
-            met = 23
-        elif 19 <= self.avg_tempo <= 22:
-            met = 19
-        elif 17 <= self.avg_tempo < 19:
-            met = 16
-        elif 16 <= self.avg_tempo < 17:
-            met = 14.5
-        elif 15 <= self.avg_tempo < 16:
-            met = 13
-        elif 12 <= self.avg_tempo < 15:
-            met = 12
-        elif 11 <= self.avg_tempo < 12:
-            met = 11
-        elif 9 <= self.avg_tempo < 11:
-            met = 10
-        elif 8 <= self.avg_tempo < 9:
-            met = 9
-        elif self.avg_tempo < 8:
-            met = 6
-        return met
+        return calculate_met(self.avg_tempo)
 
     def calculate_average_tempo(self) -> None:
         """Calculate the average tempo (km/h) during a training"""
-        self.avg_tempo = round(self.distance / (self.time_in_seconds / 3600), 1)
+        self.avg_tempo = calculate_average_tempo(
+            self.distance, self.time_in_seconds
+        )
 
     @classmethod
     def calculate_total_calories(cls) -> int:
         """Calculate total calories burnt
         by all the users during all the trainings"""
-        trainings = cls.query.all()
+        trainings = cls.find_all_of_live_users()
         calories_number = 0
         for training in trainings:
             training.calculate_calories_burnt()
             calories_number += training.calories
         return calories_number
+
+
+class TrainingTombstoneModel(db.Model):
+    """Deleted training, kept for the clients syncing their trainings"""
+
+    __tablename__ = "training_tombstones"
+    __table_args__ = (
+        db.Index(
+            "ix_training_tombstones_user_id_change_seq",
+            "user_id",
+            "change_seq",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    training_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer)
+    change_seq = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False)
+
+    @classmethod
+    def find_deleted_since(
+        cls, user_id: int, change_seq: int, limit: int
+    ) -> List["TrainingTombstoneModel"]:
+        """Find the first trainings of the user deleted after the change"""
+        return (
+            cls.query.filter(
+                cls.user_id == user_id, cls.change_seq > change_seq
+            )
+            .order_by(cls.change_seq)
+            .limit(limit)
+            .all()
+        )
+
+
+def _is_marked_deleted(training: TrainingModel) -> bool:
+    """Check if the training has just been marked deleted"""
+    return (
+        training.deleted_at is not None
+        and inspect(training).attrs.deleted_at.history.has_changes()
+    )
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _track_training_changes(session, flush_context, instances) -> None:
+    """Number the inserted, updated and deleted trainings
+    with the next change sequence numbers and leave tombstones
+    of the deleted and the marked deleted ones"""
+    changed = [
+        instance
+        for instance in session.new
+        if isinstance(instance, TrainingModel)
+    ] + [
+        instance
+        for instance in session.dirty
+        if isinstance(instance, TrainingModel)
+        and session.is_modified(instance, include_collections=False)
+    ]
+    deleted = [
+        instance
+        for instance in session.deleted
+        if isinstance(instance, TrainingModel)
+    ] + [instance for instance in changed if _is_marked_deleted(instance)]
+    # the deleted trainings aren't synced anymore, whether they're
+    # marked or not, so they don't need a new change sequence number
+    changed = [instance for instance in changed if instance.deleted_at is None]
+    if not changed and not deleted:
+        return
+    change_seq = allocate_sequence(
+        session.connection(), CHANGE_SEQ_KEY, len(changed) + len(deleted)
+    )
+    now = datetime.utcnow()
+    for training in changed:
+        training.updated_at = now
+        training.change_seq = change_seq
+        change_seq += 1
+    for training in deleted:
+        session.add(
+            TrainingTombstoneModel(
+                training_id=training.id,
+                user_id=training.user_id,
+                change_seq=change_seq,
+                deleted_at=now,
+            )
+        )
+        change_seq += 1
@@ -1,21 +1,51 @@
-from runningapp.db import db
-from typing import List
-
-
-class UserModel(db.Model):
+from runningapp.calculations import (
+    calculate_bmi,
+    calculate_daily_caloric_needs,
+)
+from runningapp.db import db, RoutingSession
+from runningapp.versions import (
+    allocate_sequence,
+    bump_versions_on_flush,
+    Versioned,
+)
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import event
+
+# data version key of the sequence numbering the changes of profiles
+PROFILE_CHANGE_SEQ_KEY = "user_profiles:change_seq"
+
+
+class UserModel(Versioned, db.Model):
     """User model"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        # the deleted users are purged in the background
+        db.Index(
+            "ix_users_deleted_at",
+            "deleted_at",
+            sqlite_where=db.text("deleted_at IS NOT NULL"),
+            postgresql_where=db.text("deleted_at IS NOT NULL"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), nullable=False, unique=True)
     password = db.Column(db.String(120), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     is_staff = db.Column(db.Boolean, default=False)
+    # the deleted users are hidden at once and purged in the background
+    deleted_at = db.Column(db.DateTime)
 
-    user_profile = db.relationship("UserProfileModel", lazy="dynamic")
+    # not dynamic so that the profiles of many users can be loaded at once
+    user_profile = db.relationship("UserProfileModel")
     trainings = db.relationship("TrainingModel", lazy="dynamic")
 
+    def version_keys(self) -> List[str]:
+        """Get the keys of the data versions the user belongs to"""
+        return ["users", f"user:{self.id}"]
+
     def save_to_db(self) -> None:
         """Save the user in the database"""
         db.session.add(self)
@@ -26,27 +56,50 @@ class UserModel(db.Model):
         db.session.delete(self)
         db.session.commit()
 
+    def mark_deleted(self) -> None:
+        """Hide the user until they're purged from the database"""
+        self.deleted_at = datetime.utcnow()
+        # the username can be taken by a new user right away
+        self.username = f"deleted:{self.id}"
+
+    @classmethod
+    def query_live(cls):
+        """Query the users who haven't been deleted"""
+        return cls.query.filter(cls.deleted_at.is_(None))
+
     @classmethod
     def find_by_username(cls, username: str) -> "UserModel":
         """Find the user by username"""
-        return cls.query.filter_by(username=username).first()
+        return cls.query_live().filter_by(username=username).first()
 
     @classmethod
-    def find_by_id(cls, user_id: int) -> "UserModel":
+    def find_by_id(cls, user_id: int, options=()) -> "UserModel":
         """Find the user by id"""
-        return cls.query.filter_by(id=user_id).first()
+        return (
+            cls.query_live().options(*options).filter_by(id=user_id).first()
+        )
+
+    @classmethod
+    def find_all_by_ids(cls, ids: List[int], options=()) -> List["UserModel"]:
+        """Find the users with the ids"""
+        return (
+            cls.query_live().options(*options).filter(cls.id.in_(ids)).all()
+        )
 
     @classmethod
-    def find_all(cls) -> List["UserModel"]:
+    def find_all(cls, options=()) -> List["UserModel"]:
         """Find all users"""
-        return cls.query.all()
+        return cls.query_live().options(*options).all()
 
 
-class UserProfileModel(db.Model):
+class UserProfileModel(Versioned, db.Model):
     """User profile model"""
 
     __tablename__ = "user_profiles"
-    __table_args__ = (db.CheckConstraint('gender="Female" OR gender="Male"'),)
+    __table_args__ = (
+        db.CheckConstraint('gender="Female" OR gender="Male"'),
+        db.Index("ix_user_profiles_change_seq", "change_seq"),
+    )
 
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), unique=True)
     user = db.relationship("UserModel")
@@ -60,8 +113,22 @@ class UserProfileModel(db.Model):
     bmi = db.Column(db.Float(precision=2), default=23)
     daily_cal = db.Column(db.Integer, default=0)
 
+    # kept up to date by the training resources,
+    # fixed by "flask reconcile-counters" if they drift
     trainings_number = db.Column(db.Integer, default=0)
-    kilometers_run = db.Column(db.Integer, default=0)
+    kilometers_run = db.Column(db.Float, default=0)
+    # incremented by every update of the profile, but not of its counters,
+    # see add_to_counters
+    version = db.Column(db.Integer, nullable=False, server_default="1")
+    # set on every insert and update, counters included,
+    # see _track_profile_changes
+    change_seq = db.Column(db.Integer)
+
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version}
+
+    def version_keys(self) -> List[str]:
+        """Get the keys of the data versions the user profile belongs to"""
+        return ["users", "user_profiles", f"user:{self.user_id}"]
 
     def save_to_db(self) -> None:
         """Save the user profile in the database"""
@@ -73,58 +140,104 @@ class UserProfileModel(db.Model):
         db.session.delete(self)
         db.session.commit()
 
+    @classmethod
+    def query_live(cls):
+        """Query the profiles of the users who haven't been deleted"""
+        return cls.query.join(UserModel, UserModel.id == cls.user_id).filter(
+            UserModel.deleted_at.is_(None)
+        )
+
     @classmethod
     def find_by_username(cls, username: str) -> "UserProfileModel":
         """Find the user profile by username"""
-        user = UserModel.query.filter_by(username=username).first()
+        user = UserModel.find_by_username(username)
         if user:
             return cls.query.filter_by(user_id=user.id).first()
 
     @classmethod
     def find_by_user_id(cls, user_id: int) -> "UserProfileModel":
         """Find the user profile by user id"""
-        user = UserModel.query.filter_by(id=user_id).first()
+        user = UserModel.find_by_id(user_id)
         if user:
             return cls.query.filter_by(user_id=user.id).first()
 
+    @classmethod
+    def add_to_counters(
+        cls, user_id: int, trainings_number: int, kilometers_run: float
+    ) -> None:
+        """Add to the counters of the user's profile with a single UPDATE
+        in the current transaction, so that the concurrent changes
+        of the trainings neither overwrite each other
+        nor conflict with the updates of the profile"""
+        # the pending changes are flushed with the commit,
+        # which bumps the versions of the profile with theirs
+        with db.session.no_autoflush:
+            connection = db.session.connection()
+            cls.query.filter(cls.user_id == user_id).update(
+                {
+                    cls.trainings_number: cls.trainings_number
+                    + trainings_number,
+                    cls.kilometers_run: cls.kilometers_run + kilometers_run,
+                    cls.change_seq: allocate_sequence(
+                        connection, PROFILE_CHANGE_SEQ_KEY
+                    ),
+                },
+                synchronize_session="evaluate",
+            )
+        bump_versions_on_flush(
+            db.session, ["users", "user_profiles", f"user:{user_id}"]
+        )
+
+    @classmethod
+    def find_weights_by_user_ids(cls, user_ids) -> Dict[int, float]:
+        """Find the weights of the users by their ids"""
+        return dict(
+            cls.query.with_entities(cls.user_id, cls.weight)
+            .filter(cls.user_id.in_(user_ids))
+            .all()
+        )
+
     @classmethod
     def find_by_id(cls, _id: int) -> "UserProfileModel":
         """Find the user profile by id"""
-        return cls.query.filter_by(id=_id).first()
+        return cls.query_live().filter(cls.id == _id).first()
 
     @classmethod
     def find_all(cls) -> List["UserProfileModel"]:
         """Find all user profiles"""
-        return cls.query.all()
+        return cls.query_live().all()
 
     def calculate_bmi(self) -> None:
         """Calculate BMI - a measure of body fat based on height and weight"""
-        self.bmi = round(self.weight / (self.height / 100) ** 2, 1)
+        self.bmi = calculate_bmi(self.height, self.weight)
 
     def calculate_daily_caloric_needs(self, trainings_per_week) -> None:
         """Calculate BMR (Basal Metabolic Rate)
         - the amount of calories required for a person per day"""
-        bmr = 0
-        activity_factor = self._calculate_activity_factor(trainings_per_week)
-        if self.gender == "Female":
-            bmr = 655 + 9.6 * self.weight + 1.8 * self.height - 4.7 * self.age
-        elif self.gender == "Male":
-            bmr = 66 + 13.8 * self.weight + 5 * self.height - 6.8 * self.age
-        daily_caloric_needs = bmr * activity_factor
-        self.daily_cal = int(daily_caloric_needs)
-
-    @classmethod
-    def _calculate_activity_factor(cls, trainings_per_week) -> int:
-        """Calculate the physical activity factor
-        based on the amount of trainings per week"""
-        activity_factor_dict = {
-            0: 1,
-            1: 1.2,
-            2: 1.4,
-            3: 1.6,
-            4: 1.6,
-            5: 1.8,
-            6: 2,
-            7: 2,
-        }
-        return activity_factor_dict[trainings_per_week]
+        self.daily_cal = calculate_daily_caloric_needs(
+            self.age, self.height, self.weight, self.gender, trainings_per_week
+        )
+
+
+@event.listens_for(RoutingSession, "before_flush")
+def _track_profile_changes(session, flush_context, instances) -> None:
+    """Number the inserted and updated profiles
+    with the next change sequence numbers"""
+    changed = [
+        instance
+        for instance in session.new
+        if isinstance(instance, UserProfileModel)
+    ] + [
+        instance
+        for instance in session.dirty
+        if isinstance(instance, UserProfileModel)
+        and session.is_modified(instance, include_collections=False)
+    ]
+    if not changed:
+        return
+    change_seq = allocate_sequence(
+        session.connection(), PROFILE_CHANGE_SEQ_KEY, len(changed)
+    )
+    for user_profile in changed:
+        user_profile.change_seq = change_seq
+        change_seq += 1
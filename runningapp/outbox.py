@@ -0,0 +1,269 @@
+import json
+import threading
+import urllib.request
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from flask import current_app
+from sqlalchemy import event
+
+from runningapp.db import db, RoutingSession
+from runningapp.models.outbox import (
+    OUTBOX_FAILED,
+    OUTBOX_PENDING,
+    OutboxEventModel,
+)
+from runningapp.models.training import TrainingModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.training import TrainingSchema
+
+TRAINING_CREATED = "training.created"
+TRAINING_UPDATED = "training.updated"
+TRAINING_DELETED = "training.deleted"
+
+# set in the info of a session which has saved events
+OUTBOX_SAVED_KEY = "runningapp.outbox_saved"
+
+training_dumper = PrecompiledDumper(TrainingSchema())
+
+
+class FileSink:
+    """Append the events to a file as JSON lines"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def send(self, messages: List[dict]) -> None:
+        with open(self.path, "a") as file:
+            for message in messages:
+                file.write(json.dumps(message) + "\n")
+
+
+class HttpSink:
+    """POST the events to a URL as {"events": [...]}"""
+
+    def __init__(self, url: str, timeout: float = 5) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, messages: List[dict]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"events": messages}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # raises HTTPError for the error status codes
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def add_training_event(event_type: str, training: TrainingModel) -> None:
+    """Add the event to the session with the training,
+    so it's saved in the same transaction as the change of the training"""
+    db.session.add(training)
+    # the payload has the id and the version set by the flush
+    db.session.flush()
+    db.session.add(
+        OutboxEventModel(
+            event_type=event_type,
+            training_id=training.id,
+            user_id=training.user_id,
+            payload=_get_payload(event_type, training),
+        )
+    )
+    db.session.info[OUTBOX_SAVED_KEY] = True
+
+
+def _get_payload(event_type: str, training: TrainingModel) -> dict:
+    """Get the data of the training sent with the event"""
+    if event_type == TRAINING_DELETED:
+        return {"id": training.id, "user_id": training.user_id}
+    return training_dumper.dump(training)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _wake_dispatcher(session) -> None:
+    """Wake the dispatcher up once the saved events are committed"""
+    if session.info.pop(OUTBOX_SAVED_KEY, False):
+        session.app.extensions["outbox_dispatcher"].wake()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_outbox_events(session) -> None:
+    session.info.pop(OUTBOX_SAVED_KEY, None)
+
+
+def _claim_events(now: datetime) -> str:
+    """Claim the next batch of due events, return the token of the claim"""
+    config = current_app.config
+    ids = OutboxEventModel.find_due_ids(now, config["OUTBOX_BATCH_SIZE"])
+    token = uuid.uuid4().hex
+    if ids:
+        table = OutboxEventModel.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.id.in_(ids))
+            .where(table.c.status == OUTBOX_PENDING)
+            .where(
+                table.c.locked_until.is_(None) | (table.c.locked_until < now)
+            )
+            .values(
+                locked_by=token,
+                locked_until=now
+                + timedelta(seconds=config["OUTBOX_LEASE_SECONDS"]),
+                attempts=table.c.attempts + 1,
+            )
+        )
+    db.session.commit()
+    return token
+
+
+def dispatch_events(sinks) -> int:
+    """Deliver the next batch of due events to all the sinks,
+    return the number of events in the batch
+
+    A batch is delivered again if any sink fails, so the sinks get
+    every event at least once and tell the copies apart by their ids.
+    """
+    now = datetime.utcnow()
+    token = _claim_events(now)
+    events = OutboxEventModel.find_all_by_locked_by(token)
+    if not events:
+        return 0
+    try:
+        messages = [outbox_event.to_message() for outbox_event in events]
+        for sink in sinks:
+            sink.send(messages)
+    except Exception as error:
+        current_app.logger.exception("The delivery of the events has failed")
+        config = current_app.config
+        for outbox_event in events:
+            outbox_event.locked_by = None
+            outbox_event.locked_until = None
+            outbox_event.error = str(error)[:500]
+            if outbox_event.attempts >= config["OUTBOX_MAX_ATTEMPTS"]:
+                outbox_event.status = OUTBOX_FAILED
+                continue
+            backoff = config["OUTBOX_RETRY_SECONDS"] * 2 ** (
+                outbox_event.attempts - 1
+            )
+            outbox_event.next_attempt_at = now + timedelta(seconds=backoff)
+    else:
+        # the delivered events aren't needed anymore
+        OutboxEventModel.query.filter_by(locked_by=token).delete(
+            synchronize_session=False
+        )
+    db.session.commit()
+    return len(events)
+
+
+def dispatch_pending_events(sinks) -> int:
+    """Dispatch the due events until there are none left,
+    return their number"""
+    dispatched = 0
+    while True:
+        batch = dispatch_events(sinks)
+        if not batch:
+            return dispatched
+        dispatched += batch
+
+
+class _DispatcherThread:
+    """Thread dispatching the events of a single application"""
+
+    def __init__(self, app, sinks) -> None:
+        self.app = app
+        self.sinks = sinks
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self) -> None:
+        """Start the thread unless it's running, disabled
+        or there are no sinks to deliver the events to"""
+        with self.lock:
+            if (
+                self.thread
+                or not self.sinks
+                or not self.app.config["OUTBOX_DISPATCHER_ENABLED"]
+            ):
+                return
+            self.thread = threading.Thread(
+                target=self._dispatch_forever,
+                name="outbox-dispatcher",
+                daemon=True,
+            )
+            self.thread.start()
+
+    def wake(self) -> None:
+        """Let the thread know there are new events"""
+        self.start()
+        self.wakeup.set()
+
+    def stop(self) -> None:
+        """Stop the thread once it delivers its batch"""
+        with self.lock:
+            self.stopping.set()
+            self.wakeup.set()
+            if self.thread:
+                self.thread.join()
+            self.thread = None
+            self.stopping.clear()
+
+    def _dispatch_forever(self) -> None:
+        """Dispatch the events, waiting for new ones when there are none"""
+        with self.app.app_context():
+            while not self.stopping.is_set():
+                try:
+                    dispatched = dispatch_events(self.sinks)
+                except Exception:
+                    self.app.logger.exception("The dispatcher has failed")
+                    dispatched = 0
+                finally:
+                    db.session.remove()
+                if not dispatched:
+                    self.wakeup.wait(self.app.config["OUTBOX_POLL_INTERVAL"])
+                    self.wakeup.clear()
+
+
+class OutboxDispatcher:
+    """Deliver the events of the outbox table to the configured sinks
+    in a background thread, so the requests never wait for them"""
+
+    def __init__(self, app=None) -> None:
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        """Create the sinks from the config and register the dispatcher
+        in the app, it's started by the first request or event"""
+        app.config.setdefault("OUTBOX_DISPATCHER_ENABLED", True)
+        app.config.setdefault("OUTBOX_POLL_INTERVAL", 1.0)
+        app.config.setdefault("OUTBOX_BATCH_SIZE", 100)
+        app.config.setdefault("OUTBOX_LEASE_SECONDS", 60)
+        app.config.setdefault("OUTBOX_MAX_ATTEMPTS", 10)
+        app.config.setdefault("OUTBOX_RETRY_SECONDS", 1.0)
+        app.config.setdefault("OUTBOX_FILE_PATH", None)
+        app.config.setdefault("OUTBOX_HTTP_URL", None)
+        app.config.setdefault("OUTBOX_HTTP_TIMEOUT", 5.0)
+        # other sinks with a send(messages) method can be appended
+        sinks = app.extensions["outbox_sinks"] = []
+        if app.config["OUTBOX_FILE_PATH"]:
+            sinks.append(FileSink(app.config["OUTBOX_FILE_PATH"]))
+        if app.config["OUTBOX_HTTP_URL"]:
+            sinks.append(
+                HttpSink(
+                    app.config["OUTBOX_HTTP_URL"],
+                    app.config["OUTBOX_HTTP_TIMEOUT"],
+                )
+            )
+        dispatcher = _DispatcherThread(app, sinks)
+        app.extensions["outbox_dispatcher"] = dispatcher
+        # the events left by the previous run are delivered
+        app.before_first_request(dispatcher.start)
+
+
+outbox_dispatcher = OutboxDispatcher()
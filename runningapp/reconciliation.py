@@ -0,0 +1,128 @@
+import math
+import time
+from typing import Iterator, List, NamedTuple
+
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import PROFILE_CHANGE_SEQ_KEY, UserProfileModel
+from runningapp.versions import allocate_sequence, bump_versions
+
+
+class ReconcileResult(NamedTuple):
+    profiles: int
+    fixed: int
+    seconds: float
+
+
+def _count_trainings():
+    """Get the subquery counting the trainings
+    and summing their distances by user id"""
+    trainings = TrainingModel.__table__
+    return (
+        db.select(
+            [
+                trainings.c.user_id,
+                db.func.count(trainings.c.id).label("trainings_number"),
+                db.func.sum(trainings.c.distance).label("kilometers_run"),
+            ]
+        )
+        .where(trainings.c.deleted_at.is_(None))
+        .group_by(trainings.c.user_id)
+        .alias("counters")
+    )
+
+
+def _has_drifted(row) -> bool:
+    """Check if the counters of the profile differ from its trainings"""
+    trainings_number = row.trainings_number or 0
+    kilometers_run = row.kilometers_run or 0.0
+    return (
+        row.profile_trainings_number != trainings_number
+        or row.profile_kilometers_run is None
+        or not math.isclose(
+            row.profile_kilometers_run, kilometers_run, abs_tol=1e-6
+        )
+    )
+
+
+def find_drifted_profiles(connection) -> Iterator[int]:
+    """Find the ids of the profiles whose counters don't match
+    their trainings, with a single GROUP BY over the trainings"""
+    profiles = UserProfileModel.__table__
+    counters = _count_trainings()
+    query = db.select(
+        [
+            profiles.c.id,
+            profiles.c.trainings_number.label("profile_trainings_number"),
+            profiles.c.kilometers_run.label("profile_kilometers_run"),
+            counters.c.trainings_number,
+            counters.c.kilometers_run,
+        ]
+    ).select_from(
+        profiles.outerjoin(
+            counters, counters.c.user_id == profiles.c.user_id
+        )
+    )
+    for row in connection.execute(query):
+        if _has_drifted(row):
+            yield row.id
+
+
+def fix_profile_counters(connection, profile_ids: List[int]) -> int:
+    """Set the counters of the profiles from their trainings
+    with a single UPDATE and return the number of fixed profiles"""
+    profiles = UserProfileModel.__table__
+    trainings = TrainingModel.__table__
+    # the counters are taken from the trainings by the UPDATE itself,
+    # so the trainings saved in the meantime are counted too
+    of_profile = (trainings.c.user_id == profiles.c.user_id) & (
+        trainings.c.deleted_at.is_(None)
+    )
+    fixed = connection.execute(
+        profiles.update()
+        .where(profiles.c.id.in_(profile_ids))
+        .values(
+            trainings_number=db.select([db.func.count(trainings.c.id)])
+            .where(of_profile)
+            .as_scalar(),
+            kilometers_run=db.select(
+                [db.func.coalesce(db.func.sum(trainings.c.distance), 0)]
+            )
+            .where(of_profile)
+            .as_scalar(),
+            # the fixed profiles are exported again
+            change_seq=allocate_sequence(connection, PROFILE_CHANGE_SEQ_KEY),
+        )
+    ).rowcount
+    user_ids = connection.execute(
+        db.select([profiles.c.user_id]).where(profiles.c.id.in_(profile_ids))
+    )
+    bump_versions(
+        connection,
+        ["users", "user_profiles"]
+        + [f"user:{row.user_id}" for row in user_ids],
+    )
+    return fixed
+
+
+def reconcile_profile_counters(
+    engine, batch_size: int = 500
+) -> ReconcileResult:
+    """Recompute the trainings number and the kilometers run
+    of all the profiles and fix the drifted ones in batches,
+    every batch in its own transaction"""
+    started = time.monotonic()
+    with engine.connect() as connection:
+        profiles = connection.execute(
+            db.select([db.func.count()]).select_from(
+                UserProfileModel.__table__
+            )
+        ).scalar()
+        drifted = list(find_drifted_profiles(connection))
+    fixed = 0
+    for start in range(0, len(drifted), batch_size):
+        with engine.begin() as connection:
+            fixed += fix_profile_counters(
+                connection, drifted[start : start + batch_size]
+            )
+    return ReconcileResult(profiles, fixed, time.monotonic() - started)
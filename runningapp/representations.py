@@ -0,0 +1,91 @@
+from typing import Callable, Dict
+
+from flask import current_app, make_response, request, Request
+from flask_restful.representations.json import output_json as stdlib_json
+from werkzeug.exceptions import BadRequest
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+
+def output_json(data, code, headers=None):
+    """Make a response with a JSON encoded body,
+    using orjson unless the app asks for custom JSON settings"""
+    if (
+        orjson is None
+        or current_app.debug
+        or current_app.config.get("RESTFUL_JSON")
+    ):
+        return stdlib_json(data, code, headers)
+    try:
+        dumped = orjson.dumps(
+            data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        )
+    except TypeError:
+        return stdlib_json(data, code, headers)
+    response = make_response(dumped, code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def output_msgpack(data, code, headers=None):
+    """Make a response with a MessagePack encoded body"""
+    response = make_response(msgpack.packb(data, use_bin_type=True), code)
+    response.headers.extend(headers or {})
+    return response
+
+
+def get_output_mediatype() -> str:
+    """Get the media type the response to the request is encoded in,
+    picked from the Accept header the way the API picks it"""
+    return request.accept_mimetypes.best_match(OUTPUTS, default=JSON)
+
+
+def load_msgpack(body: bytes):
+    """Decode a MessagePack request body"""
+    return msgpack.unpackb(body, raw=False)
+
+
+# media type -> function making a response from the data
+OUTPUTS: Dict[str, Callable] = {JSON: output_json}
+# media type -> function decoding the request body
+LOADERS: Dict[str, Callable] = {}
+
+if msgpack is not None:
+    OUTPUTS[MSGPACK] = output_msgpack
+    LOADERS[MSGPACK] = load_msgpack
+
+
+class RunningAppRequest(Request):
+    """Request which decodes the bodies in any of the LOADERS media types
+    when the resources ask for the JSON data"""
+
+    def get_json(self, force=False, silent=False, cache=True):
+        """Decode the body with the loader of its media type
+        or parse it as JSON"""
+        load = LOADERS.get(self.mimetype)
+        if load is None:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        try:
+            return load(self.get_data(cache=cache))
+        except Exception:
+            if silent:
+                return None
+            raise BadRequest("Failed to decode the request body.")
+
+
+def init_representations(app, api) -> None:
+    """Let the API respond and accept the data in all the media types"""
+    app.request_class = RunningAppRequest
+    for mediatype, output in OUTPUTS.items():
+        api.representation(mediatype)(output)
@@ -2,11 +2,14 @@ from flask_restful import Resource
 from flask import request
 from werkzeug.security import generate_password_hash
 from flask_jwt_extended import jwt_required, get_jwt_claims
+from runningapp.deletion import delete_user
 from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.schemas.dumper import PrecompiledDumper
 from runningapp.schemas.user import UserSchema
 
 
 user_schema = UserSchema()
+user_dumper = PrecompiledDumper(user_schema)
 
 
 class AdminManageUser(Resource):
@@ -28,7 +31,7 @@ class AdminManageUser(Resource):
         user = UserModel.find_by_id(user_id)
         if not user:
             return {"message": "User not found."}, 404
-        return user_schema.dump(user), 200
+        return user_dumper.dump(user), 200
 
     @classmethod
     @jwt_required
@@ -62,7 +65,7 @@ class AdminManageUser(Resource):
                 500,
             )
 
-        return user_schema.dump(user), 200
+        return user_dumper.dump(user), 200
 
     @classmethod
     @jwt_required
@@ -80,9 +83,10 @@ class AdminManageUser(Resource):
         user = UserModel.find_by_id(user_id)
         if not user:
             return {"message": "User not found."}, 404
-        user_profile = UserProfileModel.find_by_user_id(user_id)
-        user_profile.delete_from_db()
-        user.delete_from_db()
+        try:
+            delete_user(user)
+        except:
+            return {"message": "An error has occurred deleting the user."}, 500
         return {"message": "User deleted."}, 200
 
 
@@ -104,9 +108,7 @@ class AdminManageUserList(Resource):
 
         return (
             {
-                "users": [
-                    user_schema.dump(user) for user in UserModel.find_all()
-                ]
+                "users": user_dumper.dump(UserModel.find_all(), many=True)
             },
             200,
         )
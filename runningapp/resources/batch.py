@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, request
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource
+from werkzeug.test import EnvironBuilder
+
+from runningapp.db import get_last_write, LAST_WRITE_ENVIRON_KEY
+from runningapp.schemas.batch import BatchSchema
+
+batch_schema = BatchSchema()
+
+# set in the environ of the requests dispatched by a batch
+BATCH_ENVIRON_KEY = "runningapp.batch"
+# the headers of the batch passed on to every request in it
+FORWARDED_HEADERS = ("Authorization", "User-Agent")
+# the headers of the requests in the batch which are left out,
+# the bodies are returned inside the response to the batch
+IGNORED_HEADERS = ("accept-encoding",)
+
+
+def _dispatch(
+    app, item: Dict, headers: Dict, last_write: Optional[float]
+) -> Tuple[Dict, Optional[float]]:
+    """Dispatch a single request of the batch through the app
+    and return its status, headers and body with the time
+    of the last write of the batch, including its own"""
+    environ_overrides = {BATCH_ENVIRON_KEY: True}
+    if last_write is not None:
+        environ_overrides[LAST_WRITE_ENVIRON_KEY] = last_write
+    builder = EnvironBuilder(
+        path=item["path"],
+        method=item["method"],
+        json=item["body"],
+        headers={
+            **{
+                name: value
+                for name, value in item["headers"].items()
+                if name.lower() not in IGNORED_HEADERS
+            },
+            **headers,
+        },
+        environ_overrides=environ_overrides,
+    )
+    environ = builder.get_environ()
+    try:
+        with app.request_context(environ):
+            response = app.full_dispatch_request()
+    except Exception:
+        app.logger.exception("Failed to dispatch %s", item["path"])
+        return {"status": 500, "headers": {}, "body": None}, last_write
+    finally:
+        builder.close()
+
+    if response.status_code == 304:
+        body = None
+    elif response.is_json:
+        body = response.get_json()
+    else:
+        body = response.get_data(as_text=True)
+    return (
+        {
+            "status": response.status_code,
+            "headers": {"ETag": response.headers["ETag"]}
+            if "ETag" in response.headers
+            else {},
+            "body": body,
+        },
+        environ.get(LAST_WRITE_ENVIRON_KEY),
+    )
+
+
+class Batch(Resource):
+    """Batch resource"""
+
+    @classmethod
+    @jwt_required
+    def post(cls):
+        """Dispatch the requests of the batch in order,
+        running the consecutive GET requests in parallel"""
+        if request.environ.get(BATCH_ENVIRON_KEY):
+            return {"message": "Batches can't be nested."}, 400
+        items = batch_schema.load(request.get_json())["requests"]
+        config = current_app.config
+        if len(items) > config["BATCH_MAX_REQUESTS"]:
+            return (
+                {
+                    "message": f"A batch can have at most "
+                    f"{config['BATCH_MAX_REQUESTS']} requests."
+                },
+                400,
+            )
+
+        app = current_app._get_current_object()
+        headers = {
+            name: request.headers[name]
+            for name in FORWARDED_HEADERS
+            if name in request.headers
+        }
+        # the reads after a write go to the primary database like the ones
+        # of the client after the batch, so they see its changes
+        last_write = sent_last_write = get_last_write()
+        responses: List[Dict] = []
+        with ThreadPoolExecutor(config["BATCH_MAX_WORKERS"]) as executor:
+            reads: List[Dict] = []
+            for item in items + [None]:
+                if item is not None and item["method"] == "GET":
+                    reads.append(item)
+                    continue
+                # a write waits for the reads before it and the reads
+                # after it see its changes
+                responses.extend(
+                    response
+                    for response, _ in executor.map(
+                        lambda read: _dispatch(app, read, headers, last_write),
+                        reads,
+                    )
+                )
+                reads = []
+                if item is not None:
+                    response, last_write = _dispatch(
+                        app, item, headers, last_write
+                    )
+                    responses.append(response)
+        if last_write != sent_last_write:
+            # sent back in the cookie of the batch
+            request.environ[LAST_WRITE_ENVIRON_KEY] = last_write
+        return {"responses": responses}, 200
@@ -1,19 +1,20 @@
 from flask_restful import Resource
-from flask import request
+from flask import current_app, request
 from runningapp.schemas.calculator import (
     BmiCalculatorSchema,
     CaloricNeedsSchema,
+    load_many,
 )
-from runningapp.resources.functions import (
-    BmiCalculatorFunctions,
-    CaloricNeedsCalculatorFunctions,
+from runningapp.calculations import (
+    cached_calculate_bmi,
+    cached_calculate_daily_caloric_needs,
+    calculate_many_bmi,
+    calculate_many_daily_caloric_needs,
 )
 
 
 bmi_schema = BmiCalculatorSchema()
 caloric_needs_schema = CaloricNeedsSchema()
-caloric_needs_functions = CaloricNeedsCalculatorFunctions()
-bmi_functions = BmiCalculatorFunctions()
 
 
 class BmiCalculator(Resource):
@@ -23,10 +24,7 @@ class BmiCalculator(Resource):
     def post(cls):
         """Post method"""
         bmi_json = bmi_schema.load(request.get_json())
-        bmi = round(
-            bmi_functions.calculate_bmi(bmi_json["height"], bmi_json["weight"]),
-            1,
-        )
+        bmi = cached_calculate_bmi(bmi_json["height"], bmi_json["weight"])
         return {"bmi": bmi}, 201
 
 
@@ -37,7 +35,7 @@ class CaloricNeedsCalculator(Resource):
     def post(cls):
         """Post method"""
         caloric_needs_json = caloric_needs_schema.load(request.get_json())
-        caloric_needs = caloric_needs_functions.calculate_daily_caloric_needs(
+        caloric_needs = cached_calculate_daily_caloric_needs(
             caloric_needs_json["age"],
             caloric_needs_json["height"],
             caloric_needs_json["weight"],
@@ -45,3 +43,39 @@ class CaloricNeedsCalculator(Resource):
             caloric_needs_json["trainings_per_week"],
         )
         return {"daily_caloric_needs": caloric_needs}, 201
+
+
+class BmiCalculatorBatch(Resource):
+    """BMI Calculator resource for many people at once"""
+
+    @classmethod
+    def post(cls):
+        """Post method"""
+        people = load_many(
+            bmi_schema,
+            request.get_json(),
+            current_app.config["CALCULATOR_BATCH_MAX_ROWS"],
+        )
+        bmi = calculate_many_bmi(
+            [person["height"] for person in people],
+            [person["weight"] for person in people],
+        )
+        return {"bmi": bmi}, 201
+
+
+class CaloricNeedsCalculatorBatch(Resource):
+    """Daily Caloric Needs Calculator resource for many people at once"""
+
+    @classmethod
+    def post(cls):
+        """Post method"""
+        people = load_many(
+            caloric_needs_schema,
+            request.get_json(),
+            current_app.config["CALCULATOR_BATCH_MAX_ROWS"],
+        )
+        fields = ("age", "height", "weight", "gender", "trainings_per_week")
+        caloric_needs = calculate_many_daily_caloric_needs(
+            *([person[field] for person in people] for field in fields)
+        )
+        return {"daily_caloric_needs": caloric_needs}, 201
@@ -0,0 +1,20 @@
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restful import Resource
+from runningapp.models.job import JobModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.job import JobSchema
+
+job_dumper = PrecompiledDumper(JobSchema())
+
+
+class Job(Resource):
+    """Background job status resource"""
+
+    @classmethod
+    @jwt_required
+    def get(cls, job_id: int):
+        """Get method"""
+        job = JobModel.find_by_id(job_id)
+        if job and job.user_id == get_jwt_identity():
+            return job_dumper.dump(job), 200
+        return {"message": "Job not found."}, 404
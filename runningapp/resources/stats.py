@@ -1,25 +1,41 @@
 from flask_restful import Resource
+from runningapp.db import read_only
 from runningapp.models.training import TrainingModel
 from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.versions import versioned
+
+# the stats are the same for everyone
+PUBLIC_HEADERS = {"Cache-Control": "public, no-cache"}
 
 
 class RegisteredUsersResource(Resource):
     @classmethod
+    @read_only
+    @versioned("users")
     def get(cls):
         # refactor later:
         users_number = len(UserModel.find_all())
-        return {"users_number": users_number}, 200
+        return {"users_number": users_number}, 200, PUBLIC_HEADERS
 
 
 class KilometersRunResource(Resource):
     @classmethod
+    @read_only
+    @versioned("trainings")
     def get(cls):
         kilometers_number = TrainingModel.get_total_kilometers()
-        return {"kilometers_number": kilometers_number}, 200
+        return (
+            {"kilometers_number": kilometers_number},
+            200,
+            PUBLIC_HEADERS,
+        )
 
 
 class CaloriesBurntResource(Resource):
     @classmethod
+    @read_only
+    # the calories depend on the weights of the users
+    @versioned("trainings", "user_profiles")
     def get(cls):
         calories_number = TrainingModel.calculate_total_calories()
-        return {"calories_number": calories_number}, 200
+        return {"calories_number": calories_number}, 200, PUBLIC_HEADERS
@@ -0,0 +1,51 @@
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_restful import Resource
+from runningapp.db import read_only
+from runningapp.models.training import TrainingModel, TrainingTombstoneModel
+from runningapp.resources.training import training_dumper
+
+
+class Sync(Resource):
+    """Delta sync resource"""
+
+    @classmethod
+    @read_only
+    @jwt_required
+    def get(cls):
+        """Get the trainings of the logged in user inserted, updated
+        and deleted after the cursor, in the order of the changes"""
+        try:
+            since = int(request.args.get("since", 0))
+        except ValueError:
+            return {"message": "The cursor must be an integer."}, 400
+        current_user_id = get_jwt_identity()
+        limit = current_app.config["SYNC_PAGE_SIZE"]
+
+        # one more change than the page size tells if there are more
+        changes = sorted(
+            TrainingModel.find_changed_since(current_user_id, since, limit + 1)
+            + TrainingTombstoneModel.find_deleted_since(
+                current_user_id, since, limit + 1
+            ),
+            key=lambda change: change.change_seq,
+        )
+        page = changes[:limit]
+        trainings = [c for c in page if isinstance(c, TrainingModel)]
+        # a deleted id may have been reused by a newer training
+        training_ids = {training.id for training in trainings}
+        deleted = [
+            c.training_id
+            for c in page
+            if isinstance(c, TrainingTombstoneModel)
+            and c.training_id not in training_ids
+        ]
+        return (
+            {
+                "cursor": page[-1].change_seq if page else since,
+                "has_more": len(changes) > limit,
+                "trainings": training_dumper.dump(trainings, many=True),
+                "deleted": deleted,
+            },
+            200,
+        )
@@ -1,16 +1,33 @@
 from flask_restful import Resource
-from flask import request
+from flask import current_app, request, Response, stream_with_context
 from flask_jwt_extended import (
     jwt_required,
     get_jwt_identity,
 )
+from sqlalchemy.orm.exc import StaleDataError
+from runningapp.concurrency import CONFLICT_MESSAGE, matches_if_match
+from runningapp.db import db, read_only, save_all_to_db
+from runningapp.deletion import enqueue_purge
+from runningapp.idempotency import idempotent
+from runningapp.outbox import (
+    add_training_event,
+    TRAINING_CREATED,
+    TRAINING_DELETED,
+    TRAINING_UPDATED,
+)
 from runningapp.models.training import TrainingModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.arguments import get_ids_argument
+from runningapp.schemas.fieldsets import SparseFieldsets
 from runningapp.schemas.training import TrainingSchema
 from runningapp.models.user import UserProfileModel
+from runningapp.streaming import batched, MEDIA_TYPES, stream_rows
+from runningapp.versions import versioned
 
 
 training_schema = TrainingSchema()
-training_list_schema = TrainingSchema(many=True)
+training_dumper = PrecompiledDumper(training_schema)
+training_fieldsets = SparseFieldsets(TrainingSchema, TrainingModel)
 
 
 class Training(Resource):
@@ -23,7 +40,7 @@ class Training(Resource):
         current_user_id = get_jwt_identity()
         training = TrainingModel.find_by_id(training_id)
         if training and current_user_id == training.user_id:
-            return training_schema.dump(training), 200
+            return training_fieldsets.get().dumper.dump(training), 200
         return {"message": "Training not found."}, 404
 
     @classmethod
@@ -31,7 +48,6 @@ class Training(Resource):
     def delete(cls, training_id: int):
         """Delete method"""
         current_user_id = get_jwt_identity()
-        user_profile = UserProfileModel.find_by_user_id(current_user_id)
         training = TrainingModel.find_by_id(training_id)
         if not training:
             return {"message": "Training not found."}, 404
@@ -43,11 +59,20 @@ class Training(Resource):
                 403,
             )
 
-        user_profile.trainings_number -= 1
-        user_profile.kilometers_run -= training.distance
+        if not matches_if_match(training):
+            return {"message": CONFLICT_MESSAGE}, 409
+
         try:
-            training.delete_from_db()
-            user_profile.save_to_db()
+            enqueue_purge()
+            training.mark_deleted()
+            UserProfileModel.add_to_counters(
+                current_user_id, -1, -training.distance
+            )
+            add_training_event(TRAINING_DELETED, training)
+            save_all_to_db(training)
+        except StaleDataError:
+            db.session.rollback()
+            return {"message": CONFLICT_MESSAGE}, 409
         except:
             return (
                 {"message": "An error has occurred deleting the training."},
@@ -60,7 +85,6 @@ class Training(Resource):
     def put(cls, training_id: int):
         """Put method"""
         current_user_id = get_jwt_identity()
-        user_profile = UserProfileModel.find_by_user_id(current_user_id)
         training = TrainingModel.find_by_id(training_id)
         if not training:
             return {"message": "Training not found."}, 404
@@ -71,15 +95,14 @@ class Training(Resource):
                 },
                 403,
             )
+        if not matches_if_match(training):
+            return {"message": CONFLICT_MESSAGE}, 409
 
-        user_profile.kilometers_run -= training.distance
         training_data = training_schema.load(request.get_json())
-        if (
-            TrainingModel.find_by_name_and_user_id(
-                training_data.name, current_user_id
-            )
-            != training
-        ):
+        existing = TrainingModel.find_by_name_and_user_id(
+            training_data.name, current_user_id
+        )
+        if existing is not None and existing != training:
             return (
                 {
                     "message": f"You have already created a training "
@@ -89,48 +112,72 @@ class Training(Resource):
                 400,
             )  # bad request
 
+        kilometers_run = training_data.distance - training.distance
         training.name = training_data.name
         training.distance = training_data.distance
-        user_profile.kilometers_run += training.distance
         training.time_in_seconds = training_data.time_in_seconds
         training.calculate_average_tempo()
         training.calculate_calories_burnt()
 
         try:
-            training.save_to_db()
-            user_profile.save_to_db()
+            UserProfileModel.add_to_counters(current_user_id, 0, kilometers_run)
+            add_training_event(TRAINING_UPDATED, training)
+            save_all_to_db(training)
+        except StaleDataError:
+            db.session.rollback()
+            return {"message": CONFLICT_MESSAGE}, 409
         except:
             return (
                 {"message": "An error has occurred updating the training."},
                 500,
             )
-        return training_schema.dump(training), 200
+        return training_dumper.dump(training), 200
 
 
 class TrainingList(Resource):
     """Training list resource"""
 
     @classmethod
+    @read_only
     @jwt_required
+    @versioned("trainings:user:{identity}")
     def get(cls):
-        """Get method"""
+        """Get method, only the trainings with the ids if they are given"""
         current_user_id = get_jwt_identity()
+        fieldset = training_fieldsets.get()
+        ids = get_ids_argument(current_app.config["MULTI_GET_MAX_IDS"])
+        if ids is None:
+            trainings = TrainingModel.find_all_by_user_id(
+                current_user_id, fieldset.options
+            )
+            return (
+                {"trainings": fieldset.dumper.dump(trainings, many=True)},
+                200,
+            )
+
+        # the trainings of other users are not found, like in Training.get
+        found = {
+            training.id: training
+            for training in TrainingModel.find_all_by_ids_and_user_id(
+                ids, current_user_id, fieldset.options
+            )
+        }
+        trainings = [found[id_] for id_ in ids if id_ in found]
         return (
             {
-                "trainings": training_list_schema.dump(
-                    TrainingModel.find_all_by_user_id(current_user_id)
-                )
+                "trainings": fieldset.dumper.dump(trainings, many=True),
+                "not_found": [id_ for id_ in ids if id_ not in found],
             },
             200,
         )
 
     @classmethod
     @jwt_required
+    @idempotent
     def post(cls):
         """Post method"""
         training_json = request.get_json()
         current_user_id = get_jwt_identity()
-        user_profile = UserProfileModel.find_by_user_id(current_user_id)
         training = TrainingModel.find_by_name_and_user_id(
             training_json["name"], current_user_id
         )
@@ -148,15 +195,54 @@ class TrainingList(Resource):
         training.user_id = current_user_id
         training.calculate_average_tempo()
         training.calculate_calories_burnt()
-        user_profile.trainings_number += 1
-        user_profile.kilometers_run += training.distance
 
         try:
-            training.save_to_db()
-            user_profile.save_to_db()
+            UserProfileModel.add_to_counters(
+                current_user_id, 1, training.distance
+            )
+            add_training_event(TRAINING_CREATED, training)
+            save_all_to_db(training)
         except:
             return (
                 {"message": "An error has occurred inserting the training."},
                 500,
             )  # internal server error
-        return training_schema.dump(training), 201
+        return training_dumper.dump(training), 201
+
+
+class TrainingExport(Resource):
+    """Training export resource"""
+
+    @classmethod
+    @read_only
+    @jwt_required
+    def get(cls):
+        """Stream all the trainings of the logged in user
+        as JSON, NDJSON or CSV without loading them all at once"""
+        export_format = request.args.get("format", "json")
+        if export_format not in MEDIA_TYPES:
+            return {"message": f"Unsupported format: {export_format}."}, 400
+
+        current_user_id = get_jwt_identity()
+        fieldset = training_fieldsets.get()
+        batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+        trainings = TrainingModel.iterate_by_user_id(
+            current_user_id, fieldset.options, batch_size
+        )
+        batches = (
+            fieldset.dumper.dump(batch, many=True)
+            for batch in batched(trainings, batch_size)
+        )
+        fieldnames = [
+            field.data_key or name
+            for name, field in fieldset.dumper.schema.dump_fields.items()
+        ]
+        chunks = stream_rows(export_format, batches, "trainings", fieldnames)
+        return Response(
+            stream_with_context(chunks),
+            mimetype=MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": "attachment; "
+                f"filename=trainings.{export_format}"
+            },
+        )
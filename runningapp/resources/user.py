@@ -1,5 +1,5 @@
 from flask_restful import Resource
-from flask import request
+from flask import current_app, request
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import (
     create_access_token,
@@ -8,7 +8,16 @@ from flask_jwt_extended import (
     get_raw_jwt,
 )
 import datetime
+from sqlalchemy.orm.exc import StaleDataError
+from runningapp.concurrency import CONFLICT_MESSAGE, matches_if_match
+from runningapp.db import db, read_only
+from runningapp.deletion import delete_user
+from runningapp.idempotency import idempotent
+from runningapp.jobs import enqueue, RECALCULATE_CALORIES_JOB
 from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.arguments import get_ids_argument
+from runningapp.schemas.fieldsets import SparseFieldsets
 from runningapp.schemas.user import (
     UserSchema,
     UserProfileSchema,
@@ -16,23 +25,29 @@ from runningapp.schemas.user import (
     UpdateCaloricNeedsSchema,
 )
 from runningapp.blacklist import BLACKLIST
+from runningapp.versions import versioned
 
 
 user_schema = UserSchema()
 user_profile_schema = UserProfileSchema()
 change_password_schema = ChangePasswordSchema()
 daily_needs_schema = UpdateCaloricNeedsSchema()
+user_profile_dumper = PrecompiledDumper(user_profile_schema)
+user_fieldsets = SparseFieldsets(UserSchema, UserModel)
 
 
 class User(Resource):
     """User resource"""
 
     @classmethod
+    @read_only
+    @versioned("user:{user_id}")
     def get(cls, user_id: int):
         """Get method"""
-        user = UserModel.find_by_id(user_id)
+        fieldset = user_fieldsets.get()
+        user = UserModel.find_by_id(user_id, fieldset.options)
         if user:
-            return user_schema.dump(user), 200
+            return fieldset.dumper.dump(user), 200
         return {"message": "User not found"}, 404
 
     @classmethod
@@ -50,9 +65,10 @@ class User(Resource):
                 },
                 403,
             )
-        user_profile = UserProfileModel.find_by_user_id(user_id)
-        user_profile.delete_from_db()
-        user.delete_from_db()
+        try:
+            delete_user(user)
+        except:
+            return {"message": "An error has occurred deleting the user."}, 500
         return {"message": "User deleted."}, 200
 
 
@@ -60,13 +76,25 @@ class UserList(Resource):
     """User List resource"""
 
     @classmethod
+    @read_only
+    @versioned("users")
     def get(cls):
-        """Get method"""
+        """Get method, only the users with the ids if they are given"""
+        fieldset = user_fieldsets.get()
+        ids = get_ids_argument(current_app.config["MULTI_GET_MAX_IDS"])
+        if ids is None:
+            users = UserModel.find_all(fieldset.options)
+            return {"users": fieldset.dumper.dump(users, many=True)}, 200
+
+        found = {
+            user.id: user
+            for user in UserModel.find_all_by_ids(ids, fieldset.options)
+        }
+        users = [found[id_] for id_ in ids if id_ in found]
         return (
             {
-                "users": [
-                    user_schema.dump(user) for user in UserModel.find_all()
-                ]
+                "users": fieldset.dumper.dump(users, many=True),
+                "not_found": [id_ for id_ in ids if id_ not in found],
             },
             200,
         )
@@ -92,8 +120,20 @@ class UserProfile(Resource):
                 },
                 403,
             )
+        if not matches_if_match(user_profile):
+            return {"message": CONFLICT_MESSAGE}, 409
 
         user_profile_data = user_profile_schema.load(request.get_json())
+        job = None
+        if user_profile_data.weight != user_profile.weight:
+            # the calories of the trainings depend on the weight,
+            # they're recalculated in the background
+            job = enqueue(
+                RECALCULATE_CALORIES_JOB,
+                f"{RECALCULATE_CALORIES_JOB}:user:{user_profile.user_id}",
+                {"user_id": user_profile.user_id},
+                user_id=current_user_id,
+            )
         user_profile.gender = user_profile_data.gender
         user_profile.age = user_profile_data.age
         user_profile.height = user_profile_data.height
@@ -102,19 +142,24 @@ class UserProfile(Resource):
 
         try:
             user_profile.save_to_db()
+        except StaleDataError:
+            db.session.rollback()
+            return {"message": CONFLICT_MESSAGE}, 409
         except:
             return (
                 {"message": "An error has occurred updating the user profile."},
                 500,
             )
 
-        return user_profile_schema.dump(user_profile), 200
+        headers = {"Location": f"/jobs/{job.id}"} if job else {}
+        return user_profile_dumper.dump(user_profile), 200, headers
 
 
 class UserRegister(Resource):
     """User Register resource"""
 
     @classmethod
+    @idempotent
     def post(cls):
         """Post method"""
         user_data = user_schema.load(request.get_json())
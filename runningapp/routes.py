@@ -1,4 +1,8 @@
-from runningapp.resources.training import Training, TrainingList
+from runningapp.resources.training import (
+    Training,
+    TrainingExport,
+    TrainingList,
+)
 from runningapp.resources.user import (
     User,
     UserRegister,
@@ -11,9 +15,14 @@ from runningapp.resources.user import (
 )
 from runningapp.resources.calculator import (
     BmiCalculator,
+    BmiCalculatorBatch,
     CaloricNeedsCalculator,
+    CaloricNeedsCalculatorBatch,
 )
 from runningapp.resources.admin import AdminManageUser, AdminManageUserList
+from runningapp.resources.sync import Sync
+from runningapp.resources.batch import Batch
+from runningapp.resources.job import Job
 from runningapp.resources.stats import (
     RegisteredUsersResource,
     KilometersRunResource,
@@ -33,8 +42,14 @@ def initialize_routes(api):
     api.add_resource(ChangePassword, "/change-password")
     api.add_resource(Training, "/trainings/<int:training_id>")
     api.add_resource(TrainingList, "/trainings")
+    api.add_resource(TrainingExport, "/trainings/export")
+    api.add_resource(Sync, "/sync")
+    api.add_resource(Batch, "/batch")
+    api.add_resource(Job, "/jobs/<int:job_id>")
     api.add_resource(BmiCalculator, "/bmi")
     api.add_resource(CaloricNeedsCalculator, "/daily-calories")
+    api.add_resource(BmiCalculatorBatch, "/bmi/batch")
+    api.add_resource(CaloricNeedsCalculatorBatch, "/daily-calories/batch")
     api.add_resource(AdminManageUserList, "/admin/users")
     api.add_resource(AdminManageUser, "/admin/users/<int:user_id>")
     api.add_resource(RegisteredUsersResource, "/total-users-number")
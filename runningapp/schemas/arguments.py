@@ -0,0 +1,27 @@
+from typing import List, Optional
+
+from flask import request
+from marshmallow import ValidationError
+
+IDS_ARGUMENT = "ids"
+
+
+def get_ids_argument(max_ids: int) -> Optional[List[int]]:
+    """Get the unique ids from the comma separated ?ids= query argument
+    in the order they are given or None if there is no such argument"""
+    value = request.args.get(IDS_ARGUMENT)
+    if value is None:
+        return None
+    try:
+        ids = list(
+            dict.fromkeys(int(id_) for id_ in value.split(",") if id_.strip())
+        )
+    except ValueError:
+        raise ValidationError({IDS_ARGUMENT: ["The ids must be integers."]})
+    if not ids:
+        raise ValidationError({IDS_ARGUMENT: ["No ids given."]})
+    if len(ids) > max_ids:
+        raise ValidationError(
+            {IDS_ARGUMENT: [f"At most {max_ids} ids can be given."]}
+        )
+    return ids
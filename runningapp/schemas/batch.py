@@ -0,0 +1,28 @@
+from marshmallow import fields, Schema, validate
+
+
+class BatchItemSchema(Schema):
+    """Schema for a single request of a batch"""
+
+    method = fields.Str(
+        missing="GET",
+        validate=[validate.OneOf(("GET", "POST", "PUT", "DELETE"))],
+    )
+    path = fields.Str(
+        required=True,
+        validate=[validate.Regexp(r"^/", error="The path must start with /.")],
+    )
+    body = fields.Raw(missing=None, allow_none=True)
+    headers = fields.Dict(
+        keys=fields.Str(), values=fields.Str(), missing=dict
+    )
+
+
+class BatchSchema(Schema):
+    """Schema for Batch"""
+
+    requests = fields.List(
+        fields.Nested(BatchItemSchema),
+        required=True,
+        validate=[validate.Length(min=1)],
+    )
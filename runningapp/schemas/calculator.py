@@ -1,5 +1,7 @@
+from typing import Dict, List
+
 from runningapp.ma import ma
-from marshmallow import fields, Schema, validate
+from marshmallow import fields, Schema, validate, ValidationError
 
 
 class BmiCalculatorSchema(ma.SQLAlchemyAutoSchema):
@@ -18,4 +20,29 @@ class CaloricNeedsSchema(Schema):
     gender = fields.Str(
         validate=[validate.OneOf(("Male", "Female"))], required=True
     )
-    trainings_per_week = fields.Integer(required=True)
+    trainings_per_week = fields.Integer(
+        validate=[validate.Range(0, 7)], required=True
+    )
+
+
+def load_many(schema: Schema, json_data, max_rows: int) -> List[Dict]:
+    """Load the people given as a list of objects
+    or as columns - an object with a list of values for every field"""
+    if isinstance(json_data, dict):
+        columns = list(json_data.values())
+        if not all(isinstance(column, list) for column in columns) or (
+            len({len(column) for column in columns}) > 1
+        ):
+            raise ValidationError(
+                {"_schema": ["The columns must be lists of the same length."]}
+            )
+        json_data = [dict(zip(json_data, row)) for row in zip(*columns)]
+    if not isinstance(json_data, list) or not json_data:
+        raise ValidationError(
+            {"_schema": ["Expected a list of people or columns."]}
+        )
+    if len(json_data) > max_rows:
+        raise ValidationError(
+            {"_schema": [f"At most {max_rows} people can be given."]}
+        )
+    return schema.load(json_data, many=True)
@@ -0,0 +1,118 @@
+from typing import Callable, Optional
+
+from marshmallow import fields, Schema, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+
+class _Source:
+    """Source code of a generated dump function"""
+
+    def __init__(self) -> None:
+        self.namespace = {
+            "_int": int,
+            "_float": float,
+            "_text": utils.ensure_text_type,
+            "_missing": utils.missing,
+        }
+        self.lines = []
+
+    def add_constant(self, value) -> str:
+        """Make the value available to the generated code under a new name"""
+        name = f"_c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+
+def _serialize_expression(
+    field: fields.Field, source: _Source, value: str
+) -> Optional[str]:
+    """Return the expression which serializes the value like the field
+    or None if the field isn't supported"""
+    field_type = type(field)
+    if field_type is fields.Integer and not field.as_string:
+        return f"_int({value})"
+    if field_type is fields.Float and not field.as_string:
+        return f"_float({value})"
+    if field_type is fields.String:
+        return f"{value} if {value}.__class__ is str else _text({value})"
+    if field_type is fields.Boolean:
+        serialize = source.add_constant(field._serialize)
+        return (
+            f"{value} if {value}.__class__ is bool "
+            f"else {serialize}({value}, None, None)"
+        )
+    if field_type is fields.DateTime:
+        data_format = field.format or field.DEFAULT_FORMAT
+        format_function = field.SERIALIZATION_FUNCS.get(data_format)
+        if format_function:
+            return f"{source.add_constant(format_function)}({value})"
+        return f"{value}.strftime({data_format!r})"
+    if field_type is fields.Nested:
+        dump_nested = compile_dump_function(field.schema)
+        if dump_nested is None:
+            return None
+        dump_nested = source.add_constant(dump_nested)
+        if field.schema.many or field.many:
+            return f"[{dump_nested}(item) for item in {value}]"
+        return f"{dump_nested}({value})"
+    return None
+
+
+def compile_dump_function(schema: Schema) -> Optional[Callable]:
+    """Generate a function which dumps a single object exactly like
+    the schema does or return None if the schema isn't supported"""
+    if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+        return None
+    source = _Source()
+    items = []
+    for i, (name, field) in enumerate(schema.dump_fields.items()):
+        attribute = field.attribute or name
+        if not attribute.isidentifier():
+            return None
+        value = f"v{i}"
+        expression = _serialize_expression(field, source, value)
+        if expression is None:
+            return None
+        # read the loaded columns straight from the instance dict
+        # and let the ORM load the rest (relationships, deferred columns)
+        source.lines.append(
+            f"    {value} = values.get({attribute!r}, _missing)\n"
+            f"    if {value} is _missing:\n"
+            f"        {value} = obj.{attribute}"
+        )
+        key = field.data_key if field.data_key is not None else name
+        items.append(
+            f"        {key!r}: None if {value} is None else ({expression}),"
+        )
+
+    code = "\n".join(
+        [
+            "def dump(obj):",
+            "    values = obj.__dict__",
+            *source.lines,
+            "    return {",
+            *items,
+            "    }",
+        ]
+    )
+    filename = f"<dumper of {type(schema).__name__}>"
+    exec(compile(code, filename, "exec"), source.namespace)
+    return source.namespace["dump"]
+
+
+class PrecompiledDumper:
+    """Dump objects with a function generated from the schema's fields,
+    falling back to the schema itself if some field isn't supported"""
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.dump_function = compile_dump_function(schema)
+
+    def dump(self, obj, many: bool = None):
+        """Serialize the object or the objects if many is True"""
+        many = self.schema.many if many is None else many
+        if self.dump_function is None:
+            return self.schema.dump(obj, many=many)
+        if many:
+            return list(map(self.dump_function, obj))
+        return self.dump_function(obj)
@@ -0,0 +1,88 @@
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple, Type
+
+from flask import request
+from marshmallow import Schema, ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+from runningapp.schemas.dumper import PrecompiledDumper
+
+FIELDS_ARGUMENT = "fields"
+
+
+class Fieldset(NamedTuple):
+    dumper: PrecompiledDumper
+    # query options loading only the columns the fields need
+    # and the nested relationships with one query for all the rows
+    options: List
+
+
+class SparseFieldsets:
+    """Dumpers and query options for the field sets
+    the clients ask for with the ?fields= query argument,
+    built once for every field set"""
+
+    def __init__(
+        self, schema_class: Type[Schema], model, cache_size: int = 64
+    ) -> None:
+        self.schema_class = schema_class
+        self.model = model
+        self._get_fieldset = lru_cache(maxsize=cache_size)(self._build)
+        self.default = self._build(None)
+
+    def _build(self, only: Optional[Tuple[str, ...]]) -> Fieldset:
+        """Build the dumper and the query options for the field set,
+        all the fields of the schema if only is None"""
+        try:
+            schema = self.schema_class(only=only)
+            # the nested schemas check their fields when they are built
+            dumper = PrecompiledDumper(schema)
+        except ValueError:
+            dumper = None
+        # the load only fields are valid names but can't be dumped
+        if dumper is None or any(
+            name.split(".")[0] not in schema.dump_fields for name in only or ()
+        ):
+            raise ValidationError(
+                {FIELDS_ARGUMENT: [f"Invalid fields: {', '.join(only)}."]}
+            )
+        attributes = {
+            field.attribute or name
+            for name, field in schema.dump_fields.items()
+        }
+        mapper = inspect(self.model)
+        # the primary key is always loaded to keep the identity map working
+        attributes.update(
+            mapper.get_property_by_column(column).key
+            for column in mapper.primary_key
+        )
+        columns = [
+            getattr(self.model, attribute.key)
+            for attribute in mapper.column_attrs
+            if attribute.key in attributes
+        ]
+        relationships = [
+            getattr(self.model, attribute.key)
+            for attribute in mapper.relationships
+            if attribute.key in attributes and attribute.lazy != "dynamic"
+        ]
+        return Fieldset(
+            dumper,
+            [load_only(*columns)]
+            + [selectinload(relationship) for relationship in relationships],
+        )
+
+    def get(self, fields: Optional[str] = None) -> Fieldset:
+        """Get the field set for the comma separated field names,
+        by default from the query argument of the current request"""
+        if fields is None:
+            fields = request.args.get(FIELDS_ARGUMENT)
+        only = tuple(
+            sorted({name.strip() for name in fields.split(",")} - {""})
+            if fields
+            else ()
+        )
+        if not only:
+            return self.default
+        return self._get_fieldset(only)
@@ -0,0 +1,16 @@
+from runningapp.ma import ma
+from runningapp.models.job import JobModel
+from marshmallow import fields
+
+
+class JobSchema(ma.SQLAlchemyAutoSchema):
+    """Schema for Job"""
+
+    class Meta:
+        model = JobModel
+        exclude = ("key", "payload", "locked_by", "locked_until")
+        include_fk = True
+
+    created_at = fields.DateTime(format="%d-%m-%Y %H:%M:%S")
+    started_at = fields.DateTime(format="%d-%m-%Y %H:%M:%S")
+    finished_at = fields.DateTime(format="%d-%m-%Y %H:%M:%S")
@@ -8,8 +8,18 @@ class TrainingSchema(ma.SQLAlchemyAutoSchema):
 
     class Meta:
         model = TrainingModel
-        dump_only = ("id", "user_id", "calories", "avg_tempo")
+        dump_only = (
+            "id",
+            "user_id",
+            "calories",
+            "avg_tempo",
+            "updated_at",
+            "change_seq",
+            "version",
+        )
+        exclude = ("deleted_at",)
         load_instance = True
         include_fk = True
 
     date = fields.DateTime(format="%d-%m-%Y %H:%M:%S")
+    updated_at = fields.DateTime(format="%d-%m-%Y %H:%M:%S", dump_only=True)
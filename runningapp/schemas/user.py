@@ -16,7 +16,10 @@ class UserProfileSchema(ma.SQLAlchemyAutoSchema):
             "daily_cal",
             "trainings_number",
             "kilometers_run",
+            "version",
         )
+        # only numbers the changes for the exports
+        exclude = ("change_seq",)
 
         load_instance = True
         include_fk = True
@@ -31,6 +34,7 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
         model = UserModel
         load_only = ("password",)
         dump_only = ("id",)
+        exclude = ("deleted_at",)
 
         load_instance = True
         include_fk = True
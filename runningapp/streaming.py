@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def dump_json(data) -> bytes:
+    """Encode the data as compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def batched(rows: Iterable, size: int) -> Iterator[List]:
+    """Split the rows into lists of at most size rows"""
+    iterator = iter(rows)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def stream_json(key: str, batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """Stream the rows as a JSON object with a single list under the key,
+    one chunk for every batch"""
+    yield b"{" + dump_json(key) + b":["
+    separator = b""
+    for batch in batches:
+        if batch:
+            yield separator + b",".join(map(dump_json, batch))
+            separator = b","
+    yield b"]}\n"
+
+
+def stream_ndjson(batches: Iterable[List[Dict]]) -> Iterator[bytes]:
+    """Stream the rows as newline delimited JSON,
+    one chunk for every batch"""
+    for batch in batches:
+        if batch:
+            yield b"\n".join(map(dump_json, batch)) + b"\n"
+
+
+def stream_csv(
+    fieldnames: List[str], batches: Iterable[List[Dict]]
+) -> Iterator[bytes]:
+    """Stream the rows as CSV with a header, one chunk for every batch"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# export format -> media type
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def stream_rows(
+    export_format: str,
+    batches: Iterable[List[Dict]],
+    key: str,
+    fieldnames: List[str],
+) -> Iterator[bytes]:
+    """Stream the batches of rows in the export format"""
+    if export_format == "csv":
+        return stream_csv(fieldnames, batches)
+    if export_format == "ndjson":
+        return stream_ndjson(batches)
+    return stream_json(key, batches)
@@ -1,9 +1,13 @@
 import json
+from contextlib import contextmanager
+from typing import List
 
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash
 
 from createsuperuser import Superuser
 from runningapp import UserModel
+from runningapp.db import db
 from runningapp.models.training import TrainingModel
 from runningapp.models.user import UserProfileModel
 
@@ -15,7 +19,12 @@ class BaseApp:
     @classmethod
     def _set_up_test_app(cls, create_app):
         """Set up a test app"""
+        # release the locks held by the session of the previous test
+        db.session.remove()
         app = create_app()
+        # the tests run the background jobs themselves
+        app.config["JOBS_WORKERS"] = 0
+        app.config["OUTBOX_DISPATCHER_ENABLED"] = False
         app.app_context().push()
         ctx = app.test_request_context("/")
         ctx.push()
@@ -105,6 +114,38 @@ class BaseAdmin:
         return superuser
 
 
+class BaseQueryCounter:
+    """Record the SQL statements sent to the database"""
+
+    @classmethod
+    @contextmanager
+    def _record_statements(cls, engine) -> List[str]:
+        """Record the statements executed inside the with block"""
+        statements = []
+
+        def record(connection, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    @classmethod
+    def _get_statements_after_first_write(cls, statements) -> List[str]:
+        """Get the statements from the first INSERT, UPDATE or DELETE on,
+        leaving out the bumps of the data versions"""
+        for i, statement in enumerate(statements):
+            if not statement.startswith("SELECT"):
+                return [
+                    statement
+                    for statement in statements[i:]
+                    if "data_versions" not in statement
+                ]
+        return []
+
+
 class BaseTraining:
     """Create a base training"""
 
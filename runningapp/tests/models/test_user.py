@@ -173,28 +173,6 @@ class UserProfileModelCalculatorsTests(
 
         self.assertNotEqual(self.user_profile.bmi, wrong_bmi)
 
-    def test_calculate_activity_factor_success(self):
-        """Test if the activity factor is calculated correctly."""
-        trainings_per_week = 5
-
-        activity_factor = self.user_profile._calculate_activity_factor(
-            trainings_per_week
-        )
-        expected_activity_factor = 1.8
-
-        self.assertEqual(activity_factor, expected_activity_factor)
-
-    def test_calculate_activity_factor_failure(self):
-        """Test if the activity factor is calculated incorrectly."""
-        trainings_per_week = 5
-
-        activity_factor = self.user_profile._calculate_activity_factor(
-            trainings_per_week
-        )
-        wrong_activity_factor = 2
-
-        self.assertNotEqual(activity_factor, wrong_activity_factor)
-
     def test_calculate_daily_caloric_needs_success(self):
         """Test if the daily caloric needs is calculated correctly."""
         trainings_per_week = 5
@@ -0,0 +1,126 @@
+import json
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class BatchTests(unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.training = self._create_sample_training(self.user)
+        db.session.commit()
+        self.access_token = self._get_access_token(self.client)
+
+    def __batch(self, requests, access_token=None):
+        return self.client.post(
+            path="/batch",
+            data=json.dumps({"requests": requests}),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {access_token or self.access_token}",
+            },
+        )
+
+    def test_reads(self):
+        """Test if every request gets its own status and body in order"""
+        response = self.__batch(
+            [
+                {"path": f"/users/{self.user.id}"},
+                {"path": "/trainings"},
+                {"path": "/total-users-number"},
+                {"path": "/trainings/1000"},
+            ]
+        )
+        responses = response.json["responses"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["status"] for item in responses], [200, 200, 200, 404]
+        )
+        self.assertEqual(responses[0]["body"]["username"], "testuser")
+        self.assertEqual(len(responses[1]["body"]["trainings"]), 1)
+        self.assertEqual(responses[2]["body"], {"users_number": 1})
+        self.assertIn("ETag", responses[1]["headers"])
+
+    def test_reads_after_write_see_it(self):
+        """Test if the reads after a write in the batch see its changes"""
+        data = {"name": "new", "distance": 5, "time_in_seconds": 1800}
+
+        responses = self.__batch(
+            [
+                {"path": "/trainings"},
+                {"method": "POST", "path": "/trainings", "body": data},
+                {"path": "/trainings"},
+            ]
+        ).json["responses"]
+
+        self.assertEqual(len(responses[0]["body"]["trainings"]), 1)
+        self.assertEqual(responses[1]["status"], 201)
+        self.assertEqual(len(responses[2]["body"]["trainings"]), 2)
+
+    def test_accept_encoding_is_ignored(self):
+        """Test if the bodies in the batch aren't compressed"""
+        self.app.config["COMPRESS_MIN_SIZE"] = 0
+
+        item = self.__batch(
+            [{"path": "/trainings", "headers": {"Accept-Encoding": "gzip"}}]
+        ).json["responses"][0]
+
+        self.assertEqual(item["status"], 200)
+        self.assertEqual(len(item["body"]["trainings"]), 1)
+
+    def test_conditional_read(self):
+        """Test if a request of the batch can be conditional"""
+        etag = self.__batch([{"path": "/trainings"}]).json["responses"][0][
+            "headers"
+        ]["ETag"]
+
+        item = self.__batch(
+            [{"path": "/trainings", "headers": {"If-None-Match": etag}}]
+        ).json["responses"][0]
+
+        self.assertEqual(item["status"], 304)
+        self.assertIsNone(item["body"])
+
+    def test_batch_requires_valid_token(self):
+        """Test if the whole batch is rejected without a valid token"""
+        response = self.__batch([{"path": "/trainings"}], "invalid")
+
+        self.assertEqual(response.status_code, 422)
+
+    def test_invalid_item(self):
+        """Test if a request without a path gets 400"""
+        response = self.__batch([{"method": "GET"}])
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_too_many_requests(self):
+        """Test if a batch over the size limit gets 400"""
+        self.app.config["BATCH_MAX_REQUESTS"] = 1
+
+        response = self.__batch([{"path": "/trainings"}] * 2)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_nested_batch(self):
+        """Test if a batch inside a batch is rejected"""
+        item = self.__batch(
+            [{"method": "POST", "path": "/batch", "body": {"requests": []}}]
+        ).json["responses"][0]
+
+        self.assertEqual(item["status"], 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -61,5 +61,80 @@ class CalculatorTest(unittest.TestCase, BaseApp):
         }
 
 
+class CalculatorBatchTest(unittest.TestCase, BaseApp):
+    """Test calculators for many people at once"""
+
+    def setUp(self) -> None:
+        """Create a test app and a test client"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+
+    def __post(self, path, data):
+        return self.client.post(
+            path=f"/{path}/batch",
+            data=json.dumps(data),
+            headers={"Content-Type": "application/json"},
+        )
+
+    def test_calculates_bmi_of_list(self):
+        """Test if BMI of every person is returned in order"""
+        response = self.__post(
+            "bmi",
+            [{"height": 170, "weight": 100}, {"height": 165, "weight": 58}],
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["bmi"], [34.6, 21.3])
+
+    def test_calculates_caloric_needs_of_columns(self):
+        """Test if the people can be given as columns"""
+        response = self.__post(
+            "daily-calories",
+            {
+                "height": [170, 165],
+                "weight": [58, 58],
+                "age": [26, 25],
+                "gender": ["Female", "Female"],
+                "trainings_per_week": [5, 5],
+            },
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json["daily_caloric_needs"], [2512, 2504])
+
+    def test_invalid_person(self):
+        """Test if the errors are reported by the index of the person"""
+        response = self.__post(
+            "daily-calories",
+            {
+                "height": [170, 165],
+                "weight": [58, 58],
+                "age": [26, 25],
+                "gender": ["Female", "Other"],
+                "trainings_per_week": [5, 8],
+            },
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            set(response.json["1"]), {"gender", "trainings_per_week"}
+        )
+
+    def test_invalid_columns(self):
+        """Test if columns of different lengths or no people get 400"""
+        uneven = {"height": [170, 165], "weight": [58]}
+
+        self.assertEqual(self.__post("bmi", uneven).status_code, 400)
+        self.assertEqual(self.__post("bmi", []).status_code, 400)
+
+    def test_too_many_people(self):
+        """Test if more people than the limit get 400"""
+        self.app.config["CALCULATOR_BATCH_MAX_ROWS"] = 1
+
+        response = self.__post("bmi", {"height": [170] * 2, "weight": [58] * 2})
+
+        self.assertEqual(response.status_code, 400)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,127 @@
+import json
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class SyncTests(unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="otheruser")
+        self.access_token = self._get_access_token(self.client)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}",
+        }
+        self.first = self._create_sample_training(self.user, name="first")
+        self.second = self._create_sample_training(self.user, name="second")
+        self._create_sample_training(self.other_user, name="other")
+
+    def __sync(self, since=None):
+        path = "sync" if since is None else f"sync?since={since}"
+        return self.client.get(path=path, headers=self.headers)
+
+    def test_first_sync_gets_all_trainings(self):
+        """Test if the sync without a cursor returns all the trainings
+        of the user"""
+        response = self.__sync()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [t["name"] for t in response.json["trainings"]],
+            ["first", "second"],
+        )
+        self.assertEqual(response.json["deleted"], [])
+        self.assertFalse(response.json["has_more"])
+
+    def test_sync_gets_only_changes(self):
+        """Test if the next sync returns only the updated, inserted
+        and deleted trainings"""
+        cursor = self.__sync().json["cursor"]
+        data = {"name": "first", "distance": 3, "time_in_seconds": 1200}
+        self.client.put(
+            path=f"trainings/{self.first.id}",
+            data=json.dumps(data),
+            headers=self.headers,
+        )
+        second_id = self.second.id
+        self.client.delete(path=f"trainings/{second_id}", headers=self.headers)
+        third = self._create_sample_training(self.user, name="third")
+
+        response = self.__sync(cursor)
+
+        self.assertEqual(
+            [(t["name"], t["distance"]) for t in response.json["trainings"]],
+            [("first", 3), ("third", 10)],
+        )
+        self.assertEqual(response.json["deleted"], [second_id])
+        self.assertEqual(response.json["cursor"], third.change_seq)
+
+    def test_sync_without_changes(self):
+        """Test if the cursor stays the same if nothing has changed"""
+        cursor = self.__sync().json["cursor"]
+
+        response = self.__sync(cursor)
+
+        self.assertEqual(response.json["trainings"], [])
+        self.assertEqual(response.json["cursor"], cursor)
+
+    def test_paging(self):
+        """Test if the changes are returned in pages of the page size"""
+        self.app.config["SYNC_PAGE_SIZE"] = 1
+
+        first_page = self.__sync()
+        second_page = self.__sync(first_page.json["cursor"])
+
+        self.assertTrue(first_page.json["has_more"])
+        self.assertEqual(first_page.json["trainings"][0]["name"], "first")
+        self.assertFalse(second_page.json["has_more"])
+        self.assertEqual(second_page.json["trainings"][0]["name"], "second")
+
+    def test_change_seq_increases(self):
+        """Test if every change gets a higher change sequence number"""
+        self.first.distance = 20
+        self.first.save_to_db()
+
+        self.assertGreater(self.first.change_seq, self.second.change_seq)
+        self.assertIsNotNone(self.first.updated_at)
+
+    def test_reused_id_isnt_deleted(self):
+        """Test if a training with the id of a deleted one
+        isn't reported as deleted"""
+        cursor = self.__sync().json["cursor"]
+        second_id = self.second.id
+        self.second.delete_from_db()
+        training = TrainingModel(
+            id=second_id,
+            name="reused",
+            user_id=self.user.id,
+            distance=5,
+            time_in_seconds=1800,
+        )
+        training.save_to_db()
+
+        response = self.__sync(cursor)
+
+        self.assertEqual(response.json["deleted"], [])
+        self.assertEqual(response.json["trainings"][0]["id"], second_id)
+
+    def test_invalid_cursor(self):
+        """Test if a cursor which isn't a number gets 400"""
+        self.assertEqual(self.__sync("abc").status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import csv
+import io
 import json
 import unittest
 from runningapp import create_app
@@ -9,6 +11,7 @@ from runningapp.tests.base_classes import (
     BaseDb,
     BaseUser,
     BaseTraining,
+    BaseQueryCounter,
 )
 
 
@@ -334,5 +337,253 @@ class TrainingListTests(
         self.assertEqual(training.time_in_seconds, data["time_in_seconds"])
 
 
+class TrainingMultiGetTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        other_user = self._create_sample_user(username="otheruser")
+        self.access_token = self._get_access_token(self.client)
+        self.first = self._create_sample_training(self.user, name="first")
+        self.second = self._create_sample_training(self.user, name="second")
+        self.other = self._create_sample_training(other_user, name="other")
+
+    def __get(self, ids):
+        return self.client.get(
+            path=f"trainings?ids={ids}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+
+    def test_trainings_in_order_of_ids(self):
+        """Test if the trainings are returned in the order of the ids"""
+        response = self.__get(f"{self.second.id},{self.first.id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [t["name"] for t in response.json["trainings"]],
+            ["second", "first"],
+        )
+        self.assertEqual(response.json["not_found"], [])
+
+    def test_other_users_training_not_found(self):
+        """Test if the trainings of other users and the missing ones
+        are reported as not found"""
+        response = self.__get(f"{self.first.id},{self.other.id},1000")
+
+        self.assertEqual(
+            [t["name"] for t in response.json["trainings"]], ["first"]
+        )
+        self.assertEqual(response.json["not_found"], [self.other.id, 1000])
+
+    def test_single_query(self):
+        """Test if all the trainings are found with one query"""
+        ids = f"{self.first.id},{self.second.id},{self.first.id}"
+        with self._record_statements(db.engine) as statements:
+            response = self.__get(ids)
+
+        self.assertEqual(len(response.json["trainings"]), 2)
+        self.assertEqual(
+            len([s for s in statements if "FROM trainings" in s]), 1
+        )
+
+    def test_invalid_ids(self):
+        """Test if ids which aren't numbers or too many ids get 400"""
+        self.app.config["MULTI_GET_MAX_IDS"] = 2
+
+        self.assertEqual(self.__get("1,a").status_code, 400)
+        self.assertEqual(self.__get(",").status_code, 400)
+        self.assertEqual(self.__get("1,2,3").status_code, 400)
+
+
+class TrainingWriteQueriesTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.access_token = self._get_access_token(self.client)
+        self.training = self._create_sample_training(self.user)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}",
+        }
+
+    def test_post_writes_once_without_reloading(self):
+        """Test if the training, the profile and the event are written
+        together and the response is dumped without another query"""
+        data = {"name": "test2", "distance": 5, "time_in_seconds": 1800}
+        with self._record_statements(db.engine) as statements:
+            response = self.client.post(
+                path="trainings/", data=json.dumps(data), headers=self.headers
+            )
+        writes = self._get_statements_after_first_write(statements)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(writes), 3)
+        self.assertTrue(
+            any(
+                write.startswith("INSERT INTO outbox_events")
+                for write in writes
+            )
+        )
+        self.assertTrue(
+            any(write.startswith("INSERT INTO trainings") for write in writes)
+        )
+        self.assertTrue(
+            any(write.startswith("UPDATE user_profiles") for write in writes)
+        )
+
+    def test_put_writes_once_without_reloading(self):
+        """Test if the training, the profile and the event are written
+        together and the response is dumped without another query"""
+        data = {"name": "test", "distance": 7, "time_in_seconds": 1800}
+        with self._record_statements(db.engine) as statements:
+            response = self.client.put(
+                path=f"trainings/{self.training.id}",
+                data=json.dumps(data),
+                headers=self.headers,
+            )
+        writes = self._get_statements_after_first_write(statements)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["distance"], 7)
+        self.assertEqual(len(writes), 3)
+        self.assertTrue(
+            any(
+                write.startswith("INSERT INTO outbox_events")
+                for write in writes
+            )
+        )
+        self.assertTrue(
+            any(write.startswith("UPDATE trainings") for write in writes)
+        )
+        self.assertTrue(
+            any(write.startswith("UPDATE user_profiles") for write in writes)
+        )
+
+    def test_delete_writes_once(self):
+        """Test if the training is marked deleted, its tombstone,
+        the event and the purge job are inserted in the same transaction
+        as the profile is updated"""
+        with self._record_statements(db.engine) as statements:
+            self.client.delete(
+                path=f"trainings/{self.training.id}", headers=self.headers
+            )
+        writes = self._get_statements_after_first_write(statements)
+
+        self.assertEqual(len(writes), 5)
+        # the pending purge job is looked up before the first write
+        self.assertFalse(any(write.startswith("SELECT") for write in writes))
+        self.assertTrue(
+            any(
+                write.startswith("INSERT INTO outbox_events")
+                for write in writes
+            )
+        )
+        self.assertTrue(
+            any(write.startswith("UPDATE trainings") for write in writes)
+        )
+        self.assertTrue(
+            any(
+                write.startswith("INSERT INTO training_tombstones")
+                for write in writes
+            )
+        )
+
+
+class TrainingExportTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.app.config["EXPORT_BATCH_SIZE"] = 2
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        other_user = self._create_sample_user(username="otheruser")
+        self.access_token = self._get_access_token(self.client)
+        for i in range(5):
+            self._create_sample_training(self.user, name=f"run {i}")
+        self._create_sample_training(other_user, name="other")
+        self.trainings = training_list_schema.dump(
+            TrainingModel.find_all_by_user_id(self.user.id)
+        )
+
+    def __export(self, query=""):
+        return self.client.get(
+            path=f"trainings/export{query}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+
+    def test_export_json(self):
+        """Test if the JSON export has the same trainings as the list"""
+        response = self.__export()
+
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.content_type, "application/json")
+        self.assertEqual(
+            json.loads(response.data), {"trainings": self.trainings}
+        )
+
+    def test_export_ndjson(self):
+        """Test if the NDJSON export has one training per line"""
+        response = self.__export("?format=ndjson")
+        lines = response.data.decode().splitlines()
+
+        self.assertEqual(response.content_type, "application/x-ndjson")
+        self.assertEqual([json.loads(line) for line in lines], self.trainings)
+
+    def test_export_csv(self):
+        """Test if the CSV export has a header and a row per training"""
+        response = self.__export("?format=csv&fields=name,distance")
+        rows = list(csv.DictReader(io.StringIO(response.data.decode())))
+
+        self.assertEqual(response.content_type, "text/csv; charset=utf-8")
+        self.assertEqual(
+            rows,
+            [
+                {"name": t["name"], "distance": str(t["distance"])}
+                for t in self.trainings
+            ],
+        )
+
+    def test_export_without_trainings(self):
+        """Test if the export of a user without trainings is empty"""
+        self.access_token = self._get_access_token(
+            self.client, username="otheruser"
+        )
+        TrainingModel.find_by_name("other").delete_from_db()
+
+        self.assertEqual(json.loads(self.__export().data), {"trainings": []})
+        self.assertEqual(self.__export("?format=ndjson").data, b"")
+        self.assertEqual(
+            self.__export("?format=csv&fields=name").data, b"name\r\n"
+        )
+
+    def test_unsupported_format(self):
+        """Test if an unknown format gets 400"""
+        response = self.__export("?format=xml")
+
+        self.assertEqual(response.status_code, 400)
+
+
 if __name__ == "__main__":
     unittest.main()
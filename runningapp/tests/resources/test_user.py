@@ -6,7 +6,12 @@ from runningapp import create_app
 from runningapp.db import db
 from runningapp.models.user import UserModel, UserProfileModel
 from runningapp.schemas.user import UserSchema
-from runningapp.tests.base_classes import BaseApp, BaseDb, BaseUser
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseQueryCounter,
+)
 from runningapp.blacklist import BLACKLIST
 
 
@@ -158,7 +163,55 @@ class UserListTest(unittest.TestCase, BaseApp, BaseDb, BaseUser):
         self.assertEqual(self.response.json["users"], trainings_data)
 
 
-class UserProfileTest(unittest.TestCase, BaseApp, BaseDb, BaseUser):
+class UserMultiGetTest(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseQueryCounter
+):
+    def setUp(self):
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="user2")
+        self.access_token = self._get_access_token(self.client)
+
+    def __get(self, ids):
+        return self.client.get(
+            path=f"users?ids={ids}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+
+    def test_users_in_order_of_ids(self):
+        """Test if the users are returned in the order of the ids
+        with the missing ids reported as not found"""
+        response = self.__get(f"{self.other_user.id},1000,{self.user.id}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [user["username"] for user in response.json["users"]],
+            ["user2", "testuser"],
+        )
+        self.assertEqual(response.json["not_found"], [1000])
+
+    def test_profiles_loaded_at_once(self):
+        """Test if the users and their profiles are loaded
+        with a query each"""
+        with self._record_statements(db.engine) as statements:
+            response = self.__get(f"{self.user.id},{self.other_user.id}")
+
+        self.assertEqual(
+            [len(user["user_profile"]) for user in response.json["users"]],
+            [1, 1],
+        )
+        self.assertEqual(len([s for s in statements if "FROM users" in s]), 1)
+        self.assertEqual(
+            len([s for s in statements if "FROM user_profiles" in s]), 1
+        )
+
+
+class UserProfileTest(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseQueryCounter
+):
     def setUp(self):
         """Set up a test app, test client and test database"""
         self.app = self._set_up_test_app(create_app)
@@ -209,6 +262,27 @@ class UserProfileTest(unittest.TestCase, BaseApp, BaseDb, BaseUser):
             "weight": 55,
         }
 
+    def test_update_writes_once_without_reloading(self):
+        self.__given_test_user_is_created()
+        self.__given_test_user_profile_data_is_prepared()
+
+        with self._record_statements(db.engine) as statements:
+            self.__when_update_user_profile_is_sent_on_put_request(
+                self.user_profile1.id
+            )
+
+        self.__then_status_code_is_200_ok()
+        self.__then_only_one_update_is_sent(statements)
+
+    def __then_only_one_update_is_sent(self, statements):
+        writes = self._get_statements_after_first_write(statements)
+        # the new weight also enqueues the recalculation of the calories
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(
+            sorted(write.split(" (")[0].split(" SET")[0] for write in writes),
+            ["INSERT INTO jobs", "UPDATE user_profiles"],
+        )
+
     def __then_user_profile_object_is_updated_correctly(self):
         self.assertEqual(
             self.user_profile1.gender, self.user_profile_data["gender"]
@@ -0,0 +1,92 @@
+import json
+import unittest
+from datetime import datetime
+
+from marshmallow import fields
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserModel
+from runningapp.schemas.dumper import PrecompiledDumper
+from runningapp.schemas.training import TrainingSchema
+from runningapp.schemas.user import UserProfileSchema, UserSchema
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class TrainingSchemaWithMethod(TrainingSchema):
+    pace = fields.Method("get_pace")
+
+    def get_pace(self, training):
+        return training.time_in_seconds / training.distance
+
+
+class PrecompiledDumperTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self) -> None:
+        """Set up a test app and a database with sample data"""
+        self.app = self._set_up_test_app(create_app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self._create_sample_user(username="user2", weight=82.5)
+        self._create_sample_training(self.user, "run", 10.25, 3601)
+        training = self._create_sample_training(self.user, "ąę run", 3, 900)
+        training.date = datetime(2020, 2, 29, 23, 59, 59, 999)
+        training.calculate_calories_burnt()
+        training.save_to_db()
+        empty = TrainingModel(
+            name="empty", distance=0.5, time_in_seconds=1, user_id=None
+        )
+        empty.save_to_db()
+
+    def __assert_same_json(self, schema, objects):
+        """Check if the dumper produces the same JSON as the schema
+        for the objects dumped one by one and as a list"""
+        dumper = PrecompiledDumper(schema)
+        for obj in objects:
+            self.assertEqual(
+                json.dumps(dumper.dump(obj, many=False)),
+                json.dumps(schema.dump(obj, many=False)),
+            )
+        self.assertEqual(
+            json.dumps(dumper.dump(objects, many=True)),
+            json.dumps(schema.dump(objects, many=True)),
+        )
+
+    def test_training_dump_is_compiled(self):
+        """Test if the training schema is supported by the generated code"""
+        self.assertIsNotNone(PrecompiledDumper(TrainingSchema()).dump_function)
+
+    def test_training_dump_is_identical(self):
+        """Test if trainings are dumped exactly like marshmallow does"""
+        self.__assert_same_json(TrainingSchema(), TrainingModel.find_all())
+
+    def test_user_dump_with_nested_profile_is_identical(self):
+        """Test if users and their nested profiles
+        are dumped exactly like marshmallow does"""
+        self.__assert_same_json(UserSchema(), UserModel.find_all())
+
+    def test_user_profile_dump_is_identical(self):
+        """Test if a user profile is dumped exactly like marshmallow does"""
+        self.__assert_same_json(
+            UserProfileSchema(), list(self.user.user_profile)
+        )
+
+    def test_unsupported_schema_falls_back_to_marshmallow(self):
+        """Test if a schema with an unsupported field
+        is dumped by marshmallow"""
+        schema = TrainingSchemaWithMethod()
+        dumper = PrecompiledDumper(schema)
+
+        self.assertIsNone(dumper.dump_function)
+        self.__assert_same_json(schema, TrainingModel.find_all())
+
+
+if __name__ == "__main__":
+    unittest.main()
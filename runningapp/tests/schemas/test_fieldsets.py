@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import ANY
+
+from marshmallow import ValidationError
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.schemas.fieldsets import SparseFieldsets
+from runningapp.schemas.training import TrainingSchema
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class SparseFieldsetsTests(unittest.TestCase, BaseApp):
+    def setUp(self) -> None:
+        """Set up a test app and the field sets of trainings"""
+        self.app = self._set_up_test_app(create_app)
+        self.fieldsets = SparseFieldsets(TrainingSchema, TrainingModel)
+
+    def test_no_fields_get_the_default(self):
+        """Test if the whole schema is used without the fields argument"""
+        self.assertIs(self.fieldsets.get(""), self.fieldsets.default)
+        self.assertIs(self.fieldsets.get(" , "), self.fieldsets.default)
+
+    def test_fieldset_is_cached(self):
+        """Test if the same field set in any order
+        is built only once"""
+        fieldset = self.fieldsets.get("name,date")
+
+        self.assertIs(self.fieldsets.get("date, name"), fieldset)
+        self.assertEqual(
+            set(fieldset.dumper.schema.dump_fields), {"name", "date"}
+        )
+
+    def test_invalid_fields(self):
+        """Test if unknown fields raise a validation error"""
+        with self.assertRaises(ValidationError) as context:
+            self.fieldsets.get("name,pace")
+
+        self.assertIn("fields", context.exception.messages)
+
+
+class SparseFieldsetsResourcesTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self._create_sample_training(self.user)
+        self.access_token = self._get_access_token(self.client)
+        self.headers = {"Authorization": f"Bearer {self.access_token}"}
+
+    def test_trainings_fields(self):
+        """Test if only the requested fields are selected and returned"""
+        with self._record_statements(db.engine) as statements:
+            response = self.client.get(
+                path="/trainings?fields=name,date,distance",
+                headers=self.headers,
+            )
+        select = next(s for s in statements if "FROM trainings" in s)
+
+        self.assertEqual(
+            response.json["trainings"],
+            [{"name": "test", "distance": 10.0, "date": ANY}],
+        )
+        self.assertIn("trainings.distance", select)
+        self.assertNotIn("trainings.calories", select)
+        self.assertNotIn("trainings.time_in_seconds", select)
+
+    def test_invalid_fields_are_bad_request(self):
+        """Test if unknown fields get 400"""
+        response = self.client.get(
+            path="/trainings?fields=name,password", headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json)
+
+    def test_users_without_profile(self):
+        """Test if the profiles aren't queried
+        if the client doesn't ask for them"""
+        with self._record_statements(db.engine) as statements:
+            response = self.client.get(path="/users?fields=id,username")
+
+        self.assertEqual(
+            response.json["users"],
+            [{"id": self.user.id, "username": "testuser"}],
+        )
+        self.assertFalse(any("user_profiles" in s for s in statements))
+
+    def test_user_with_nested_fields(self):
+        """Test if the fields of the nested profile can be chosen"""
+        response = self.client.get(
+            path=f"/users/{self.user.id}?fields=username,user_profile.bmi"
+        )
+
+        self.assertEqual(
+            response.json,
+            {"username": "testuser", "user_profile": [{"bmi": 23.0}]},
+        )
+
+    def test_password_cant_be_dumped(self):
+        """Test if the load only password isn't a valid field"""
+        response = self.client.get(path="/users?fields=username,password")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_nested_fields(self):
+        """Test if unknown fields of the nested profile get 400"""
+        response = self.client.get(
+            path="/users?fields=username,user_profile.password"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
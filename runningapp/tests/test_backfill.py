@@ -0,0 +1,161 @@
+import unittest
+from unittest.mock import patch
+
+from runningapp import create_app
+from runningapp.backfill import (
+    backfill_checkpoints,
+    BACKFILLS,
+    plan_ranges,
+    run_backfill,
+)
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class BackfillTests(unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining):
+    def setUp(self) -> None:
+        """Set up a test app and test database with stale calories"""
+        self.app = self._set_up_test_app(create_app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(
+            username="otheruser", weight=90
+        )
+        for i in range(7):
+            self._create_sample_training(
+                self.user, name=f"run {i}", time_in_seconds=1800 + i * 600
+            )
+            self._create_sample_training(
+                self.other_user, name=f"run {i}", distance=5 + i
+            )
+        TrainingModel.query.update({"calories": 0})
+        db.session.commit()
+
+    def __get_calories(self):
+        return [training.calories for training in self.__get_trainings()]
+
+    def __get_trainings(self):
+        return TrainingModel.query.order_by(TrainingModel.id).all()
+
+    def __get_expected_calories(self):
+        expected = []
+        for training in self.__get_trainings():
+            training.calculate_calories_burnt()
+            expected.append(training.calories)
+        db.session.rollback()
+        return expected
+
+    def __get_checkpoints(self):
+        return db.engine.execute(
+            backfill_checkpoints.select().order_by(
+                backfill_checkpoints.c.range_start
+            )
+        ).fetchall()
+
+    def test_backfill_matches_model_methods(self):
+        """Test if the backfill recalculates the calories
+        the same way as the model does"""
+        expected = self.__get_expected_calories()
+
+        result = run_backfill(self.app, "training_calories", chunk_size=3)
+
+        self.assertEqual(result.rows, 14)
+        self.assertEqual(self.__get_calories(), expected)
+
+    def test_workers_get_disjoint_ranges(self):
+        """Test if every worker recalculates its own range of ids"""
+        expected = self.__get_expected_calories()
+        with db.engine.begin() as connection:
+            checkpoints = plan_ranges(
+                connection, BACKFILLS["training_calories"], 3
+            )
+
+        result = run_backfill(
+            self.app, "training_calories", workers=3, chunk_size=2
+        )
+
+        self.assertEqual(len(checkpoints), 3)
+        for previous, checkpoint in zip(checkpoints, checkpoints[1:]):
+            self.assertEqual(previous.range_end + 1, checkpoint.range_start)
+        self.assertEqual(result.rows, 14)
+        self.assertEqual(self.__get_calories(), expected)
+
+    def test_finished_backfill_runs_again(self):
+        """Test if the next run of a finished backfill
+        covers all the rows, including the ones added since"""
+        run_backfill(self.app, "training_calories")
+        self._create_sample_training(self.user, name="added")
+        db.session.commit()
+
+        result = run_backfill(self.app, "training_calories")
+
+        self.assertEqual(result.rows, 15)
+        self.assertEqual(self.__get_checkpoints(), [])
+
+    def test_interrupted_backfill_resumes(self):
+        """Test if a backfill run again after a failure
+        skips the chunks committed before it"""
+        job = BACKFILLS["training_calories"]
+        chunks = []
+
+        def fail_on_third_chunk(trainings):
+            chunks.append([training.id for training in trainings])
+            if len(chunks) == 3:
+                raise RuntimeError("killed")
+            job.apply(trainings)
+
+        failing = job._replace(apply=fail_on_third_chunk)
+        with patch.dict(BACKFILLS, {"training_calories": failing}):
+            with self.assertRaises(RuntimeError):
+                run_backfill(self.app, "training_calories", chunk_size=4)
+
+        self.assertEqual(self.__get_checkpoints()[0].rows, 8)
+
+        with patch.dict(BACKFILLS, {"training_calories": failing}):
+            result = run_backfill(self.app, "training_calories", chunk_size=4)
+
+        self.assertEqual(result.rows, 6)
+        self.assertEqual(chunks[3][0], chunks[2][0])
+        self.assertEqual(self.__get_calories(), self.__get_expected_calories())
+
+    def test_ranges_are_kept_between_runs(self):
+        """Test if a resumed backfill reuses the ranges
+        regardless of the number of workers"""
+        with db.engine.begin() as connection:
+            first = plan_ranges(connection, BACKFILLS["user_profile_bmi"], 2)
+            second = plan_ranges(connection, BACKFILLS["user_profile_bmi"], 5)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(first, second)
+
+    def test_backfill_command(self):
+        """Test if the CLI command reports the rows per second
+        and runs over all the rows every time"""
+        UserProfileModel.query.update({"bmi": 0})
+        db.session.commit()
+        runner = self.app.test_cli_runner()
+
+        result = runner.invoke(args=["backfill", "user_profile_bmi"])
+        again = runner.invoke(args=["backfill", "user_profile_bmi"])
+        restarted = runner.invoke(
+            args=["backfill", "user_profile_bmi", "--restart"]
+        )
+
+        self.assertIn("user_profile_bmi: 2 rows in", result.output)
+        self.assertIn("rows/s", result.output)
+        self.assertIn("user_profile_bmi: 2 rows in", again.output)
+        self.assertIn("user_profile_bmi: 2 rows in", restarted.output)
+        self.assertTrue(
+            all(profile.bmi > 0 for profile in UserProfileModel.query.all())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import random
+import unittest
+from unittest.mock import patch
+from runningapp import calculations
+from runningapp.models.user import UserProfileModel
+
+
+# python3.8 -m unittest runningapp/tests/test_calculations.py
+
+
+# TODO REFACTOR ALL THE TESTS
+class CalculationsTests(unittest.TestCase):
+    def test_calculate_bmi_success(self):
+        """Test if BMI is calculated correctly."""
+        height = 165
+        weight = 58
+        bmi = calculations.calculate_bmi(height, weight)
+        expected_bmi = 21.3
+        self.assertEqual(bmi, expected_bmi)
+
+    def test_calculate_bmi_failure(self):
+        """Test if BMI is calculated incorrectly."""
+        height = 165
+        weight = 58
+        bmi = calculations.calculate_bmi(height, weight)
+        wrong_bmi = 21
+        self.assertNotEqual(bmi, wrong_bmi)
+
+    def test_calculate_activity_factor_success(self):
+        """Test if the activity factor is calculated correctly."""
+        trainings_per_week = 5
+        activity_factor = calculations.get_activity_factor(
+            trainings_per_week
+        )
+        expected_activity_factor = 1.8
+        self.assertEqual(activity_factor, expected_activity_factor)
+
+    def test_calculate_activity_factor_failure(self):
+        """Test if the activity factor is calculated incorrectly."""
+        trainings_per_week = 5
+        activity_factor = calculations.get_activity_factor(
+            trainings_per_week
+        )
+        wrong_activity_factor = 2
+        self.assertNotEqual(activity_factor, wrong_activity_factor)
+
+    def test_calculate_daily_caloric_needs_success(self):
+        """Test if the daily caloric needs is calculated correctly."""
+        trainings_per_week = 5
+        weight = 58
+        height = 165
+        gender = "Female"
+        age = 25
+
+        daily_cal = calculations.calculate_daily_caloric_needs(
+            age, height, weight, gender, trainings_per_week
+        )
+        expected_daily_cal = 2504
+
+        self.assertEqual(daily_cal, expected_daily_cal)
+
+    def test_calculate_daily_caloric_needs_failure(self):
+        """Test if the daily caloric needs is calculated incorrectly."""
+        trainings_per_week = 5
+        weight = 58
+        height = 165
+        gender = "Female"
+        age = 25
+
+        daily_cal = calculations.calculate_daily_caloric_needs(
+            age, height, weight, gender, trainings_per_week
+        )
+        wrong_daily_cal = 2200
+
+        self.assertNotEqual(daily_cal, wrong_daily_cal)
+
+
+class UserProfileActivityFactorTests(unittest.TestCase):
+    def setUp(self):
+        """Prepare a user profile, which takes the activity factor
+        from the calculations"""
+        self.user_profile = UserProfileModel(
+            gender="Female", age=25, height=165, weight=58
+        )
+        self.bmr = calculations.calculate_bmr(25, 165, 58, "Female")
+
+    def test_calculate_activity_factor_success(self):
+        """Test if the activity factor is calculated correctly."""
+        trainings_per_week = 5
+
+        self.user_profile.calculate_daily_caloric_needs(trainings_per_week)
+        expected_activity_factor = 1.8
+
+        self.assertEqual(
+            self.user_profile.daily_cal,
+            int(self.bmr * expected_activity_factor),
+        )
+
+    def test_calculate_activity_factor_failure(self):
+        """Test if the activity factor is calculated incorrectly."""
+        trainings_per_week = 5
+
+        self.user_profile.calculate_daily_caloric_needs(trainings_per_week)
+        wrong_activity_factor = 2
+
+        self.assertNotEqual(
+            self.user_profile.daily_cal, int(self.bmr * wrong_activity_factor)
+        )
+
+
+class ManyPeopleFunctionsTests(unittest.TestCase):
+    def setUp(self):
+        """Prepare random people"""
+        rng = random.Random(0)
+        self.people = [
+            (
+                rng.randint(10, 90),
+                rng.uniform(140, 210),
+                rng.uniform(40, 150),
+                rng.choice(["Male", "Female"]),
+                rng.randint(0, 7),
+            )
+            for _ in range(5000)
+        ]
+
+    def __calculate_many_daily_caloric_needs(self):
+        return calculations.calculate_many_daily_caloric_needs(
+            *zip(*self.people)
+        )
+
+    def test_many_daily_caloric_needs_same_as_single(self):
+        """Test if the daily caloric needs of many people are exactly
+        the same as calculated for every person"""
+        expected = [
+            calculations.calculate_daily_caloric_needs(*person)
+            for person in self.people
+        ]
+
+        self.assertEqual(self.__calculate_many_daily_caloric_needs(), expected)
+        with patch.object(calculations, "numpy", None):
+            self.assertEqual(
+                self.__calculate_many_daily_caloric_needs(), expected
+            )
+
+    def test_many_bmi_same_as_single(self):
+        """Test if BMI of many people is exactly the same
+        as calculated for every person"""
+        _, heights, weights, _, _ = zip(*self.people)
+        # 2 m and the tenths of kilograms give many values
+        # at a half of a tenth, which NumPy rounds differently
+        heights += (200,) * 1200
+        weights += tuple(w / 10 for w in range(300, 1500))
+        expected = [
+            calculations.calculate_bmi(height, weight)
+            for height, weight in zip(heights, weights)
+        ]
+
+        self.assertEqual(
+            calculations.calculate_many_bmi(heights, weights), expected
+        )
+        with patch.object(calculations, "numpy", None):
+            self.assertEqual(
+                calculations.calculate_many_bmi(heights, weights), expected
+            )
+
+    def test_many_bmi_zero_height(self):
+        """Test if a zero height fails as for a single person"""
+        with self.assertRaises(ZeroDivisionError):
+            calculations.calculate_many_bmi([180, 0], [70, 70])
+
+
+class CachedCalculationsTests(unittest.TestCase):
+    def setUp(self):
+        """Start with empty caches"""
+        calculations.cached_calculate_bmi.cache_clear()
+        calculations.cached_calculate_daily_caloric_needs.cache_clear()
+
+    def test_repeated_inputs_are_cached(self):
+        """Test if the same inputs are calculated once"""
+        for _ in range(3):
+            bmi = calculations.cached_calculate_bmi(165, 58)
+            daily_cal = calculations.cached_calculate_daily_caloric_needs(
+                25, 165, 58, "Female", 5
+            )
+
+        self.assertEqual(bmi, calculations.calculate_bmi(165, 58))
+        self.assertEqual(daily_cal, 2504)
+        self.assertEqual(calculations.cached_calculate_bmi.cache_info().hits, 2)
+        self.assertEqual(
+            calculations.cached_calculate_daily_caloric_needs.cache_info().hits,
+            2,
+        )
+
+    def test_cache_is_bounded(self):
+        """Test if the cache doesn't grow over its size"""
+        for height in range(calculations.CACHE_SIZE + 10):
+            calculations.cached_calculate_bmi(100 + height, 58)
+
+        self.assertEqual(
+            calculations.cached_calculate_bmi.cache_info().currsize,
+            calculations.CACHE_SIZE,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from runningapp import create_app
+from runningapp.columnar import export_table, pyarrow, read_watermark
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class ColumnarExportTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self) -> None:
+        """Set up a test app, test database and output directory"""
+        self.app = self._set_up_test_app(create_app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        for i in range(5):
+            self._create_sample_training(self.user, name=f"run {i}")
+        db.session.commit()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def __export(self, *args):
+        return self.app.test_cli_runner().invoke(
+            args=["export-columnar", "--output-dir", self.directory, *args]
+        )
+
+    def __read_batches(self, path):
+        with gzip.open(path, "rt") as file:
+            return [json.loads(line) for line in file]
+
+    def test_export_in_batches(self):
+        """Test if every batch of rows is written as a line of columns"""
+        with db.engine.connect() as connection:
+            result = export_table(
+                connection,
+                TrainingModel.__table__,
+                self.directory,
+                batch_size=2,
+                export_format="jsonl",
+            )
+        batches = self.__read_batches(result.path)
+
+        self.assertEqual(result.rows, 5)
+        self.assertEqual([len(batch["id"]) for batch in batches], [2, 2, 1])
+        self.assertEqual(
+            [name for batch in batches for name in batch["name"]],
+            [f"run {i}" for i in range(5)],
+        )
+        self.assertEqual(set(batches[0]), set(TrainingModel.__table__.c.keys()))
+
+    def test_incremental_export(self):
+        """Test if the next export has only the rows above the watermark"""
+        self.__export("--table", "trainings", "--format", "jsonl")
+        watermark = read_watermark(self.directory, "trainings")
+        training = self._create_sample_training(self.user, name="new")
+
+        result = self.__export("--table", "trainings", "--format", "jsonl")
+        path = os.path.join(
+            self.directory,
+            f"trainings-{watermark}-{training.change_seq}.columns.jsonl.gz",
+        )
+
+        self.assertIn("exported 1 rows", result.output)
+        self.assertEqual(self.__read_batches(path)[0]["name"], ["new"])
+        self.assertEqual(
+            read_watermark(self.directory, "trainings"), training.change_seq
+        )
+
+    def test_no_new_rows(self):
+        """Test if no file is written if there are no new rows"""
+        self.__export("--format", "jsonl")
+        files = set(os.listdir(self.directory))
+
+        result = self.__export("--format", "jsonl")
+
+        self.assertIn("trainings: no new rows.", result.output)
+        self.assertIn("training_tombstones: no new rows.", result.output)
+        self.assertIn("user_profiles: no new rows.", result.output)
+        self.assertEqual(set(os.listdir(self.directory)), files)
+
+    def test_updated_profile_is_exported_again(self):
+        """Test if the profile is exported again once it's updated
+        and once its counters change"""
+        self.__export("--table", "user_profiles", "--format", "jsonl")
+        user_profile = UserProfileModel.find_by_user_id(self.user.id)
+        user_profile.weight = 80
+        db.session.commit()
+
+        result = self.__export("--table", "user_profiles", "--format", "jsonl")
+
+        self.assertIn("exported 1 rows", result.output)
+
+        UserProfileModel.add_to_counters(self.user.id, 1, 5)
+        db.session.commit()
+
+        result = self.__export("--table", "user_profiles", "--format", "jsonl")
+
+        self.assertIn("exported 1 rows", result.output)
+
+    def test_deleted_training_is_exported_as_tombstone(self):
+        """Test if the deletion of a training is exported"""
+        self.__export("--format", "jsonl")
+        training = TrainingModel.find_by_name_and_user_id("run 0", self.user.id)
+        training.mark_deleted()
+        db.session.commit()
+
+        result = self.__export("--format", "jsonl")
+        path = next(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith("training_tombstones-")
+        )
+
+        self.assertIn("training_tombstones: exported 1 rows", result.output)
+        self.assertIn("trainings: no new rows.", result.output)
+        self.assertEqual(
+            self.__read_batches(path)[0]["training_id"], [training.id]
+        )
+
+    def test_since_overrides_watermark(self):
+        """Test if --since exports again from the given watermark"""
+        self.__export("--table", "trainings", "--format", "jsonl")
+
+        result = self.__export(
+            "--table", "trainings", "--format", "jsonl", "--since", "3"
+        )
+
+        self.assertIn("exported 2 rows", result.output)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_is_default_format(self):
+        """Test if the command writes Parquet files by default"""
+        result = self.__export("--table", "trainings")
+        path = os.path.join(
+            self.directory,
+            f"trainings-0-{read_watermark(self.directory, 'trainings')}"
+            ".parquet",
+        )
+
+        self.assertIn("exported 5 rows", result.output)
+        self.assertEqual(pyarrow.parquet.read_table(path).num_rows, 5)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_export(self):
+        """Test if the Parquet file has a row group for every batch"""
+        with db.engine.connect() as connection:
+            result = export_table(
+                connection,
+                TrainingModel.__table__,
+                self.directory,
+                batch_size=2,
+                export_format="parquet",
+            )
+        parquet_file = pyarrow.parquet.ParquetFile(result.path)
+
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(
+            parquet_file.read().column("name").to_pylist(),
+            [f"run {i}" for i in range(5)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import gzip
+import json
+import unittest
+import zlib
+
+from flask import Response
+
+from runningapp import create_app
+from runningapp.compression import brotli
+from runningapp.db import db
+from runningapp.tests.base_classes import BaseApp, BaseDb, BaseUser
+
+
+class CompressionTests(unittest.TestCase, BaseApp, BaseDb, BaseUser):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        for i in range(20):
+            self._create_sample_user(username=f"user{i}")
+        self.access_token = self._get_access_token(
+            self.client, username="user0"
+        )
+
+    def __get_users(self, accept_encoding=None):
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        if accept_encoding is not None:
+            headers["Accept-Encoding"] = accept_encoding
+        return self.client.get(path="/users", headers=headers)
+
+    def test_gzip_response(self):
+        """Test if a large response is gzipped if the client accepts it"""
+        plain = self.__get_users()
+        response = self.__get_users("gzip")
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertLess(len(response.data), len(plain.data))
+        self.assertEqual(gzip.decompress(response.data), plain.data)
+
+    def test_deflate_response(self):
+        """Test if deflate is used if it's the only accepted encoding"""
+        plain = self.__get_users()
+        response = self.__get_users("deflate")
+
+        self.assertEqual(response.headers["Content-Encoding"], "deflate")
+        self.assertEqual(zlib.decompress(response.data), plain.data)
+
+    @unittest.skipIf(brotli is None, "brotli is not installed")
+    def test_brotli_is_preferred(self):
+        """Test if brotli is chosen over gzip"""
+        plain = self.__get_users()
+        response = self.__get_users("gzip, deflate, br")
+
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.data), plain.data)
+
+    def test_not_accepted_encoding(self):
+        """Test if the response isn't compressed
+        if the client doesn't accept any supported encoding"""
+        response = self.__get_users("identity")
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(len(json.loads(response.data)["users"]), 20)
+
+    def test_small_response_isnt_compressed(self):
+        """Test if a response below the size threshold isn't compressed"""
+        response = self.client.get(
+            path="/total-users-number", headers={"Accept-Encoding": "gzip"}
+        )
+
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.json, {"users_number": 20})
+
+    def test_streamed_response(self):
+        """Test if a generator response is compressed chunk by chunk"""
+        lines = [f'{{"line": {i}}}\n' for i in range(100)]
+        self.app.add_url_rule(
+            "/test-stream",
+            "test_stream",
+            lambda: Response(iter(lines), mimetype="application/x-ndjson"),
+        )
+
+        response = self.client.get(
+            path="/test-stream", headers={"Accept-Encoding": "gzip"}
+        )
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertNotIn("Content-Length", response.headers)
+        self.assertEqual(
+            gzip.decompress(response.data), "".join(lines).encode()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import unittest
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class OptimisticConcurrencyTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.training = self._create_sample_training(self.user)
+        self.user_profile = UserProfileModel.find_by_user_id(self.user.id)
+        self.access_token = self._get_access_token(self.client)
+
+    def __headers(self, version=None):
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}",
+        }
+        if version is not None:
+            headers["If-Match"] = f'"{version}"'
+        return headers
+
+    def __put_training(self, version=None, name="updated"):
+        return self.client.put(
+            path=f"/trainings/{self.training.id}",
+            data=json.dumps(
+                {"name": name, "distance": 7, "time_in_seconds": 3600}
+            ),
+            headers=self.__headers(version),
+        )
+
+    def __put_profile(self, version=None):
+        return self.client.put(
+            path=f"/userprofiles/{self.user_profile.id}",
+            data=json.dumps(
+                {"gender": "Male", "age": 30, "height": 185, "weight": 70}
+            ),
+            headers=self.__headers(version),
+        )
+
+    def test_put_with_current_version(self):
+        """Test if the training is updated if the client has
+        its current version and the new version is returned"""
+        response = self.__put_training(version=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["version"], 2)
+
+    def test_put_with_stale_version_conflicts(self):
+        """Test if the update based on an old version gets 409
+        and doesn't change the training"""
+        self.__put_training(version=1)
+
+        response = self.__put_training(version=1, name="lost")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(
+            TrainingModel.find_by_id(self.training.id).name, "updated"
+        )
+
+    def test_put_without_if_match(self):
+        """Test if the clients which don't send If-Match
+        can still update the training"""
+        self.__put_training()
+
+        self.assertEqual(self.__put_training(name="again").status_code, 200)
+
+    def test_concurrent_update_is_detected(self):
+        """Test if the update of a training changed by another writer
+        since it was loaded fails instead of overwriting the change"""
+        training = TrainingModel.find_by_id(self.training.id)
+        table = TrainingModel.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.id == training.id)
+            .values(version=table.c.version + 1)
+        )
+
+        training.name = "overwritten"
+        with self.assertRaises(StaleDataError):
+            db.session.commit()
+
+    def test_counters_do_not_conflict_with_profile(self):
+        """Test if a new training, which changes the counters,
+        doesn't make the profile update based on the same version fail"""
+        self.client.post(
+            path="/trainings",
+            data=json.dumps(
+                {"name": "new", "distance": 5, "time_in_seconds": 1800}
+            ),
+            headers=self.__headers(),
+        )
+
+        response = self.__put_profile(version=1)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["trainings_number"], 1)
+        self.assertEqual(response.json["version"], 2)
+
+    def test_profile_put_with_stale_version_conflicts(self):
+        """Test if the profile update based on an old version gets 409"""
+        self.__put_profile(version=1)
+
+        self.assertEqual(self.__put_profile(version=1).status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.pool import QueuePool
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.tests.base_classes import BaseApp
+
+
+class DatabaseConfigTests(unittest.TestCase, BaseApp):
+    def setUp(self) -> None:
+        """Create a test app"""
+        self.app = self._set_up_test_app(create_app)
+
+    def test_sqlite_pragmas_are_set(self):
+        """Test if the pragmas are set on the SQLite connections"""
+        with db.engine.connect() as connection:
+            journal_mode = connection.execute("PRAGMA journal_mode").scalar()
+            synchronous = connection.execute("PRAGMA synchronous").scalar()
+            busy_timeout = connection.execute("PRAGMA busy_timeout").scalar()
+
+        self.assertEqual(journal_mode, "wal")
+        self.assertEqual(synchronous, 1)  # NORMAL
+        self.assertEqual(
+            busy_timeout, self.app.config["DB_STATEMENT_TIMEOUT_MS"]
+        )
+
+    def test_sqlite_connections_are_pooled(self):
+        """Test if the connections to the SQLite file are kept in a pool"""
+        self.assertIsInstance(db.engine.pool, QueuePool)
+
+    def test_postgresql_options(self):
+        """Test if the pool options and the statement timeout
+        are passed to a PostgreSQL engine"""
+        self.app.config["DB_POOL_SIZE"] = 20
+        options = {}
+        db.apply_driver_hacks(
+            self.app, make_url("postgresql://localhost/runningapp"), options
+        )
+
+        self.assertEqual(options["pool_size"], 20)
+        self.assertEqual(
+            options["connect_args"]["options"], "-c statement_timeout=5000"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
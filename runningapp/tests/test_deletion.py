@@ -0,0 +1,116 @@
+import json
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.deletion import purge_deleted
+from runningapp.jobs import run_pending_jobs
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseTraining,
+    BaseUser,
+)
+from runningapp.versions import get_versions
+
+
+class DeleteUserTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.app.config["PURGE_PAUSE_SECONDS"] = 0
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="otheruser")
+        for i in range(5):
+            self._create_sample_training(self.user, name=f"run {i}")
+        self.other_training = self._create_sample_training(self.other_user)
+        self.access_token = self._get_access_token(self.client)
+
+    def __delete_user(self):
+        return self.client.delete(
+            path=f"/users/{self.user.id}",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+
+    def __count_rows(self, model, **filters):
+        return model.query.filter_by(**filters).count()
+
+    def test_deleted_user_is_hidden_at_once(self):
+        """Test if the deleted user is hidden with their profile
+        and trainings without deleting any rows"""
+        versions = get_versions(["trainings"])
+
+        with self._record_statements(db.engine) as statements:
+            response = self.__delete_user()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any(s.startswith("DELETE") for s in statements))
+        self.assertIsNone(UserModel.find_by_id(self.user.id))
+        self.assertIsNone(UserProfileModel.find_by_user_id(self.user.id))
+        self.assertEqual(len(UserModel.find_all()), 1)
+        self.assertEqual(TrainingModel.get_total_kilometers(), 10)
+        self.assertGreater(
+            get_versions(["trainings"])["trainings"], versions["trainings"]
+        )
+
+    def test_username_can_be_taken_again(self):
+        """Test if a new user can register with the username
+        of the deleted one"""
+        self.__delete_user()
+
+        response = self.client.post(
+            path="/register",
+            data=json.dumps({"username": "testuser", "password": "pass"}),
+            headers={"Content-Type": "application/json"},
+        )
+
+        self.assertEqual(response.status_code, 201)
+
+    def test_purge_removes_rows_in_batches(self):
+        """Test if the purge job deletes the trainings in batches
+        and then the user with the rest of their rows"""
+        self.app.config["PURGE_BATCH_SIZE"] = 2
+        self.__delete_user()
+
+        with self._record_statements(db.engine) as statements:
+            self.assertEqual(run_pending_jobs(), 1)
+
+        deletes = [
+            s for s in statements if s.startswith("DELETE FROM trainings")
+        ]
+        self.assertEqual(len(deletes), 4)
+        self.assertEqual(self.__count_rows(UserModel, id=self.user.id), 0)
+        self.assertEqual(
+            self.__count_rows(UserProfileModel, user_id=self.user.id), 0
+        )
+        self.assertEqual(self.__count_rows(TrainingModel), 1)
+
+    def test_purge_removes_deleted_trainings(self):
+        """Test if the trainings marked deleted are hidden
+        until they're purged"""
+        self.other_training.mark_deleted()
+        db.session.commit()
+
+        self.assertIsNone(TrainingModel.find_by_id(self.other_training.id))
+        self.assertEqual(self.__count_rows(TrainingModel), 6)
+
+        result = purge_deleted(batch_size=2, pause=0)
+
+        self.assertEqual((result.trainings, result.users), (1, 0))
+        self.assertEqual(self.__count_rows(TrainingModel), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.idempotency import REPLAYED_HEADER
+from runningapp.models.idempotency import (
+    IDEMPOTENCY_PENDING,
+    IdempotencyKeyModel,
+)
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseUser,
+)
+
+
+class IdempotencyTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseQueryCounter
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.access_token = self._get_access_token(self.client)
+
+    def __post_training(self, key, name="run", distance=5):
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}",
+        }
+        if key is not None:
+            headers["Idempotency-Key"] = key
+        return self.client.post(
+            path="/trainings",
+            data=json.dumps(
+                {"name": name, "distance": distance, "time_in_seconds": 1800}
+            ),
+            headers=headers,
+        )
+
+    def __get_profile(self):
+        return UserProfileModel.find_by_user_id(self.user.id)
+
+    def test_retry_returns_stored_response(self):
+        """Test if the retry gets the response to the first request
+        without the training being created again"""
+        first = self.__post_training("key-1")
+
+        with self._record_statements(db.engine) as statements:
+            retry = self.__post_training("key-1")
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json, first.json)
+        self.assertEqual(retry.headers[REPLAYED_HEADER], "true")
+        self.assertFalse(
+            any(s.startswith("INSERT INTO trainings") for s in statements)
+        )
+        self.assertEqual(len(TrainingModel.find_all()), 1)
+        self.assertEqual(self.__get_profile().trainings_number, 1)
+
+    def test_requests_without_key_run_every_time(self):
+        """Test if the requests without a key aren't deduplicated"""
+        self.__post_training(None)
+
+        response = self.__post_training(None)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(IdempotencyKeyModel.query.count(), 0)
+
+    def test_key_reused_with_other_request(self):
+        """Test if the key sent with another body is rejected"""
+        self.__post_training("key-1")
+
+        response = self.__post_training("key-1", name="other")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(len(TrainingModel.find_all()), 1)
+
+    def test_pending_key_conflicts(self):
+        """Test if the retry of a request still being handled gets 409"""
+        self.__post_training("key-1")
+        stored = IdempotencyKeyModel.query.first()
+        stored.status = IDEMPOTENCY_PENDING
+        db.session.commit()
+
+        response = self.__post_training("key-1")
+
+        self.assertEqual(response.status_code, 409)
+
+    def test_stale_pending_key_is_taken_over(self):
+        """Test if the retry of a request which has crashed
+        before storing its response is handled again"""
+        self.__post_training("key-1")
+        stored = IdempotencyKeyModel.query.first()
+        stored.status = IDEMPOTENCY_PENDING
+        stored.locked_until = datetime.utcnow() - timedelta(seconds=1)
+        # the crash happened before the training was saved
+        db.session.delete(TrainingModel.find_all()[0])
+        db.session.commit()
+
+        response = self.__post_training("key-1")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(TrainingModel.find_all()), 1)
+        stored = IdempotencyKeyModel.query.first()
+        self.assertEqual(stored.response_body, response.json)
+        self.assertGreater(stored.locked_until, datetime.utcnow())
+
+    def test_expired_key_runs_again(self):
+        """Test if the request is handled again once its key expires"""
+        self.__post_training("key-1", name="run")
+        stored = IdempotencyKeyModel.query.first()
+        stored.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        response = self.__post_training("key-1", name="run")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_register_retry_creates_one_user(self):
+        """Test if the retried registration creates one user
+        and gets the response without the access token"""
+        responses = [
+            self.client.post(
+                path="/register",
+                data=json.dumps({"username": "new", "password": "pass"}),
+                headers={
+                    "Content-Type": "application/json",
+                    "Idempotency-Key": "register-1",
+                },
+            )
+            for _ in range(2)
+        ]
+
+        first = dict(responses[0].json)
+
+        self.assertEqual([r.status_code for r in responses], [201, 201])
+        self.assertIsNotNone(first.pop("access_token"))
+        self.assertEqual(responses[1].json, first)
+        self.assertEqual(len(UserModel.find_all()), 2)
+
+    def test_tokens_are_not_stored(self):
+        """Test if the access token of the registration
+        isn't stored with the key"""
+        self.client.post(
+            path="/register",
+            data=json.dumps({"username": "new", "password": "pass"}),
+            headers={
+                "Content-Type": "application/json",
+                "Idempotency-Key": "register-1",
+            },
+        )
+
+        stored = IdempotencyKeyModel.query.one()
+        self.assertNotIn("access_token", stored.response_body)
+
+
+if __name__ == "__main__":
+    unittest.main()
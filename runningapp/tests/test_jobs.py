@@ -0,0 +1,227 @@
+import json
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.jobs import (
+    enqueue,
+    HANDLERS,
+    RECALCULATE_CALORIES_JOB,
+    run_pending_jobs,
+)
+from runningapp.models.job import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    JobModel,
+)
+from runningapp.models.training import TrainingModel
+from runningapp.models.user import UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class RecalculateCaloriesJobTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="otheruser")
+        self.access_token = self._get_access_token(self.client)
+        self.trainings = [
+            self._create_sample_training(
+                self.user, name=f"run {i}", time_in_seconds=1800 + i * 600
+            )
+            for i in range(5)
+        ]
+        self.other_training = self._create_sample_training(self.other_user)
+        self.user_profile = UserProfileModel.find_by_user_id(self.user.id)
+
+    def __put_profile(self, weight):
+        return self.client.put(
+            path=f"/userprofiles/{self.user_profile.id}",
+            data=json.dumps(
+                {"gender": "Male", "age": 25, "height": 185, "weight": weight}
+            ),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+    def __get_job(self, location):
+        return self.client.get(
+            path=location,
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+
+    def __get_calories(self):
+        return [
+            training.calories
+            for training in TrainingModel.find_all_by_user_id(self.user.id)
+        ]
+
+    def __get_expected_calories(self):
+        expected = []
+        for training in TrainingModel.find_all_by_user_id(self.user.id):
+            training.calculate_calories_burnt()
+            expected.append(training.calories)
+        db.session.rollback()
+        return expected
+
+    def test_weight_change_recalculates_calories(self):
+        """Test if changing the weight enqueues a job
+        which recalculates the calories of the user's trainings"""
+        response = self.__put_profile(90)
+        location = response.headers["Location"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.__get_job(location).json["status"], JOB_PENDING)
+        self.assertEqual(self.__get_calories(), [0] * 5)
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job = self.__get_job(location).json
+        self.assertEqual(job["status"], JOB_DONE)
+        self.assertEqual(job["result"], 5)
+        self.assertEqual(self.__get_calories(), self.__get_expected_calories())
+        self.assertEqual(
+            TrainingModel.find_by_id(self.other_training.id).calories, 0
+        )
+
+    def test_same_weight_enqueues_nothing(self):
+        """Test if the profile update without a new weight
+        doesn't enqueue a job"""
+        response = self.__put_profile(self.user_profile.weight)
+
+        self.assertNotIn("Location", response.headers)
+        self.assertEqual(JobModel.query.count(), 0)
+
+    def test_pending_jobs_are_coalesced(self):
+        """Test if the weight changes before the job runs share the job"""
+        first = self.__put_profile(80).headers["Location"]
+        second = self.__put_profile(90).headers["Location"]
+
+        self.assertEqual(first, second)
+        self.assertEqual(run_pending_jobs(), 1)
+
+    def test_duplicates_are_claimed_together(self):
+        """Test if the pending jobs with the same key run once"""
+        key = f"{RECALCULATE_CALORIES_JOB}:user:{self.user.id}"
+        for _ in range(2):
+            db.session.add(
+                JobModel(
+                    kind=RECALCULATE_CALORIES_JOB,
+                    key=key,
+                    payload={"user_id": self.user.id},
+                )
+            )
+        db.session.commit()
+
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(
+            {job.status for job in JobModel.query.all()}, {JOB_DONE}
+        )
+
+    def test_trainings_updated_in_batches(self):
+        """Test if the trainings are updated with a statement per batch
+        and their changes are tracked"""
+        self.app.config["JOBS_BATCH_SIZE"] = 2
+        self.__put_profile(90)
+        change_seq = max(training.change_seq for training in self.trainings)
+
+        with self._record_statements(db.engine) as statements:
+            run_pending_jobs()
+
+        updates = [s for s in statements if s.startswith("UPDATE trainings")]
+        self.assertEqual(len(updates), 3)
+        self.assertTrue(
+            all(
+                training.change_seq > change_seq
+                for training in TrainingModel.find_all_by_user_id(self.user.id)
+            )
+        )
+
+    def test_expired_running_job_is_taken_over(self):
+        """Test if a job left running by a killed worker is run again
+        once its lock expires, but not before"""
+        job = enqueue(
+            RECALCULATE_CALORIES_JOB,
+            f"{RECALCULATE_CALORIES_JOB}:user:{self.user.id}",
+            {"user_id": self.user.id},
+        )
+        job.status = JOB_RUNNING
+        job.locked_by = "killed"
+        job.locked_until = datetime.utcnow() + timedelta(minutes=1)
+        db.session.commit()
+
+        self.assertEqual(run_pending_jobs(), 0)
+
+        job.locked_until = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(JobModel.find_by_id(job.id).status, JOB_DONE)
+
+    def test_failing_job_is_retried(self):
+        """Test if a failing job is attempted again
+        until it runs out of attempts"""
+        self.app.config["JOBS_MAX_ATTEMPTS"] = 2
+
+        def fail(payload):
+            raise ValueError("failed")
+
+        job = enqueue("failing", "failing", {})
+        db.session.commit()
+        with patch.dict(HANDLERS, {"failing": fail}):
+            self.assertEqual(run_pending_jobs(), 2)
+
+        job = JobModel.find_by_id(job.id)
+        self.assertEqual(job.status, JOB_FAILED)
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.error, "failed")
+
+    def test_other_users_job_not_found(self):
+        """Test if the job of another user can't be seen"""
+        job = enqueue("other", "other", {}, user_id=self.other_user.id)
+        db.session.commit()
+
+        self.assertEqual(self.__get_job(f"/jobs/{job.id}").status_code, 404)
+
+    def test_workers_run_the_job(self):
+        """Test if the worker threads run the committed job"""
+        self.app.config["JOBS_WORKERS"] = 1
+        self.app.config["JOBS_POLL_INTERVAL"] = 0.05
+        workers = self.app.extensions["job_workers"]
+        self.addCleanup(workers.stop)
+
+        location = self.__put_profile(90).headers["Location"]
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if self.__get_job(location).json["status"] == JOB_DONE:
+                break
+            time.sleep(0.05)
+
+        self.assertEqual(self.__get_job(location).json["status"], JOB_DONE)
+
+
+if __name__ == "__main__":
+    unittest.main()
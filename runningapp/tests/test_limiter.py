@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import unittest
+from functools import partial
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp.db import db
+from runningapp.limiter import SharedStore, TokenBucket, parse_limit
+from runningapp.tests.base_classes import BaseApp, BaseDb, BaseUser
+
+
+class LimitedConfig(Config):
+    RATELIMIT_DEFAULT = "3/minute"
+    RATELIMIT_ROUTES = {"userlogin": "2/minute"}
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_parse_limit(self):
+        """Test if the capacity and the refill rate are parsed"""
+        self.assertEqual(parse_limit("120/minute"), (120, 2))
+
+    def test_bucket_is_emptied_and_refilled(self):
+        """Test if the bucket rejects hits when empty
+        and accepts them again after refilling"""
+        bucket = TokenBucket(capacity=2, rate=1, now=0)
+
+        self.assertEqual(bucket.hit(0), 0)
+        self.assertEqual(bucket.hit(0), 0)
+        self.assertEqual(bucket.hit(0), 1)
+        self.assertEqual(bucket.hit(1), 0)
+
+    def test_shared_store_combines_usage_of_workers(self):
+        """Test if the tokens consumed by different workers add up"""
+        with tempfile.TemporaryDirectory() as directory:
+            store = SharedStore(os.path.join(directory, "limits.db"))
+            store.sync({"login:ip:1": (3, 10, 0.001)})
+            tokens = store.sync({"login:ip:1": (4, 10, 0.001)})
+
+        self.assertAlmostEqual(tokens["login:ip:1"], 3, places=1)
+
+
+class RateLimiterTests(unittest.TestCase, BaseApp, BaseDb, BaseUser):
+    def setUp(self) -> None:
+        """Create a test app with low limits and a test client"""
+        self.app = self._set_up_test_app(partial(create_app, LimitedConfig))
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self._create_sample_user()
+
+    def test_login_is_limited_per_ip(self):
+        """Test if the status code is 429 with Retry-After header
+        when the client exceeds the login limit"""
+        for _ in range(2):
+            self._get_access_token(self.client)
+        response = self.client.post(
+            path="/login",
+            data=json.dumps({"username": "testuser", "password": "testpass"}),
+            headers={"Content-Type": "application/json"},
+        )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+    def test_authenticated_requests_are_limited_per_user(self):
+        """Test if every user has their own bucket"""
+        self._create_sample_user(username="user2")
+        token1 = self._get_access_token(self.client)
+        token2 = self._get_access_token(self.client, username="user2")
+
+        statuses1 = [self.__get_trainings(token1) for _ in range(4)]
+        status2 = self.__get_trainings(token2)
+
+        self.assertEqual(statuses1, [200, 200, 200, 429])
+        self.assertEqual(status2, 200)
+
+    def __get_trainings(self, access_token):
+        response = self.client.get(
+            path="/trainings",
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        return response.status_code
+
+
+if __name__ == "__main__":
+    unittest.main()
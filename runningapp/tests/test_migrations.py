@@ -0,0 +1,114 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.migrations import MIGRATIONS, schema_migrations, upgrade
+from runningapp.models.training import CHANGE_SEQ_KEY, TrainingModel
+from runningapp.models.user import UserModel, UserProfileModel
+from runningapp.versions import get_versions
+from runningapp.tests.base_classes import BaseApp
+
+
+class MigrationsTests(unittest.TestCase, BaseApp):
+    def setUp(self) -> None:
+        """Create a test app and an empty database"""
+        self.app = self._set_up_test_app(create_app)
+        db.session.close()
+        db.drop_all()
+        db.engine.execute("DROP TABLE IF EXISTS schema_migrations")
+
+    def test_upgrade_applies_all_migrations(self):
+        """Test if all the migrations are applied and recorded"""
+        applied = upgrade()
+        versions = [
+            row.version
+            for row in db.engine.execute(schema_migrations.select())
+        ]
+
+        self.assertEqual(applied, MIGRATIONS)
+        self.assertEqual(versions, [m.version for m in MIGRATIONS])
+
+    def test_upgrade_twice_does_nothing(self):
+        """Test if the second upgrade doesn't apply any migration"""
+        upgrade()
+
+        self.assertEqual(upgrade(), [])
+
+    def test_upgrade_creates_tables_and_indexes(self):
+        """Test if the tables and the indexes are created"""
+        upgrade()
+        inspector = inspect(db.engine)
+        indexes = {i["name"] for i in inspector.get_indexes("trainings")}
+
+        self.assertIn("users", inspector.get_table_names())
+        self.assertIn("ix_trainings_user_id_name", indexes)
+
+    def test_existing_trainings_get_change_seq(self):
+        """Test if the trainings from before the delta sync are numbered
+        and the sequence continues after them"""
+        upgrade()
+        table = TrainingModel.__table__
+        db.engine.execute(
+            table.insert(),
+            [
+                {"id": 7, "name": "a", "distance": 1, "time_in_seconds": 60},
+                {"id": 9, "name": "b", "distance": 1, "time_in_seconds": 60},
+            ],
+        )
+        db.engine.execute(
+            schema_migrations.delete().where(schema_migrations.c.version == 4)
+        )
+
+        upgrade()
+
+        rows = db.engine.execute(db.select([table.c.id, table.c.change_seq]))
+
+        self.assertEqual([tuple(row) for row in rows], [(7, 7), (9, 9)])
+        self.assertEqual(get_versions([CHANGE_SEQ_KEY]), {CHANGE_SEQ_KEY: 9})
+
+    def test_counters_fix_skips_deleted_trainings(self):
+        """Test if the counters are recounted from the live trainings"""
+        upgrade()
+        profiles = UserProfileModel.__table__
+        db.engine.execute(
+            UserModel.__table__.insert(), id=1, username="u", password="p"
+        )
+        db.engine.execute(profiles.insert(), user_id=1, trainings_number=0)
+        db.engine.execute(
+            TrainingModel.__table__.insert(),
+            [
+                {
+                    "name": name,
+                    "distance": distance,
+                    "time_in_seconds": 60,
+                    "user_id": 1,
+                    "deleted_at": deleted_at,
+                }
+                for name, distance, deleted_at in (
+                    ("a", 1.5, None),
+                    ("b", 2, datetime.utcnow()),
+                )
+            ],
+        )
+        db.engine.execute(
+            schema_migrations.delete().where(schema_migrations.c.version == 9)
+        )
+
+        upgrade()
+
+        profile = db.engine.execute(profiles.select()).first()
+        self.assertEqual(profile.trainings_number, 1)
+        self.assertEqual(profile.kilometers_run, 1.5)
+
+    def test_upgrade_db_command(self):
+        """Test if the CLI command upgrades the database"""
+        result = self.app.test_cli_runner().invoke(args=["upgrade-db"])
+
+        self.assertIn("Applied 1", result.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
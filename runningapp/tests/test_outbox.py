@@ -0,0 +1,188 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.outbox import OUTBOX_FAILED, OutboxEventModel
+from runningapp.models.training import TrainingModel
+from runningapp.outbox import (
+    add_training_event,
+    dispatch_pending_events,
+    FileSink,
+    TRAINING_CREATED,
+    TRAINING_DELETED,
+    TRAINING_UPDATED,
+)
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class ListSink:
+    """Sink keeping the delivered events, failing if asked to"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.messages = []
+
+    def send(self, messages) -> None:
+        if self.fail:
+            raise ConnectionError("The consumer is down")
+        self.messages.extend(messages)
+
+
+class OutboxTests(unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.training = self._create_sample_training(self.user)
+        self.access_token = self._get_access_token(self.client)
+        self.headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.access_token}",
+        }
+
+    def __post_training(self, name: str = "new"):
+        return self.client.post(
+            path="/trainings",
+            data=json.dumps(
+                {"name": name, "distance": 5, "time_in_seconds": 1800}
+            ),
+            headers=self.headers,
+        )
+
+    def __get_event_types(self):
+        return [e.event_type for e in OutboxEventModel.query.order_by("id")]
+
+    def test_write_paths_save_events(self):
+        """Test if creating, updating and deleting a training
+        saves an event of each type with the training"""
+        training_id = self.__post_training().json["id"]
+        self.client.put(
+            path=f"/trainings/{training_id}",
+            data=json.dumps(
+                {"name": "renamed", "distance": 6, "time_in_seconds": 1800}
+            ),
+            headers=self.headers,
+        )
+        self.client.delete(
+            path=f"/trainings/{training_id}", headers=self.headers
+        )
+
+        self.assertEqual(
+            self.__get_event_types(),
+            [TRAINING_CREATED, TRAINING_UPDATED, TRAINING_DELETED],
+        )
+        created = OutboxEventModel.query.order_by("id").first()
+        self.assertEqual(created.training_id, training_id)
+        self.assertEqual(created.payload["name"], "new")
+
+    def test_rollback_drops_events(self):
+        """Test if the events of a rolled back change aren't saved"""
+        training = TrainingModel.find_by_id(self.training.id)
+        training.name = "rolled back"
+        add_training_event(TRAINING_UPDATED, training)
+        db.session.flush()
+        db.session.rollback()
+
+        db.session.commit()
+
+        self.assertEqual(OutboxEventModel.query.count(), 0)
+
+    def test_dispatch_command_delivers_events(self):
+        """Test if the events saved by a node without sinks
+        are delivered by the command"""
+        self.__post_training()
+        runner = self.app.test_cli_runner()
+
+        without_sinks = runner.invoke(args=["dispatch-outbox"])
+        self.assertNotEqual(without_sinks.exit_code, 0)
+        self.assertEqual(OutboxEventModel.query.count(), 1)
+
+        sink = ListSink()
+        self.app.extensions["outbox_sinks"].append(sink)
+        result = runner.invoke(args=["dispatch-outbox"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("Dispatched 1 events", result.output)
+        self.assertEqual(
+            [m["type"] for m in sink.messages], [TRAINING_CREATED]
+        )
+        self.assertEqual(OutboxEventModel.query.count(), 0)
+
+    def test_events_are_delivered_and_removed(self):
+        """Test if the events are delivered to the sinks in order
+        and removed once they have been"""
+        self.assertEqual(self.__post_training("first").status_code, 201)
+        self.assertEqual(self.__post_training("second").status_code, 201)
+        sink = ListSink()
+
+        dispatched = dispatch_pending_events([sink])
+
+        self.assertEqual(dispatched, 2)
+        self.assertEqual(
+            [m["type"] for m in sink.messages], [TRAINING_CREATED] * 2
+        )
+        self.assertLess(sink.messages[0]["id"], sink.messages[1]["id"])
+        self.assertEqual(OutboxEventModel.query.count(), 0)
+
+    def test_file_sink_writes_json_lines(self):
+        """Test if the file sink appends an event per line"""
+        self.__post_training()
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        dispatch_pending_events([FileSink(path)])
+
+        with open(path) as file:
+            lines = [json.loads(line) for line in file]
+        self.assertEqual([m["type"] for m in lines], [TRAINING_CREATED])
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test if the events are kept and retried later
+        when a sink fails"""
+        self.__post_training()
+        failing = ListSink(fail=True)
+
+        dispatch_pending_events([failing])
+
+        outbox_event = OutboxEventModel.query.one()
+        self.assertEqual(outbox_event.attempts, 1)
+        self.assertIsNone(outbox_event.locked_by)
+        self.assertGreater(outbox_event.next_attempt_at, datetime.utcnow())
+        self.assertIn("consumer is down", outbox_event.error)
+        # not retried before its backoff ends
+        self.assertEqual(dispatch_pending_events([failing]), 0)
+
+        outbox_event.next_attempt_at = datetime.utcnow() - timedelta(1)
+        db.session.commit()
+        sink = ListSink()
+        dispatch_pending_events([sink])
+
+        self.assertEqual(len(sink.messages), 1)
+        self.assertEqual(OutboxEventModel.query.count(), 0)
+
+    def test_event_fails_after_max_attempts(self):
+        """Test if the event stops being retried after the last attempt"""
+        self.app.config["OUTBOX_MAX_ATTEMPTS"] = 1
+        self.__post_training()
+
+        dispatch_pending_events([ListSink(fail=True)])
+
+        outbox_event = OutboxEventModel.query.one()
+        self.assertEqual(outbox_event.status, OUTBOX_FAILED)
+        self.assertEqual(dispatch_pending_events([ListSink()]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
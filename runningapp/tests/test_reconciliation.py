@@ -0,0 +1,108 @@
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.user import UserProfileModel
+from runningapp.reconciliation import (
+    find_drifted_profiles,
+    reconcile_profile_counters,
+)
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseTraining,
+    BaseUser,
+)
+from runningapp.versions import get_versions
+
+
+class ReconciliationTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self) -> None:
+        """Set up a test app and test database with drifted counters"""
+        self.app = self._set_up_test_app(create_app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="otheruser")
+        self.empty_user = self._create_sample_user(username="emptyuser")
+        for i in range(3):
+            self._create_sample_training(
+                self.user, name=f"run {i}", distance=5.5
+            )
+        self._create_sample_training(self.other_user, distance=10)
+        self.__set_counters(self.user, 2, 11)
+        self.__set_counters(self.other_user, 1, 10)
+        self.__set_counters(self.empty_user, 1, 3)
+
+    def __set_counters(self, user, trainings_number, kilometers_run):
+        user_profile = UserProfileModel.find_by_user_id(user.id)
+        user_profile.trainings_number = trainings_number
+        user_profile.kilometers_run = kilometers_run
+        user_profile.save_to_db()
+
+    def __get_counters(self, user):
+        user_profile = UserProfileModel.find_by_user_id(user.id)
+        return user_profile.trainings_number, user_profile.kilometers_run
+
+    def test_finds_drifted_profiles(self):
+        """Test if only the profiles whose counters
+        don't match their trainings are found"""
+        with db.engine.connect() as connection:
+            drifted = set(find_drifted_profiles(connection))
+
+        self.assertEqual(
+            drifted,
+            {
+                UserProfileModel.find_by_user_id(self.user.id).id,
+                UserProfileModel.find_by_user_id(self.empty_user.id).id,
+            },
+        )
+
+    def test_fixes_drifted_counters(self):
+        """Test if the counters are set from the trainings
+        and the data versions of the fixed users are bumped"""
+        versions = get_versions([f"user:{self.user.id}"])
+
+        result = reconcile_profile_counters(db.engine)
+        db.session.expire_all()
+
+        self.assertEqual((result.profiles, result.fixed), (3, 2))
+        self.assertEqual(self.__get_counters(self.user), (3, 16.5))
+        self.assertEqual(self.__get_counters(self.other_user), (1, 10))
+        self.assertEqual(self.__get_counters(self.empty_user), (0, 0))
+        self.assertGreater(
+            get_versions([f"user:{self.user.id}"])[f"user:{self.user.id}"],
+            versions[f"user:{self.user.id}"],
+        )
+
+    def test_fixes_in_batches(self):
+        """Test if the drifted profiles are updated
+        with a statement per batch"""
+        with self._record_statements(db.engine) as statements:
+            reconcile_profile_counters(db.engine, batch_size=1)
+
+        updates = [
+            s for s in statements if s.startswith("UPDATE user_profiles")
+        ]
+        self.assertEqual(len(updates), 2)
+
+    def test_reconcile_counters_command(self):
+        """Test if the CLI command reports the fixed profiles"""
+        runner = self.app.test_cli_runner()
+
+        result = runner.invoke(args=["reconcile-counters"])
+        again = runner.invoke(args=["reconcile-counters"])
+
+        self.assertIn("Fixed 2 of 3 profiles", result.output)
+        self.assertIn("Fixed 0 of 3 profiles", again.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import json
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.representations import msgpack, orjson
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class RepresentationsTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self._create_sample_training(self.user)
+        self.access_token = self._get_access_token(self.client)
+
+    def __get_trainings(self, accept):
+        return self.client.get(
+            path="/trainings",
+            headers={
+                "Accept": accept,
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_fast_json_matches_stdlib_json(self):
+        """Test if the JSON body decodes to the same data
+        as with the stdlib encoder"""
+        response = self.__get_trainings("application/json")
+        self.app.config["RESTFUL_JSON"] = {"separators": (",", ":")}
+        stdlib_response = self.__get_trainings("application/json")
+
+        self.assertEqual(response.content_type, "application/json")
+        self.assertTrue(response.data.endswith(b"\n"))
+        self.assertEqual(
+            json.loads(response.data), json.loads(stdlib_response.data)
+        )
+
+    def test_json_is_the_default(self):
+        """Test if JSON is returned if the client accepts anything"""
+        response = self.__get_trainings("*/*")
+
+        self.assertEqual(response.content_type, "application/json")
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_response(self):
+        """Test if the data is encoded with MessagePack
+        if the client asks for it"""
+        json_response = self.__get_trainings("application/json")
+        response = self.__get_trainings("application/msgpack")
+
+        self.assertEqual(response.content_type, "application/msgpack")
+        self.assertEqual(msgpack.unpackb(response.data), json_response.json)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_etag_depends_on_representation(self):
+        """Test if the ETag of the JSON body doesn't revalidate
+        the MessagePack one and the responses vary with Accept"""
+        json_response = self.__get_trainings("application/json")
+        response = self.client.get(
+            path="/trainings",
+            headers={
+                "Accept": "application/msgpack",
+                "If-None-Match": json_response.headers["ETag"],
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(
+            response.headers["ETag"], json_response.headers["ETag"]
+        )
+        self.assertIn("Accept", json_response.vary)
+        self.assertIn("Accept", response.vary)
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_request_body(self):
+        """Test if a MessagePack request body is decoded"""
+        data = {"name": "packed", "distance": 5, "time_in_seconds": 1800}
+        response = self.client.post(
+            path="/trainings",
+            data=msgpack.packb(data),
+            headers={
+                "Content-Type": "application/msgpack",
+                "Accept": "application/msgpack",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(msgpack.unpackb(response.data)["name"], "packed")
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_invalid_msgpack_request_body(self):
+        """Test if the status code is 400 if the body can't be decoded"""
+        response = self.client.post(
+            path="/bmi",
+            data=b"\xc1",
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
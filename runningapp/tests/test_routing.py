@@ -0,0 +1,154 @@
+import json
+import sqlite3
+import time
+import unittest
+from functools import partial
+
+from runningapp import create_app
+from runningapp.config import Config
+from runningapp.db import LAST_WRITE_COOKIE, REPLICA_BIND, db
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseTraining,
+    BaseUser,
+)
+
+
+class ReplicaConfig(Config):
+    DATABASE_REPLICA_URI = "sqlite:///replica.db"
+
+
+class ReadReplicaTests(
+    unittest.TestCase, BaseApp, BaseDb, BaseUser, BaseTraining
+):
+    def setUp(self) -> None:
+        """Set up a test app with a replica, test client and test database"""
+        self.app = self._set_up_test_app(partial(create_app, ReplicaConfig))
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self._create_sample_training(self.user, name="replicated")
+        self.__replicate()
+        self.access_token = self._get_access_token(self.client)
+
+    def __replicate(self):
+        """Copy the primary database to the replica,
+        a stand-in for the replication of a real database server"""
+        db.session.commit()
+        primary = sqlite3.connect(db.engine.url.database)
+        replica = sqlite3.connect(
+            db.get_engine(self.app, bind=REPLICA_BIND).url.database
+        )
+        primary.backup(replica)
+        primary.close()
+        replica.close()
+
+    def __get_training_names(self):
+        response = self.client.get(
+            path="/trainings",
+            headers={"Authorization": f"Bearer {self.access_token}"},
+        )
+        return [training["name"] for training in response.json["trainings"]]
+
+    def test_get_reads_from_replica(self):
+        """Test if the GET endpoint doesn't see the rows
+        which haven't been replicated yet"""
+        self._create_sample_training(self.user, name="not replicated")
+
+        self.assertEqual(self.__get_training_names(), ["replicated"])
+
+        self.__replicate()
+
+        self.assertEqual(
+            self.__get_training_names(), ["replicated", "not replicated"]
+        )
+
+    def test_user_reads_their_own_writes(self):
+        """Test if the user sees their training right after creating it
+        even though it hasn't been replicated yet"""
+        data = {"name": "new", "distance": 10, "time_in_seconds": 3600}
+        self.client.post(
+            path="/trainings",
+            data=json.dumps(data),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+        self.assertEqual(self.__get_training_names(), ["replicated", "new"])
+
+    def test_last_write_cookie_keeps_reads_on_primary(self):
+        """Test if the cookie alone, as sent to a worker which hasn't
+        handled the write, keeps the reads on the primary"""
+        self._create_sample_training(self.user, name="not replicated")
+        self.client.set_cookie(
+            "localhost", LAST_WRITE_COOKIE, repr(time.time())
+        )
+
+        self.assertEqual(
+            self.__get_training_names(), ["replicated", "not replicated"]
+        )
+
+    def test_other_clients_read_from_replica(self):
+        """Test if the write of a client doesn't move the reads
+        of another client with the same address to the primary"""
+        data = {"name": "new", "distance": 10, "time_in_seconds": 3600}
+        self.client.post(
+            path="/trainings",
+            data=json.dumps(data),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+        self.client = self._set_up_client(self.app)
+
+        self.assertEqual(self.__get_training_names(), ["replicated"])
+
+    def test_batch_reads_its_own_writes(self):
+        """Test if the reads after a write in a batch see it
+        and the client's next reads go to the primary"""
+        data = {"name": "new", "distance": 10, "time_in_seconds": 3600}
+        response = self.client.post(
+            path="/batch",
+            data=json.dumps(
+                {
+                    "requests": [
+                        {"path": "/trainings"},
+                        {"method": "POST", "path": "/trainings", "body": data},
+                        {"path": "/trainings"},
+                    ]
+                }
+            ),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+        responses = response.json["responses"]
+
+        self.assertEqual(len(responses[0]["body"]["trainings"]), 1)
+        self.assertEqual(len(responses[2]["body"]["trainings"]), 2)
+        self.assertEqual(self.__get_training_names(), ["replicated", "new"])
+
+    def test_reads_go_to_primary_after_window(self):
+        """Test if the reads go to the replica again
+        after the read-your-writes window"""
+        self.app.config["READ_YOUR_WRITES_SECONDS"] = 0
+        data = {"name": "new", "distance": 10, "time_in_seconds": 3600}
+        self.client.post(
+            path="/trainings",
+            data=json.dumps(data),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+        self.assertEqual(self.__get_training_names(), ["replicated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
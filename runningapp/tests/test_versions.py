@@ -0,0 +1,147 @@
+import json
+import unittest
+
+from runningapp import create_app
+from runningapp.db import db
+from runningapp.models.user import UserProfileModel
+from runningapp.tests.base_classes import (
+    BaseApp,
+    BaseDb,
+    BaseQueryCounter,
+    BaseTraining,
+    BaseUser,
+)
+from runningapp.versions import get_versions
+
+
+class ConditionalGetTests(
+    unittest.TestCase,
+    BaseApp,
+    BaseDb,
+    BaseUser,
+    BaseTraining,
+    BaseQueryCounter,
+):
+    def setUp(self) -> None:
+        """Set up a test app, test client and test database"""
+        self.app = self._set_up_test_app(create_app)
+        self.client = self._set_up_client(self.app)
+        self._set_up_test_db(db)
+        self.user = self._create_sample_user()
+        self.other_user = self._create_sample_user(username="otheruser")
+        self._create_sample_training(self.user)
+        self.access_token = self._get_access_token(self.client)
+
+    def __get(self, path, etag=None):
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        return self.client.get(path=path, headers=headers)
+
+    def __post_training(self, name="new"):
+        data = {"name": name, "distance": 5, "time_in_seconds": 1800}
+        return self.client.post(
+            path="/trainings",
+            data=json.dumps(data),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.access_token}",
+            },
+        )
+
+    def test_not_modified_without_query(self):
+        """Test if the client which has the current version gets 304
+        without the trainings being queried"""
+        etag = self.__get("/trainings").headers["ETag"]
+
+        with self._record_statements(db.engine) as statements:
+            response = self.__get("/trainings", etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(response.data, b"")
+        self.assertFalse(
+            any("FROM trainings" in statement for statement in statements)
+        )
+
+    def test_write_changes_etag(self):
+        """Test if adding a training changes the ETag of the list"""
+        etag = self.__get("/trainings").headers["ETag"]
+        self.__post_training()
+
+        response = self.__get("/trainings", etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual(len(response.json["trainings"]), 2)
+
+    def test_other_users_write_keeps_etag(self):
+        """Test if the trainings of another user
+        don't change the ETag of the logged in user's list"""
+        etag = self.__get("/trainings").headers["ETag"]
+        self._create_sample_training(self.other_user)
+
+        self.assertEqual(self.__get("/trainings", etag).status_code, 304)
+
+    def test_user_profile_update_changes_user_etag(self):
+        """Test if updating the profile changes the ETag of the user
+        but not the ETag of another user"""
+        path = f"/users/{self.user.id}"
+        other_path = f"/users/{self.other_user.id}"
+        etag = self.__get(path).headers["ETag"]
+        other_etag = self.__get(other_path).headers["ETag"]
+
+        user_profile = UserProfileModel.find_by_user_id(self.user.id)
+        user_profile.weight = 80
+        user_profile.save_to_db()
+
+        self.assertEqual(self.__get(path, etag).status_code, 200)
+        self.assertEqual(self.__get(other_path, other_etag).status_code, 304)
+
+    def test_stats_etags(self):
+        """Test if the stats are tagged with the versions of the tables
+        they are calculated from"""
+        paths = ["/total-kilometers-number", "/total-calories-number"]
+        etags = {path: self.__get(path).headers["ETag"] for path in paths}
+        users_etag = self.__get("/total-users-number").headers["ETag"]
+
+        self.__post_training()
+
+        for path in paths:
+            response = self.__get(path, etags[path])
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etags[path])
+        # the training updated the profile of the user
+        self.assertEqual(
+            self.__get("/total-users-number", users_etag).status_code, 200
+        )
+
+    def test_not_found_isnt_tagged(self):
+        """Test if a 404 response has no ETag"""
+        response = self.__get("/users/1000")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_write_bumps_versions_once(self):
+        """Test if a write bumps all its versions with one statement
+        in the same transaction"""
+        versions = get_versions(["trainings", f"trainings:user:{self.user.id}"])
+        db.session.commit()
+
+        with self._record_statements(db.engine) as statements:
+            self.__post_training()
+
+        # the change sequence of trainings is allocated separately
+        writes = [s for s in statements if not s.startswith("SELECT")]
+        bumps = [s for s in writes if "data_versions" in s and " IN (" in s]
+        self.assertEqual(len(bumps), 1)
+        self.assertTrue(bumps[0].startswith("UPDATE data_versions"))
+        self.assertEqual(
+            get_versions(list(versions)),
+            {key: version + 1 for key, version in versions.items()},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+from functools import wraps
+from itertools import chain
+from typing import Dict, Iterable, List
+
+from flask import request, Response
+from flask_jwt_extended import get_jwt_identity
+from flask_restful.utils import unpack
+from sqlalchemy import event, select
+from werkzeug.http import quote_etag
+
+from runningapp.db import db, RoutingSession
+from runningapp.representations import get_output_mediatype
+
+# key -> counter bumped by every write which changes the data under the key,
+# e.g. "trainings:user:1" is bumped whenever a training of user 1 changes
+data_versions = db.Table(
+    "data_versions",
+    db.Column("key", db.String(80), primary_key=True),
+    db.Column("version", db.Integer, nullable=False, default=0),
+)
+
+
+# set in the info of a session which has changed data without
+# the unit of work, the keys are bumped with the ones of the next flush
+PENDING_VERSION_KEYS_KEY = "runningapp.pending_version_keys"
+
+
+class Versioned:
+    """Mixin for the models whose changes bump the data versions"""
+
+    def version_keys(self) -> List[str]:
+        """Get the keys of the data versions the instance belongs to"""
+        raise NotImplementedError
+
+
+def bump_versions(connection, keys: Iterable[str]) -> None:
+    """Increment the versions of the keys, starting new keys from 1"""
+    # a fixed order keeps concurrent transactions from deadlocking
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    result = connection.execute(
+        data_versions.update()
+        .where(data_versions.c.key.in_(keys))
+        .values(version=data_versions.c.version + 1)
+    )
+    if result.rowcount == len(keys):
+        return
+    existing = {
+        row.key
+        for row in connection.execute(
+            select([data_versions.c.key]).where(data_versions.c.key.in_(keys))
+        )
+    }
+    connection.execute(
+        data_versions.insert(),
+        [{"key": key, "version": 1} for key in keys if key not in existing],
+    )
+
+
+def allocate_sequence(connection, key: str, count: int = 1) -> int:
+    """Reserve the next count numbers of the sequence stored as the version
+    of the key and return the first one
+
+    The counter stays locked until the end of the transaction,
+    so the numbers are committed in the order they are allocated.
+    """
+    result = connection.execute(
+        data_versions.update()
+        .where(data_versions.c.key == key)
+        .values(version=data_versions.c.version + count)
+    )
+    if not result.rowcount:
+        connection.execute(data_versions.insert(), key=key, version=count)
+    last = connection.execute(
+        select([data_versions.c.version]).where(data_versions.c.key == key)
+    ).scalar()
+    return last - count + 1
+
+
+def get_versions(keys: List[str]) -> Dict[str, int]:
+    """Get the current versions of the keys, 0 for the unknown ones"""
+    rows = db.session.execute(
+        select([data_versions.c.key, data_versions.c.version]).where(
+            data_versions.c.key.in_(keys)
+        )
+    )
+    versions = dict.fromkeys(keys, 0)
+    versions.update((row.key, row.version) for row in rows)
+    return versions
+
+
+def bump_versions_on_flush(session, keys: Iterable[str]) -> None:
+    """Bump the versions of the keys together with the ones of the data
+    changed by the next flush, e.g. after a bulk update"""
+    session.info.setdefault(PENDING_VERSION_KEYS_KEY, set()).update(keys)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _bump_flushed_versions(session, flush_context) -> None:
+    """Bump the versions of the data changed by the flush
+    in the same transaction"""
+    # the session still lists the flushed instances at this point
+    changed = chain(
+        session.new,
+        session.deleted,
+        (
+            instance
+            for instance in session.dirty
+            if session.is_modified(instance, include_collections=False)
+        ),
+    )
+    keys = session.info.pop(PENDING_VERSION_KEYS_KEY, set())
+    for instance in changed:
+        if isinstance(instance, Versioned):
+            keys.update(instance.version_keys())
+    bump_versions(session.connection(), keys)
+
+
+@event.listens_for(RoutingSession, "before_commit")
+def _bump_pending_versions(session) -> None:
+    """Bump the versions left for the next flush
+    if the commit has nothing to flush"""
+    if PENDING_VERSION_KEYS_KEY not in session.info:
+        return
+    session.flush()
+    keys = session.info.pop(PENDING_VERSION_KEYS_KEY, None)
+    if keys:
+        bump_versions(session.connection(), keys)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_pending_versions(session) -> None:
+    session.info.pop(PENDING_VERSION_KEYS_KEY, None)
+
+
+def make_tag(versions: Dict[str, int]) -> str:
+    """Make the entity tag of the data with the given versions"""
+    return ",".join(f"{key}={version}" for key, version in versions.items())
+
+
+def versioned(*key_templates: str):
+    """Tag the responses of the resource method with the versions
+    of the data it shows and answer 304 without calling the method
+    if the client already has them
+
+    The templates are formatted with the view arguments
+    and the identity of the logged in user. Every representation
+    picked from the Accept header gets its own tag.
+    """
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            keys = [
+                template.format(identity=get_jwt_identity(), **kwargs)
+                if "{identity}" in template
+                else template.format(**kwargs)
+                for template in key_templates
+            ]
+            tag = f"{make_tag(get_versions(keys))};{get_output_mediatype()}"
+            # the body may be compressed, so the tag is weak
+            etag = quote_etag(tag, weak=True)
+            tag_headers = {"ETag": etag, "Vary": "Accept"}
+            if request.if_none_match.contains_weak(tag):
+                return Response(status=304, headers=tag_headers)
+            data, code, headers = unpack(function(*args, **kwargs))
+            if code == 200:
+                headers = {**headers, **tag_headers}
+            return data, code, headers
+
+        return wrapper
+
+    return decorator